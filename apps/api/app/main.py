@@ -1,6 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from app.routers import validation, auth
+from app.utils.logs import configure_logging
+from app.utils.metrics import MetricsMiddleware, render_metrics, METRICS_CONTENT_TYPE
+
+# Log records are tagged with the ID of the request that produced them
+configure_logging()
 
 app = FastAPI(
     title="The Mom Test Bot API",
@@ -17,10 +23,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, requests in flight and request IDs
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(validation.router, prefix="/api/validation", tags=["validation"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Latency histograms, in-flight requests and stage timers in Prometheus format."""
+    return Response(render_metrics(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok", "message": "API is running"} 
\ No newline at end of file
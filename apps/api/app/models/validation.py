@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, List, Optional
 
 class StartupIdea(BaseModel):
     idea_name: str = Field(..., description="Name of the startup idea")
@@ -19,4 +19,8 @@ class ValidationPlan(BaseModel):
     next_steps: List[str] = Field(..., description="Recommended next steps for validation")
 
 class ValidationRequest(BaseModel):
-    startup_idea: StartupIdea = Field(..., description="Details about the startup idea") 
\ No newline at end of file
+    startup_idea: StartupIdea = Field(..., description="Details about the startup idea") 
+
+class BatchValidationRequest(BaseModel):
+    # Items are validated one by one, so a malformed idea fails only its own entry
+    startup_ideas: List[Any] = Field(..., description="Startup ideas to validate, each shaped like StartupIdea")
@@ -1,6 +1,8 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
-from app.models.validation import ValidationRequest, ValidationPlan
-from app.services.validation_service import validation_service
+from fastapi.responses import StreamingResponse
+from app.models.validation import ValidationRequest, ValidationPlan, BatchValidationRequest
+from app.services.validation_service import validation_service, VALIDATION_BATCH_MAX_IDEAS
 
 router = APIRouter()
 
@@ -18,4 +20,23 @@ async def generate_validation_plan(request: ValidationRequest):
         validation_plan = await validation_service.generate_validation_plan(request.startup_idea)
         return validation_plan
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate validation plan: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to generate validation plan: {str(e)}") 
+
+@router.post("/generate-plan/batch")
+async def generate_validation_plans(request: BatchValidationRequest):
+    """
+    Generate validation plans for many startup ideas in one request.
+    
+    Plans are streamed back as newline-delimited JSON in the order they
+    complete, one line per idea with its index in the request:
+    - {"index": 0, "status": "ok", "data": <ValidationPlan>}
+    - {"index": 1, "status": "error", "error": "..."}
+    
+    The last line is {"status": "done"} with the number of ideas that succeeded
+    and failed.
+    """
+    if len(request.startup_ideas) > VALIDATION_BATCH_MAX_IDEAS:
+        raise HTTPException(status_code=413, detail=f"A batch can hold at most {VALIDATION_BATCH_MAX_IDEAS} ideas")
+    
+    lines = (json.dumps(result) + "\n" async for result in validation_service.stream_validation_plans(request.startup_ideas))
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
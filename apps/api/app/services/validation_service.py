@@ -1,5 +1,13 @@
+import asyncio
+import os
+from pydantic import ValidationError
 from app.models.validation import StartupIdea, ValidationPlan, InterviewQuestion
-from typing import List
+from app.utils.metrics import time_stage
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# Plans generated at the same time within one batch, and the largest batch accepted
+VALIDATION_BATCH_CONCURRENCY = int(os.getenv("VALIDATION_BATCH_CONCURRENCY", "8"))
+VALIDATION_BATCH_MAX_IDEAS = int(os.getenv("VALIDATION_BATCH_MAX_IDEAS", "500"))
 
 class ValidationService:
     """Service for generating validation plans based on startup ideas."""
@@ -16,9 +24,10 @@ class ValidationService:
         """
         # In a real implementation, this would use OpenAI or another LLM to generate questions
         
-        interview_questions = self._generate_interview_questions(startup_idea)
-        market_research_suggestions = self._generate_market_research_suggestions(startup_idea)
-        next_steps = self._generate_next_steps()
+        with time_stage("validation_plan"):
+            interview_questions = self._generate_interview_questions(startup_idea)
+            market_research_suggestions = self._generate_market_research_suggestions(startup_idea)
+            next_steps = self._generate_next_steps()
         
         return ValidationPlan(
             interview_questions=interview_questions,
@@ -26,6 +35,57 @@ class ValidationService:
             next_steps=next_steps
         )
     
+    async def stream_validation_plans(self, items: List[Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate validation plans for a batch of ideas, yielding one result per item as it completes.
+        
+        Items are validated individually, so a malformed idea only fails its own
+        entry, and at most VALIDATION_BATCH_CONCURRENCY plans are generated at a
+        time. Every plan is generated from its own item: plans are cheap to
+        build and quote the idea's wording, so near-duplicate ideas aren't merged.
+        
+        Args:
+            items: Raw startup ideas, each shaped like StartupIdea
+            
+        Yields:
+            {"index", "status": "ok", "data"} or {"index", "status": "error", "error"}
+            per item, then {"status": "done", "total", "succeeded", "failed"}
+        """
+        failed = 0
+        ideas: List[Tuple[int, StartupIdea]] = []
+        
+        for index, item in enumerate(items):
+            try:
+                ideas.append((index, StartupIdea.model_validate(item)))
+            except ValidationError as e:
+                failed += 1
+                yield {"index": index, "status": "error", "error": str(e)}
+        
+        semaphore = asyncio.Semaphore(VALIDATION_BATCH_CONCURRENCY)
+        
+        async def plan(index: int, startup_idea: StartupIdea) -> Tuple[int, Any, Any]:
+            async with semaphore:
+                try:
+                    return index, await self.generate_validation_plan(startup_idea), None
+                except Exception as e:
+                    return index, None, str(e)
+        
+        tasks = [asyncio.create_task(plan(index, startup_idea)) for index, startup_idea in ideas]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, validation_plan, error = await next_done
+                if error is None:
+                    yield {"index": index, "status": "ok", "data": validation_plan.model_dump()}
+                else:
+                    failed += 1
+                    yield {"index": index, "status": "error", "error": f"Failed to generate validation plan: {error}"}
+            
+            yield {"status": "done", "total": len(items), "succeeded": len(items) - failed, "failed": failed}
+        finally:
+            # Cancelled when the response stream is closed early
+            for task in tasks:
+                task.cancel()
+    
     def _generate_interview_questions(self, startup_idea: StartupIdea) -> List[InterviewQuestion]:
         """Generate interview questions based on The Mom Test principles."""
         
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the app package from the apps/api directory, as uvicorn does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
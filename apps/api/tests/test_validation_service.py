@@ -0,0 +1,63 @@
+import asyncio
+import json
+from app.services.validation_service import ValidationService
+
+IDEA = {
+    "idea_name": "Ledger",
+    "problem_statement": "Freelancers lose hours reconciling invoices",
+    "target_audience": "Freelance designers",
+    "solution": "Automatic invoice matching",
+    "value_proposition": "Saves five hours a month",
+}
+
+def _stream(items):
+    async def run():
+        return [frame async for frame in ValidationService().stream_validation_plans(items)]
+    return asyncio.run(run())
+
+def test_each_item_gets_a_plan_from_its_own_fields():
+    shouted = {name: value.upper() for name, value in IDEA.items()}
+    frames = _stream([IDEA, shouted])
+    by_index = {frame["index"]: frame for frame in frames if "index" in frame}
+    assert "Freelancers" in by_index[0]["data"]["interview_questions"][0]["question"]
+    assert "FREELANCERS" in by_index[1]["data"]["interview_questions"][0]["question"]
+
+def test_bad_items_fail_alone_and_the_stream_ends_with_counts():
+    frames = _stream([IDEA, {"idea_name": "incomplete"}])
+    by_index = {frame["index"]: frame for frame in frames if "index" in frame}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1]["status"] == "error"
+    assert frames[-1] == {"status": "done", "total": 2, "succeeded": 1, "failed": 1}
+
+def test_failed_plans_are_reported_per_item():
+    service = ValidationService()
+
+    async def failing_plan(startup_idea):
+        raise RuntimeError("model unavailable")
+
+    service.generate_validation_plan = failing_plan
+
+    async def run():
+        return [frame async for frame in service.stream_validation_plans([IDEA])]
+
+    frames = asyncio.run(run())
+    assert frames[0]["status"] == "error"
+    assert "model unavailable" in frames[0]["error"]
+    assert frames[-1]["failed"] == 1
+
+def test_batch_endpoint_fails_only_the_non_object_items():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.routers import validation
+
+    app = FastAPI()
+    app.include_router(validation.router, prefix="/api/validation")
+    response = TestClient(app).post("/api/validation/generate-plan/batch", json={"startup_ideas": ["oops", IDEA, None]})
+
+    assert response.status_code == 200
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {frame["index"]: frame for frame in frames if "index" in frame}
+    assert by_index[0]["status"] == "error"
+    assert by_index[1]["status"] == "ok"
+    assert by_index[2]["status"] == "error"
+    assert frames[-1] == {"status": "done", "total": 3, "succeeded": 1, "failed": 2}
@@ -0,0 +1,48 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional, Dict, Any
+
+class ResearchQuery(BaseModel):
+    query: str
+    platforms: List[str]
+    max_results: Optional[int] = 50
+    # Competitor name -> aliases; defaults to the configured competitor dictionary
+    competitors: Optional[Dict[str, List[str]]] = None
+
+class ResearchResult(BaseModel):
+    platform: str
+    source_url: str
+    content: str
+    author: Optional[str] = None
+    date: Optional[str] = None
+    engagement: Optional[Dict[str, Any]] = None
+    sentiment: Optional[str] = None
+    duplicate_urls: List[str] = []  # Near-identical posts merged into this one
+
+class PlatformStatus(BaseModel):
+    status: str  # "ok", "timed_out", "failed" or "circuit_open"
+    result_count: int = 0
+    elapsed_ms: float
+    error: Optional[str] = None
+    cached: bool = False
+    stale: bool = False  # Expired cached results, served because the platform couldn't be searched
+
+class ResearchResponse(BaseModel):
+    results: List[ResearchResult]
+    analysis: Dict[str, Any]
+    summary: str
+    platform_status: Dict[str, PlatformStatus] = {}
+    cursors: Dict[str, str] = {}  # Per-platform high-water marks; /research/refresh fetches only what is newer
+
+class ResearchJob(BaseModel):
+    id: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    query: ResearchQuery
+    # One entry per requested platform; None until that platform has finished
+    progress: Dict[str, Optional[PlatformStatus]] = {}
+    result: Optional[ResearchResponse] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional, Dict, Any
+
+class IdeaInput(BaseModel):
+    idea_name: str
+    problem_statement: str
+    target_audience: str
+    solution: str
+    value_proposition: str
+
+class InterviewQuestion(BaseModel):
+    question: str
+    explanation: str
+    category: str
+
+class ValidationResponse(BaseModel):
+    interview_questions: List[InterviewQuestion]
+    analysis: Dict[str, Any]
+    recommendations: List[str]
+    research_topics: List[str]
+
+class BatchIdeaInput(BaseModel):
+    # Items are validated one by one, so a malformed idea fails only its own entry
+    ideas: List[Any]
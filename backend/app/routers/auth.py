@@ -1,10 +1,23 @@
+import logging
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Any, Dict, Optional
 from ..services.supabase_client import get_supabase_client
+from ..services.offload import run_blocking
+from ..services.auth import token_verifier, profile_cache, InvalidTokenError
+from ..services.singleflight import SingleFlight
+from ..services.metrics import time_stage
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Concurrent requests of one user share a single profile lookup
+profile_flight = SingleFlight("profiles")
+
 class UserSignUp(BaseModel):
     email: EmailStr
     password: str
@@ -24,6 +37,65 @@ class AuthResponse(BaseModel):
     access_token: str
     refresh_token: str
 
+class ProfileUpdate(BaseModel):
+    name: Optional[str] = None
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> UserResponse:
+    """
+    Dependency for routes that need a signed-in user.
+    
+    The bearer token is verified locally and the profile comes from the
+    profile cache, so an authenticated request normally makes no remote calls.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    try:
+        claims = await token_verifier.verify(credentials.credentials)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid token: {e}",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    profile = await get_profile(claims["sub"])
+    return UserResponse(
+        id=claims["sub"],
+        email=claims.get("email") or profile.get("email") or "",
+        name=profile.get("name")
+    )
+
+async def get_profile(user_id: str) -> Dict[str, Any]:
+    """
+    A user's profiles row ({} if they have none), from the profile cache when
+    possible. A lookup that fails returns {} without caching it.
+    """
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+    
+    async def load() -> Dict[str, Any]:
+        select = get_supabase_client().table("profiles").select("*").eq("id", user_id)
+        with time_stage("db.read"):
+            response = await run_blocking("supabase", select.execute)
+        loaded = response.data[0] if response.data else {}
+        profile_cache.set(user_id, loaded)
+        return loaded
+    
+    try:
+        profile, _ = await profile_flight.do(user_id, load)
+    except Exception as e:
+        logger.warning("Could not load the profile of %s: %s", user_id, e)
+        return {}
+    return dict(profile)
+
 @router.post("/signup", response_model=AuthResponse)
 async def sign_up(user_data: UserSignUp):
     """
@@ -33,20 +105,25 @@ async def sign_up(user_data: UserSignUp):
     
     try:
         # Register user with Supabase Auth
-        auth_response = supabase.auth.sign_up({
-            "email": user_data.email,
-            "password": user_data.password
-        })
+        with time_stage("supabase.auth"):
+            auth_response = await run_blocking("supabase", supabase.auth.sign_up, {
+                "email": user_data.email,
+                "password": user_data.password
+            })
         
         # If registration successful, store additional user data
         if auth_response.user:
             # Add user to profiles table with additional data
-            supabase.table("profiles").insert({
+            profile = {
                 "id": auth_response.user.id,
                 "email": user_data.email,
-                "name": user_data.name,
-                "created_at": "now()"
-            }).execute()
+                "name": user_data.name
+            }
+            insert = supabase.table("profiles").insert({**profile, "created_at": "now()"})
+            await run_blocking("supabase", insert.execute)
+            
+            # Replaces anything cached for this id (e.g. "no profile" from an earlier lookup)
+            profile_cache.set(auth_response.user.id, profile)
             
             # Return user data and tokens
             return AuthResponse(
@@ -79,25 +156,21 @@ async def login(user_data: UserLogin):
     
     try:
         # Sign in user with Supabase Auth
-        auth_response = supabase.auth.sign_in_with_password({
-            "email": user_data.email,
-            "password": user_data.password
-        })
-        
-        # Get user profile data
-        profile_response = supabase.table("profiles").select("*").eq("id", auth_response.user.id).execute()
+        with time_stage("supabase.auth"):
+            auth_response = await run_blocking("supabase", supabase.auth.sign_in_with_password, {
+                "email": user_data.email,
+                "password": user_data.password
+            })
         
-        # Extract name from profile if available
-        name = None
-        if profile_response.data and len(profile_response.data) > 0:
-            name = profile_response.data[0].get("name")
+        # Get user profile data (cached, so repeated logins skip the lookup)
+        profile = await get_profile(auth_response.user.id)
         
         # Return user data and tokens
         return AuthResponse(
             user=UserResponse(
                 id=auth_response.user.id,
                 email=auth_response.user.email,
-                name=name
+                name=profile.get("name")
             ),
             access_token=auth_response.session.access_token,
             refresh_token=auth_response.session.refresh_token
@@ -107,4 +180,34 @@ async def login(user_data: UserLogin):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/me", response_model=UserResponse)
+async def get_me(user: UserResponse = Depends(get_current_user)):
+    """
+    The signed-in user, from their bearer token
+    """
+    return user
+
+@router.patch("/me", response_model=UserResponse)
+async def update_me(update: ProfileUpdate, user: UserResponse = Depends(get_current_user)):
+    """
+    Update the signed-in user's profile
+    """
+    changes = update.model_dump(exclude_unset=True)
+    if not changes:
+        return user
+    
+    try:
+        query = get_supabase_client().table("profiles").update(changes).eq("id", user.id)
+        await run_blocking("supabase", query.execute)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error updating profile: {str(e)}"
+        )
+    finally:
+        # Even a failed update may have been applied; the next lookup rereads the row
+        profile_cache.invalidate(user.id)
+    
+    return user.model_copy(update=changes)
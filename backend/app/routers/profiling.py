@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict, List, Optional
+from ..services.offload import run_blocking
+from ..services.profiling import (
+    sampling_profiler, request_profiles, memory_tracker, token_matches,
+    ProfilerBusyError, PROFILING_MAX_SECONDS, PROFILING_SAMPLE_INTERVAL
+)
+
+async def require_profiling_token(x_profiling_token: Optional[str] = Header(None)) -> None:
+    """Every profiling route needs the PROFILING_TOKEN in the X-Profiling-Token header."""
+    if not token_matches(x_profiling_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token")
+
+router = APIRouter(dependencies=[Depends(require_profiling_token)])
+
+@router.get("/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0),
+    interval: float = Query(PROFILING_SAMPLE_INTERVAL, ge=0.001, le=1.0)
+):
+    """
+    Sample this worker's threads for `seconds` and return collapsed stacks
+    (feed them to flamegraph.pl or speedscope). The event loop keeps serving
+    while it runs, so the profile shows the worker under its real load.
+    """
+    try:
+        return await run_blocking("profiling", sampling_profiler.profile, min(seconds, PROFILING_MAX_SECONDS), interval)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.get("/requests")
+async def list_request_profiles() -> List[Dict[str, Any]]:
+    """Stored per-request profiles, newest first. Send X-Profile: 1 with a request to profile it."""
+    return request_profiles.list()
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls|time|calls)$"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    report = request_profiles.report(profile_id, sort, limit)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return report
+
+@router.post("/memory/start")
+async def start_memory_tracing(frames: int = Query(1, ge=1, le=50)) -> Dict[str, Any]:
+    """Start tracemalloc (recording `frames` frames per allocation) and take a baseline snapshot."""
+    return await run_blocking("profiling", memory_tracker.start, frames)
+
+@router.post("/memory/snapshot")
+async def take_memory_snapshot() -> Dict[str, Any]:
+    """Replace the baseline with the current allocations."""
+    try:
+        return await run_blocking("profiling", memory_tracker.snapshot)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.get("/memory/diff")
+async def diff_memory(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+) -> List[Dict[str, Any]]:
+    """Allocation growth since the baseline, largest first."""
+    try:
+        return await run_blocking("profiling", memory_tracker.diff, limit, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.post("/memory/stop")
+async def stop_memory_tracing() -> Dict[str, Any]:
+    return memory_tracker.stop()
@@ -1,88 +1,645 @@
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from ..services.supabase_client import get_supabase_client
+import asyncio
+import json
+import logging
+import os
+import time
+from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Dict, Any, Tuple
+from dotenv import load_dotenv
+from ..models.research import ResearchQuery, ResearchResult, PlatformStatus, ResearchResponse, ResearchJob
+from ..services.research_writer import research_writer
+from ..services.research_jobs import research_jobs
+from ..services.sentiment import fill_sentiment
+from ..services.dedup import deduplicate, normalize_url
+from ..services.ranking import rank_results
 from ..services.scrapers import twitter_scraper, reddit_scraper, quora_scraper
 from ..services.research_analyzer import analyze_research_data
+from ..services.research_cache import research_cache, normalize_query
+from ..services.singleflight import SingleFlight
+from ..services.offload import run_blocking
+from ..services.llm_analysis import llm_analyzer, LLM_ANALYSIS_ENABLED
+from ..services.resilience import get_guard, guard_status, CircuitOpenError
+from ..services.aggregation import ResearchAggregate
+from ..services.supabase_client import get_supabase_client
+from ..services.metrics import time_stage, observe_stage
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-class ResearchQuery(BaseModel):
-    query: str
-    platforms: List[str]
-    max_results: Optional[int] = 50
-
-class ResearchResult(BaseModel):
-    platform: str
-    source_url: str
-    content: str
-    author: Optional[str] = None
-    date: Optional[str] = None
-    engagement: Optional[Dict[str, Any]] = None
-    sentiment: Optional[str] = None
-
-class ResearchResponse(BaseModel):
-    results: List[ResearchResult]
-    analysis: Dict[str, Any]
-    summary: str
+# Scrapers in the order their results are returned
+PLATFORM_SCRAPERS = {
+    "twitter": twitter_scraper,
+    "reddit": reddit_scraper,
+    "quora": quora_scraper,
+}
+
+# Time budget (seconds) per platform; RESEARCH_<PLATFORM>_TIMEOUT overrides the default
+RESEARCH_PLATFORM_TIMEOUT = float(os.getenv("RESEARCH_PLATFORM_TIMEOUT", "10"))
+PLATFORM_TIMEOUTS = {
+    platform: float(os.getenv(f"RESEARCH_{platform.upper()}_TIMEOUT", RESEARCH_PLATFORM_TIMEOUT))
+    for platform in PLATFORM_SCRAPERS
+}
+
+# In-flight research runs, shared by concurrent identical searches
+research_flight = SingleFlight("research")
 
 @router.post("/search", response_model=ResearchResponse)
-async def search_platforms(query: ResearchQuery, background_tasks: BackgroundTasks):
+async def search_platforms(query: ResearchQuery):
     """
     Search across multiple platforms (Twitter, Reddit, Quora) for relevant content
     related to the query and analyze the results.
     """
     try:
-        results = []
+        # Concurrent identical searches share a single run, which also stores the
+        # results, so they are kept even if the caller that started it disconnects
+        response, _ = await research_flight.do(research_key(query), lambda: run_and_store_research(query))
+        return response
         
-        # Search across selected platforms
-        if "twitter" in query.platforms:
-            twitter_results = await twitter_scraper.search(query.query, max_results=query.max_results)
-            results.extend(twitter_results)
-            
-        if "reddit" in query.platforms:
-            reddit_results = await reddit_scraper.search(query.query, max_results=query.max_results)
-            results.extend(reddit_results)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error performing research: {str(e)}"
+        )
+
+@router.post("/refresh", response_model=ResearchResponse)
+async def refresh_research(query: ResearchQuery):
+    """
+    Incremental re-run of a stored query, for ideas that are monitored daily.
+    
+    Each platform is asked only for what appeared after its cursor from the
+    last stored run; the new results are deduplicated, scored and merged into
+    the stored ones, and the stored aggregate is extended with them instead of
+    being rebuilt. The merged results are re-ranked and cut back to
+    max_results, and the stored run is updated in place, so a query refreshed
+    daily keeps one row of bounded size. A query that was never stored gets a
+    full search.
+    """
+    try:
+        response, _ = await research_flight.do(("refresh", *research_key(query)), lambda: run_refresh(query))
+        return response
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error refreshing research: {str(e)}"
+        )
+
+@router.post("/search/stream")
+async def stream_search_platforms(query: ResearchQuery, background_tasks: BackgroundTasks, format: str = "ndjson"):
+    """
+    Streaming variant of /search: each result is sent as soon as its platform
+    yields it, followed by the analysis and summary as the final frame.
+    
+    `format` selects newline-delimited JSON ("ndjson") or Server-Sent Events ("sse").
+    """
+    if format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported stream format: {format}"
+        )
+    
+    media_type, encode = STREAM_FORMATS[format]
+    frames = stream_research(query, background_tasks)
+    
+    return StreamingResponse(
+        (encode(frame) async for frame in frames),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs", response_model=ResearchJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_research_job(query: ResearchQuery, request: Request, response: Response):
+    """
+    Queue a research query to run in the background, for searches too long for
+    one request (large max_results, every platform, LLM analysis).
+    
+    Poll the URL in the Location header for progress and the result.
+    """
+    job = await research_jobs.submit(query)
+    response.headers["Location"] = str(request.url_for("get_research_job", job_id=job.id))
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ResearchJob)
+async def get_research_job(job_id: str, request: Request):
+    """
+    Status, per-platform progress and (once finished) result of a research job.
+    
+    Responses carry an ETag that changes whenever the job does; a poll with a
+    matching If-None-Match gets an empty 304 without the job being loaded.
+    """
+    version = await research_jobs.version(job_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Research job not found")
+    
+    headers = {"ETag": job_etag(job_id, version), "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    loaded = await research_jobs.get(job_id)
+    if loaded is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Research job not found")
+    job, version = loaded
+    headers["ETag"] = job_etag(job_id, version)
+    return JSONResponse(job.model_dump(mode="json"), headers=headers)
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and memory usage of the research results cache."""
+    return {
+        **research_cache.stats(),
+        "single_flight": research_flight.stats(),
+        "llm": llm_analyzer.stats(),
+        "jobs": research_jobs.stats(),
+    }
+
+@router.get("/platforms/health")
+async def platform_health():
+    """Circuit breaker state and rate-limit headroom of each platform."""
+    for platform in PLATFORM_SCRAPERS:
+        get_guard(platform)
+    return guard_status()
+
+def job_etag(job_id: str, version: int) -> str:
+    return f'"{job_id}.{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def research_key(query: ResearchQuery) -> Tuple[Any, ...]:
+    """Identifies searches that would produce the same response."""
+    competitors = tuple(sorted(
+        (name, tuple(sorted(aliases))) for name, aliases in (query.competitors or {}).items()
+    ))
+    return normalize_query(query.query), tuple(sorted(set(query.platforms))), query.max_results, competitors
+
+async def search_all(
+    query: ResearchQuery,
+    since: Optional[Dict[str, str]] = None,
+    on_platform_status: Optional[Callable[[str, PlatformStatus], Awaitable[None]]] = None
+) -> Tuple[List[ResearchResult], Dict[str, PlatformStatus], Dict[str, str]]:
+    """
+    Search the selected platforms concurrently, each within its own time budget.
+    
+    Args:
+        query: The research query
+        since: Per-platform cursors; platforms that have one only return newer results
+        on_platform_status: Awaited with each platform's outcome as soon as that platform finishes
+    
+    Returns:
+        Tuple of (results, platform_status, cursors), the cursors advanced past what was fetched
+    """
+    since = since or {}
+    results = []
+    platform_status = {}
+    cursors = {}
+    
+    async def search(platform: str) -> Tuple[List[ResearchResult], PlatformStatus]:
+        platform_results, outcome = await search_platform(platform, query, since=since.get(platform))
+        if on_platform_status is not None:
+            await on_platform_status(platform, outcome)
+        return platform_results, outcome
+    
+    platforms = [platform for platform in PLATFORM_SCRAPERS if platform in query.platforms]
+    outcomes = await asyncio.gather(*(search(platform) for platform in platforms))
+    
+    for platform, (platform_results, outcome) in zip(platforms, outcomes):
+        results.extend(platform_results)
+        platform_status[platform] = outcome
+        cursor = platform_cursor(platform, platform_results, outcome, since.get(platform))
+        if cursor is not None:
+            cursors[platform] = cursor
+    
+    return results, platform_status, cursors
+
+def platform_cursor(platform: str, results: List[ResearchResult], outcome: PlatformStatus, previous: Optional[str] = None) -> Optional[str]:
+    """
+    A platform's cursor after a search. Only a complete, live answer advances
+    it: a partial one may have skipped results a refresh should still fetch.
+    """
+    if outcome.status != "ok" or outcome.stale:
+        return previous
+    return PLATFORM_SCRAPERS[platform].cursor(results, previous)
+
+async def run_research(
+    query: ResearchQuery,
+    on_platform_status: Optional[Callable[[str, PlatformStatus], Awaitable[None]]] = None
+) -> ResearchResponse:
+    """
+    Search the selected platforms and analyze what they return.
+    
+    on_platform_status, if given, is awaited with each platform's outcome as
+    soon as that platform finishes (research jobs record it as progress).
+    """
+    results, platform_status, cursors = await search_all(query, on_platform_status=on_platform_status)
+    
+    results, analysis, summary = await analyze_results(results, query)
+    
+    return ResearchResponse(
+        results=results,
+        analysis=analysis,
+        summary=summary,
+        platform_status=platform_status,
+        cursors=cursors
+    )
+
+async def run_and_store_research(
+    query: ResearchQuery,
+    on_platform_status: Optional[Callable[[str, PlatformStatus], Awaitable[None]]] = None
+) -> ResearchResponse:
+    """Run the research and queue its results for storage."""
+    response = await run_research(query, on_platform_status)
+    await store_research_results(query=query.query, results=response.results, analysis=response.analysis, cursors=response.cursors)
+    return response
+
+async def run_research_job(
+    query: ResearchQuery,
+    on_platform_status: Callable[[str, PlatformStatus], Awaitable[None]]
+) -> ResearchResponse:
+    """Job handler for research_jobs: run the research and store its results."""
+    return await run_and_store_research(query, on_platform_status)
+
+async def run_refresh(query: ResearchQuery) -> ResearchResponse:
+    """
+    Incremental research run for /refresh; stores the merged results when anything changed.
+    
+    The aggregate (and so the analysis' counts and distributions) covers every
+    result the query has fetched, including ones since ranked out of the
+    stored max_results.
+    """
+    stored = await load_stored_research(query.query)
+    if stored is None:
+        return await run_and_store_research(query)
+    
+    stored_results = [ResearchResult(**item) for item in stored.get("results") or []]
+    # Rows written before the cursors column existed, or by a platform with nothing to go on, have no cursor
+    stored_cursors = {platform: cursor for platform, cursor in (stored.get("cursors") or {}).items() if cursor is not None}
+    
+    results, platform_status, cursors = await search_all(query, since=stored_cursors)
+    cursors = {**stored_cursors, **cursors}
+    
+    # A result is new unless it (or a duplicate of it) was stored before
+    seen = {normalize_url(url) for result in stored_results for url in (result.source_url, *result.duplicate_urls)}
+    results = [result for result in results if normalize_url(result.source_url) not in seen]
+    
+    # Only the new results are deduplicated, ranked and scored; the stored ones were when they were fetched
+    fetched = len(results)
+    results, duplicates_removed = await prepare_results(results, query)
+    
+    aggregate = await run_blocking("analysis", merge_aggregate, stored.get("aggregate"), stored_results, results)
+    
+    # Stored and new results compete for the max_results places, so the stored set doesn't grow with every refresh
+    with time_stage("ranking"):
+        merged = await run_blocking("analysis", rank_results, query.query, stored_results + results, query.max_results)
+    analysis, summary = await analyze_prepared(merged, query, aggregate)
+    analysis["duplicates_removed"] = duplicates_removed
+    analysis["results_trimmed"] = fetched - duplicates_removed + len(stored_results) - len(merged)
+    analysis["new_results"] = len(results)
+    
+    if results or cursors != stored_cursors:
+        await update_stored_research(stored, query.query, merged, analysis, cursors, aggregate)
+    
+    return ResearchResponse(
+        results=merged,
+        analysis=analysis,
+        summary=summary,
+        platform_status=platform_status,
+        cursors=cursors
+    )
+
+def merge_aggregate(stored: Optional[Dict[str, Any]], stored_results: List[ResearchResult], results: List[ResearchResult]) -> ResearchAggregate:
+    """The stored aggregate extended with the new results (rows stored without one are rebuilt once)."""
+    base = ResearchAggregate.from_dict(stored) if stored else ResearchAggregate.from_results(stored_results)
+    return base.merge(ResearchAggregate.from_results(results))
+
+async def load_stored_research(query: str) -> Optional[Dict[str, Any]]:
+    """
+    The most recent stored run of a query, with its results, cursors and
+    aggregate; None if there is none or it can't be loaded.
+    """
+    try:
+        select = (
+            get_supabase_client().table("research_results")
+            .select("id, results, cursors, aggregate, created_at")
+            .eq("query", query)
+            .order("created_at", desc=True)
+            .limit(1)
+        )
+        with time_stage("db.read"):
+            response = await run_blocking("supabase", select.execute)
+    except Exception as e:
+        logger.warning("Could not load stored research for a refresh, running a full search: %s", e)
+        return None
+    return response.data[0] if response.data else None
+
+async def update_stored_research(
+    stored: Dict[str, Any],
+    query: str,
+    results: List[ResearchResult],
+    analysis: Dict[str, Any],
+    cursors: Dict[str, str],
+    aggregate: ResearchAggregate
+) -> None:
+    """
+    Replace the stored run a refresh started from with the refreshed one.
+    
+    If that row can't be updated, the refreshed run is queued as a new row
+    instead, so it isn't lost.
+    """
+    row = {
+        "results": [result.model_dump() for result in results],
+        "analysis": analysis,
+        "cursors": cursors,
+        "aggregate": aggregate.to_dict()
+    }
+    if stored.get("id") is not None:
+        try:
+            update = get_supabase_client().table("research_results").update(row).eq("id", stored["id"])
+            with time_stage("db.write"):
+                await run_blocking("supabase", update.execute)
+            return
+        except Exception as e:
+            logger.warning("Could not update the stored research, storing the refresh as a new row: %s", e)
+    research_writer.enqueue(query, results, analysis, cursors=cursors, aggregate=aggregate)
+
+async def analyze_results(results: List[ResearchResult], query: ResearchQuery) -> Tuple[List[ResearchResult], Dict[str, Any], str]:
+    """
+    Post-process the combined results of all platforms and analyze them.
+    
+    Args:
+        results: Combined results of every platform
+        query: The research query; its competitors (or the configured
+            dictionary) are looked for in the results
+    
+    Returns:
+        Tuple of (results, analysis_dict, summary_text)
+    """
+    total = len(results)
+    results, duplicates_removed = await prepare_results(results, query)
+    
+    analysis, summary = await analyze_prepared(results, query)
+    analysis["duplicates_removed"] = duplicates_removed
+    analysis["results_trimmed"] = total - duplicates_removed - len(results)
+    
+    return results, analysis, summary
+
+async def prepare_results(results: List[ResearchResult], query: ResearchQuery) -> Tuple[List[ResearchResult], int]:
+    """
+    Deduplicate, rank and score freshly fetched results.
+    
+    Returns:
+        Tuple of (results, number of duplicates removed)
+    """
+    # The stages below are CPU-bound, so they run in the analysis pool rather than on the event loop
+    total = len(results)
+    
+    # The same post often shows up on several platforms; keep one per cluster
+    with time_stage("dedup"):
+        results = await run_blocking("analysis", deduplicate, results)
+    duplicates_removed = total - len(results)
+    
+    # Keep only the max_results most relevant results for analysis and the response
+    with time_stage("ranking"):
+        results = await run_blocking("analysis", rank_results, query.query, results, query.max_results)
+    
+    # Score sentiment locally for results the scrapers left unlabelled
+    with time_stage("sentiment"):
+        await fill_sentiment(results)
+    
+    return results, duplicates_removed
+
+async def analyze_prepared(
+    results: List[ResearchResult],
+    query: ResearchQuery,
+    aggregate: Optional[ResearchAggregate] = None
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Analyze prepared results; aggregate, if given, is their precomputed aggregate.
+    
+    Returns:
+        Tuple of (analysis_dict, summary_text)
+    """
+    # Analyze the research data
+    with time_stage("analysis"):
+        analysis, summary = await run_blocking("analysis", analyze_research_data, results, query.competitors, aggregate)
+    
+    # Map-reduce LLM analysis; the heuristic summary stays if it is disabled or fails
+    if LLM_ANALYSIS_ENABLED and results:
+        try:
+            with time_stage("llm_analysis"):
+                llm_analysis = await llm_analyzer.analyze(query.query, results)
+        except Exception as e:
+            logger.warning("LLM analysis failed, using the heuristic summary: %s", e)
+        else:
+            summary = llm_analysis.pop("summary") or summary
+            analysis.update(llm_analysis)
+    
+    return analysis, summary
+
+async def search_platform(
+    platform: str,
+    query: ResearchQuery,
+    on_result: Optional[Callable[[ResearchResult], None]] = None,
+    since: Optional[str] = None
+) -> Tuple[List[ResearchResult], PlatformStatus]:
+    """
+    Search a single platform within its time budget, serving from the research
+    cache when the same query was fetched recently.
+    
+    Each result is also passed to on_result as soon as the scraper yields it, so
+    streaming callers can forward it before the platform has finished. A
+    platform that misses its deadline or raises keeps whatever it yielded so far
+    instead of failing the whole request; the returned PlatformStatus records
+    what happened.
+    
+    Calls go through the platform's guard (rate limit, retries, circuit
+    breaker). While the breaker is open the platform isn't called at all; then,
+    as after any failure that yielded nothing, expired cached results for the
+    query are served if there are any.
+    
+    The deadline starts once the guard has admitted the call, so time spent
+    queued for a rate-limit token isn't held against the platform.
+    
+    With a since cursor only newer results are fetched; those are specific to
+    the cursor, so the cache is bypassed.
+    """
+    scraper = PLATFORM_SCRAPERS[platform]
+    guard = get_guard(platform)
+    timeout = PLATFORM_TIMEOUTS[platform]
+    started = time.perf_counter()
+    
+    cached = await research_cache.get(platform, query.query, query.max_results) if since is None else None
+    if cached is not None:
+        if on_result is not None:
+            for result in cached:
+                on_result(result)
+        return cached, PlatformStatus(
+            status="ok",
+            result_count=len(cached),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+            cached=True
+        )
+    
+    results = []
+    error = None
+    failure = None
+    scrape_started = started
+    
+    try:
+        # Waiting for the breaker and a rate-limit token is local queueing, not the platform being slow
+        await guard.admit()
+        scrape_started = time.perf_counter()
+        async with asyncio.timeout(timeout):
+            async for result in guard.stream(lambda: scraper.stream(query.query, max_results=query.max_results, since=since)):
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        outcome = "ok"
+    except CircuitOpenError as e:
+        outcome = "circuit_open"
+        error = str(e)
+    except asyncio.TimeoutError:
+        outcome = "timed_out"
+        error = f"No response within {timeout:g}s"
+    except Exception as e:
+        outcome = "failed"
+        error = str(e)
+        failure = e
+    
+    # Platforms the breaker fast-failed weren't searched, so they don't count towards its latency
+    if outcome != "circuit_open":
+        observe_stage(f"scrape.{platform}", outcome, time.perf_counter() - scrape_started)
+    
+    # Only complete answers are cached; a timeout or failure is retried next time
+    if outcome == "ok":
+        guard.record_success()
+        if since is None:
+            await research_cache.set(platform, query.query, query.max_results, results)
+    elif outcome != "circuit_open":
+        guard.record_failure(failure)
+    
+    stale = None
+    if outcome != "ok" and not results and since is None:
+        stale = await research_cache.get(platform, query.query, query.max_results, allow_stale=True)
+        if stale:
+            results = stale
+            if on_result is not None:
+                for result in stale:
+                    on_result(result)
+    
+    return results, PlatformStatus(
+        status=outcome,
+        result_count=len(results),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        error=error,
+        cached=bool(stale),
+        stale=bool(stale)
+    )
+
+async def stream_research(query: ResearchQuery, background_tasks: BackgroundTasks) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Search the selected platforms concurrently and yield frames as they happen:
+    a "result" frame per result, a "platform_status" frame when each platform
+    finishes, and a final "analysis" frame with the analysis and summary.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    platforms = [platform for platform in PLATFORM_SCRAPERS if platform in query.platforms]
+    
+    async def run(platform: str) -> None:
+        try:
+            _, outcome = await search_platform(
+                platform,
+                query,
+                on_result=lambda result: queue.put_nowait(("result", platform, result))
+            )
+        except Exception as e:
+            outcome = PlatformStatus(status="failed", elapsed_ms=0, error=str(e))
+        queue.put_nowait(("status", platform, outcome))
+    
+    tasks = [asyncio.create_task(run(platform)) for platform in platforms]
+    results = []
+    platform_results = {platform: [] for platform in platforms}
+    platform_status = {}
+    
+    try:
+        while len(platform_status) < len(platforms):
+            # Everything that arrived while the last frames were sent is handled together, so
+            # sentiment is scored one batch per platform rather than one result at a time
+            frames = [await queue.get()]
+            while not queue.empty():
+                frames.append(queue.get_nowait())
+            await asyncio.gather(*(
+                fill_sentiment([payload for kind, source, payload in frames if kind == "result" and source == platform])
+                for platform in {platform for kind, platform, _ in frames if kind == "result"}
+            ))
             
-        if "quora" in query.platforms:
-            quora_results = await quora_scraper.search(query.query, max_results=query.max_results)
-            results.extend(quora_results)
+            for kind, platform, payload in frames:
+                if kind == "result":
+                    results.append(payload)
+                    platform_results[platform].append(payload)
+                    yield {"type": "result", "platform": platform, "data": payload.model_dump()}
+                else:
+                    platform_status[platform] = payload
+                    yield {"type": "platform_status", "platform": platform, "data": payload.model_dump()}
         
-        # Analyze the research data
-        analysis, summary = analyze_research_data(results)
+        results, analysis, summary = await analyze_results(results, query)
+        cursors = {}
+        for platform, outcome in platform_status.items():
+            cursor = platform_cursor(platform, platform_results[platform], outcome)
+            if cursor is not None:
+                cursors[platform] = cursor
         
-        # Store results in background (don't wait for completion)
+        # Store results in background once the stream has been sent
         background_tasks.add_task(
             store_research_results,
             query=query.query,
-            results=results,
-            analysis=analysis
-        )
-        
-        return ResearchResponse(
             results=results,
             analysis=analysis,
-            summary=summary
+            cursors=cursors
         )
         
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error performing research: {str(e)}"
-        )
+        yield {
+            "type": "analysis",
+            "analysis": analysis,
+            "summary": summary,
+            "platform_status": {platform: outcome.model_dump() for platform, outcome in platform_status.items()},
+            "cursors": cursors
+        }
+    finally:
+        # The client may disconnect mid-stream; stop searching on its behalf
+        for task in tasks:
+            task.cancel()
+
+def encode_ndjson(frame: Dict[str, Any]) -> str:
+    return json.dumps(frame, default=str) + "\n"
+
+def encode_sse(frame: Dict[str, Any]) -> str:
+    return f"event: {frame['type']}\ndata: {json.dumps(frame, default=str)}\n\n"
 
-async def store_research_results(query: str, results: List[ResearchResult], analysis: Dict[str, Any]):
-    """Store research results in the database"""
-    supabase = get_supabase_client()
+STREAM_FORMATS = {
+    "ndjson": ("application/x-ndjson", encode_ndjson),
+    "sse": ("text/event-stream", encode_sse),
+}
+
+async def store_research_results(
+    query: str,
+    results: List[ResearchResult],
+    analysis: Dict[str, Any],
+    cursors: Optional[Dict[str, str]] = None
+):
+    """
+    Store research results in the database, with the platform cursors a
+    later refresh continues from.
     
-    # Store in Supabase
-    try:
-        supabase.table("research_results").insert({
-            "query": query,
-            "results": results,
-            "analysis": analysis,
-            "created_at": "now()"
-        }).execute()
-    except Exception as e:
-        print(f"Error storing research results: {str(e)}")
-        # Log error but don't fail the request 
\ No newline at end of file
+    Rows go through the write-behind queue, which inserts them in batches and
+    keeps them on local disk if Supabase is unreachable.
+    """
+    research_writer.enqueue(query, results, analysis, cursors=cursors)
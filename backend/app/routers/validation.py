@@ -1,28 +1,27 @@
+import asyncio
+import json
+import os
 from fastapi import APIRouter, HTTPException, Depends, status
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from dotenv import load_dotenv
+from ..models.validation import IdeaInput, BatchIdeaInput, InterviewQuestion, ValidationResponse
 from ..services.supabase_client import get_supabase_client
 from ..services.mom_test_analyzer import analyze_idea, generate_interview_questions
+from ..services.singleflight import SingleFlight
 
-router = APIRouter()
+# Load environment variables
+load_dotenv()
 
-class IdeaInput(BaseModel):
-    idea_name: str
-    problem_statement: str
-    target_audience: str
-    solution: str
-    value_proposition: str
+router = APIRouter()
 
-class InterviewQuestion(BaseModel):
-    question: str
-    explanation: str
-    category: str
+# Ideas analyzed at the same time within one batch, and the largest batch accepted
+VALIDATION_BATCH_CONCURRENCY = int(os.getenv("VALIDATION_BATCH_CONCURRENCY", "8"))
+VALIDATION_BATCH_MAX_IDEAS = int(os.getenv("VALIDATION_BATCH_MAX_IDEAS", "500"))
 
-class ValidationResponse(BaseModel):
-    interview_questions: List[InterviewQuestion]
-    analysis: Dict[str, Any]
-    recommendations: List[str]
-    research_topics: List[str]
+# In-flight analyses, shared by concurrent submissions of the same idea
+validation_flight = SingleFlight("validation")
 
 @router.post("/analyze", response_model=ValidationResponse)
 async def validate_idea(idea: IdeaInput):
@@ -31,47 +30,143 @@ async def validate_idea(idea: IdeaInput):
     appropriate interview questions and recommendations.
     """
     try:
-        # Analyze the idea based on Mom Test principles
-        analysis = analyze_idea(
+        return await validate(idea)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error analyzing idea: {str(e)}"
+        )
+
+@router.post("/analyze/batch")
+async def validate_ideas(batch: BatchIdeaInput):
+    """
+    Analyze many ideas in one request.
+    
+    Results are streamed as newline-delimited JSON in the order they complete,
+    one frame per idea: {"index", "status": "ok", "data"} or {"index", "status":
+    "error", "error"}. A final {"status": "done"} frame carries the counts.
+    """
+    if len(batch.ideas) > VALIDATION_BATCH_MAX_IDEAS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch can hold at most {VALIDATION_BATCH_MAX_IDEAS} ideas"
+        )
+    
+    return StreamingResponse(
+        (json.dumps(frame, default=str) + "\n" async for frame in stream_validations(batch.ideas)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def idea_key(idea: IdeaInput) -> tuple:
+    """Identifies submissions that differ only in case or whitespace."""
+    return tuple(" ".join(value.lower().split()) for value in idea.model_dump().values())
+
+async def validate(idea: IdeaInput) -> ValidationResponse:
+    """
+    Analyze an idea, sharing the analysis with concurrent submissions of the same idea.
+    
+    Only the analysis is shared; the response is assembled from this caller's
+    own idea, so its wording comes back as submitted.
+    """
+    assessment, _ = await validation_flight.do(idea_key(idea), lambda: assess_idea(idea))
+    return build_validation(idea, assessment)
+
+async def assess_idea(idea: IdeaInput) -> Tuple[Dict[str, Any], List[InterviewQuestion]]:
+    """
+    The Mom Test analysis of an idea and its interview questions: the part of a
+    validation that doesn't depend on how the idea is capitalized or spaced.
+    """
+    # Analyze the idea based on Mom Test principles and generate interview questions, concurrently
+    analysis, interview_questions = await asyncio.gather(
+        analyze_idea(
             idea_name=idea.idea_name,
             problem_statement=idea.problem_statement,
             target_audience=idea.target_audience,
             solution=idea.solution,
             value_proposition=idea.value_proposition
-        )
-        
-        # Generate interview questions
-        interview_questions = generate_interview_questions(
+        ),
+        generate_interview_questions(
             problem_area=idea.problem_statement,
             target_audience=idea.target_audience
         )
+    )
+    
+    return analysis, interview_questions
+
+def build_validation(idea: IdeaInput, assessment: Tuple[Dict[str, Any], List[InterviewQuestion]]) -> ValidationResponse:
+    """Assemble the response for an idea from its (possibly shared) assessment."""
+    analysis, interview_questions = assessment
+    
+    # Generate research topics based on the idea
+    research_topics = [
+        f"{idea.target_audience} problems with {idea.problem_statement}",
+        f"alternatives to {idea.solution}",
+        f"why {idea.target_audience} don't use existing solutions",
+        f"{idea.target_audience} communities online"
+    ]
+    
+    # Generate recommendations
+    recommendations = [
+        "Conduct at least 10 customer interviews using the provided questions",
+        "Focus on learning about their problems, not pitching your solution",
+        "Look for specific examples of how they've tried to solve this problem before",
+        "Pay attention to emotional responses and strong reactions",
+        "Ask about their current spending on related solutions"
+    ]
+    
+    return ValidationResponse(
+        interview_questions=interview_questions,
+        analysis=analysis,
+        recommendations=recommendations,
+        research_topics=research_topics
+    )
+
+async def stream_validations(items: List[Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Validate and analyze each item of a batch, yielding a frame per item as it
+    completes and a final "done" frame with the counts.
+    
+    Items that are the same idea up to case and whitespace share one
+    assessment, as in validate(), but each gets a response built from its own
+    fields. At most VALIDATION_BATCH_CONCURRENCY assessments run at a time.
+    """
+    failed = 0
+    groups: Dict[tuple, List[Tuple[int, IdeaInput]]] = {}
+    
+    for index, item in enumerate(items):
+        try:
+            idea = IdeaInput.model_validate(item)
+        except ValidationError as e:
+            failed += 1
+            yield {"index": index, "status": "error", "error": str(e)}
+            continue
+        groups.setdefault(idea_key(idea), []).append((index, idea))
+    
+    semaphore = asyncio.Semaphore(VALIDATION_BATCH_CONCURRENCY)
+    
+    async def assess(key: tuple) -> tuple:
+        async with semaphore:
+            try:
+                assessment, _ = await validation_flight.do(key, lambda: assess_idea(groups[key][0][1]))
+                return key, assessment, None
+            except Exception as e:
+                return key, None, str(e)
+    
+    tasks = [asyncio.create_task(assess(key)) for key in groups]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            key, assessment, error = await next_done
+            for index, idea in groups[key]:
+                if error is None:
+                    yield {"index": index, "status": "ok", "data": build_validation(idea, assessment).model_dump()}
+                else:
+                    failed += 1
+                    yield {"index": index, "status": "error", "error": f"Error analyzing idea: {error}"}
         
-        # Generate research topics based on the idea
-        research_topics = [
-            f"{idea.target_audience} problems with {idea.problem_statement}",
-            f"alternatives to {idea.solution}",
-            f"why {idea.target_audience} don't use existing solutions",
-            f"{idea.target_audience} communities online"
-        ]
-        
-        # Generate recommendations
-        recommendations = [
-            "Conduct at least 10 customer interviews using the provided questions",
-            "Focus on learning about their problems, not pitching your solution",
-            "Look for specific examples of how they've tried to solve this problem before",
-            "Pay attention to emotional responses and strong reactions",
-            "Ask about their current spending on related solutions"
-        ]
-        
-        return ValidationResponse(
-            interview_questions=interview_questions,
-            analysis=analysis,
-            recommendations=recommendations,
-            research_topics=research_topics
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error analyzing idea: {str(e)}"
-        ) 
\ No newline at end of file
+        yield {"status": "done", "total": len(items), "succeeded": len(items) - failed, "failed": failed}
+    finally:
+        # A client that disconnects mid-stream stops the batch's remaining analyses
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,243 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from ..models.research import ResearchResult
+
+SENTIMENTS = ("positive", "neutral", "negative", "unknown")
+_SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+_UNKNOWN = _SENTIMENT_CODES["unknown"]
+
+# Engagement counters the scrapers report, one column each
+ENGAGEMENT_METRICS = ("likes", "retweets", "replies", "upvotes", "comments")
+_METRIC_COLUMNS = {metric: column for column, metric in enumerate(ENGAGEMENT_METRICS)}
+
+PERCENTILES = (50, 90, 99)
+
+# Spans longer than this are bucketed by week instead of by day
+_DAILY_BUCKET_MAX_DAYS = 90
+
+def _timestamp(date: Optional[str]) -> float:
+    if not date:
+        return np.nan
+    try:
+        parsed = datetime.fromisoformat(date)
+    except ValueError:
+        return np.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class ResearchAggregate:
+    """
+    Columnar, mergeable view of a set of research results.
+
+    One pass over the results fills NumPy columns (platform code, sentiment
+    code, timestamp and one column per engagement metric); every statistic in
+    to_analysis() is then computed on whole columns. Aggregates built from
+    separate batches can be combined with merge() without revisiting the
+    original results.
+    """
+
+    def __init__(
+        self,
+        platforms: List[str],
+        platform_codes: np.ndarray,
+        sentiment_codes: np.ndarray,
+        timestamps: np.ndarray,
+        engagement: np.ndarray
+    ):
+        self.platforms = platforms
+        self.platform_codes = platform_codes
+        self.sentiment_codes = sentiment_codes
+        self.timestamps = timestamps
+        # Shape (n, len(ENGAGEMENT_METRICS)); NaN where a platform doesn't report a metric
+        self.engagement = engagement
+
+    def __len__(self) -> int:
+        return len(self.platform_codes)
+
+    @classmethod
+    def empty(cls) -> "ResearchAggregate":
+        return cls(
+            [],
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.float64),
+            np.empty((0, len(ENGAGEMENT_METRICS)), dtype=np.float64)
+        )
+
+    @classmethod
+    def from_results(cls, results: Iterable[ResearchResult]) -> "ResearchAggregate":
+        """Build the columns in a single pass over the results."""
+        platforms: Dict[str, int] = {}
+        platform_codes = []
+        sentiment_codes = []
+        timestamps = []
+        engagement = []
+        no_engagement = [np.nan] * len(ENGAGEMENT_METRICS)
+
+        for result in results:
+            platform_codes.append(platforms.setdefault(result.platform, len(platforms)))
+            sentiment_codes.append(_SENTIMENT_CODES.get(result.sentiment or "unknown", _UNKNOWN))
+            timestamps.append(_timestamp(result.date))
+
+            row = list(no_engagement)
+            for metric, value in (result.engagement or {}).items():
+                column = _METRIC_COLUMNS.get(metric)
+                if column is not None and isinstance(value, (int, float)):
+                    row[column] = value
+            engagement.append(row)
+
+        if not platform_codes:
+            return cls.empty()
+
+        return cls(
+            list(platforms),
+            np.array(platform_codes, dtype=np.int32),
+            np.array(sentiment_codes, dtype=np.int8),
+            np.array(timestamps, dtype=np.float64),
+            np.array(engagement, dtype=np.float64)
+        )
+
+    def merge(self, other: "ResearchAggregate") -> "ResearchAggregate":
+        """Combine two aggregates into a new one, as if built from both result sets."""
+        platforms = list(self.platforms)
+        remap = np.empty(len(other.platforms), dtype=np.int32)
+        for code, platform in enumerate(other.platforms):
+            if platform not in platforms:
+                platforms.append(platform)
+            remap[code] = platforms.index(platform)
+
+        return ResearchAggregate(
+            platforms,
+            np.concatenate([self.platform_codes, remap[other.platform_codes]]),
+            np.concatenate([self.sentiment_codes, other.sentiment_codes]),
+            np.concatenate([self.timestamps, other.timestamps]),
+            np.concatenate([self.engagement, other.engagement])
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form of the columns (NaN becomes null), for storing alongside the results."""
+        def column(values: np.ndarray) -> List[Any]:
+            return np.where(np.isnan(values), None, values).tolist()
+
+        return {
+            "platforms": list(self.platforms),
+            "platform_codes": self.platform_codes.tolist(),
+            "sentiment_codes": self.sentiment_codes.tolist(),
+            "timestamps": column(self.timestamps),
+            "engagement": {metric: column(self.engagement[:, index]) for index, metric in enumerate(ENGAGEMENT_METRICS)},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResearchAggregate":
+        """Inverse of to_dict(); metrics missing from the stored form are NaN."""
+        count = len(data["platform_codes"])
+        stored = data.get("engagement") or {}
+        engagement = np.full((count, len(ENGAGEMENT_METRICS)), np.nan)
+        for index, metric in enumerate(ENGAGEMENT_METRICS):
+            if metric in stored:
+                engagement[:, index] = np.array(stored[metric], dtype=np.float64)
+
+        return cls(
+            list(data["platforms"]),
+            np.array(data["platform_codes"], dtype=np.int32),
+            np.array(data["sentiment_codes"], dtype=np.int8),
+            np.array(data["timestamps"], dtype=np.float64),
+            engagement
+        )
+
+    @classmethod
+    def merge_all(cls, aggregates: Iterable["ResearchAggregate"]) -> "ResearchAggregate":
+        merged = cls.empty()
+        for aggregate in aggregates:
+            merged = merged.merge(aggregate)
+        return merged
+
+    def to_analysis(self) -> Dict[str, Any]:
+        """
+        Compute distributions, engagement-weighted sentiment, engagement
+        percentiles and time buckets.
+        """
+        platform_counts = np.bincount(self.platform_codes, minlength=len(self.platforms))
+        sentiment_counts = np.bincount(self.sentiment_codes, minlength=len(SENTIMENTS))
+
+        return {
+            "total_results": len(self),
+            "platform_distribution": {
+                platform: int(count) for platform, count in zip(self.platforms, platform_counts)
+            },
+            "sentiment_analysis": {
+                sentiment: int(count) for sentiment, count in zip(SENTIMENTS, sentiment_counts)
+            },
+            "engagement_weighted_sentiment": self._weighted_sentiment(),
+            "engagement": self._engagement_stats(),
+            "time_buckets": self._time_buckets(),
+        }
+
+    def _weights(self) -> np.ndarray:
+        # Every result counts at least once; engagement adds to that
+        return 1.0 + np.nansum(self.engagement, axis=1)
+
+    def _weighted_sentiment(self) -> Dict[str, Any]:
+        weights = self._weights()
+        totals = np.bincount(self.sentiment_codes, weights=weights, minlength=len(SENTIMENTS))
+        known = totals[:_UNKNOWN].sum()
+        shares = totals[:_UNKNOWN] / known if known else np.zeros(_UNKNOWN)
+
+        positive, _, negative = shares
+        return {
+            "distribution": {sentiment: round(float(share), 4) for sentiment, share in zip(SENTIMENTS, shares)},
+            # -1 (all negative) .. 1 (all positive), weighted by engagement
+            "net_score": round(float(positive - negative), 4),
+        }
+
+    def _engagement_stats(self) -> Dict[str, Dict[str, float]]:
+        present = ~np.isnan(self.engagement)
+        counts = present.sum(axis=0)
+        totals = np.nansum(self.engagement, axis=0)
+
+        stats = {}
+        for column, metric in enumerate(ENGAGEMENT_METRICS):
+            if not counts[column]:
+                continue
+            values = self.engagement[present[:, column], column]
+            percentiles = np.percentile(values, PERCENTILES)
+            stats[metric] = {
+                "total": float(totals[column]),
+                "mean": round(float(totals[column] / counts[column]), 2),
+                **{f"p{p}": round(float(value), 2) for p, value in zip(PERCENTILES, percentiles)},
+            }
+        return stats
+
+    def _time_buckets(self) -> Dict[str, Any]:
+        dated = ~np.isnan(self.timestamps)
+        if not dated.any():
+            return {"interval": None, "buckets": []}
+
+        days = np.floor(self.timestamps[dated] / 86400).astype(np.int64)
+        if days.max() - days.min() > _DAILY_BUCKET_MAX_DAYS:
+            interval = "week"
+            # 1970-01-01 was a Thursday; shift so buckets start on Monday
+            buckets = (days + 3) // 7 * 7 - 3
+        else:
+            interval = "day"
+            buckets = days
+
+        starts, inverse, counts = np.unique(buckets, return_inverse=True, return_counts=True)
+        codes = self.sentiment_codes[dated]
+        positive = np.bincount(inverse, weights=codes == _SENTIMENT_CODES["positive"], minlength=len(starts))
+        negative = np.bincount(inverse, weights=codes == _SENTIMENT_CODES["negative"], minlength=len(starts))
+
+        return {
+            "interval": interval,
+            "buckets": [
+                {
+                    "start": str(np.datetime64(int(start), "D")),
+                    "count": int(count),
+                    "positive": int(pos),
+                    "negative": int(neg),
+                }
+                for start, count, pos, neg in zip(starts, counts, positive, negative)
+            ],
+        }
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from .http_client import get_http_client
+from .supabase_client import SUPABASE_URL
+from .metrics import count_cache_lookup
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Legacy HS256 projects sign access tokens with the project's JWT secret
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
+
+# Projects with asymmetric signing keys publish them here; set to "" to trust only the secret
+SUPABASE_JWKS_URL = os.getenv(
+    "SUPABASE_JWKS_URL",
+    f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json" if SUPABASE_URL else ""
+)
+
+# The signing keys are refetched every JWKS_REFRESH_INTERVAL seconds in the background, and at most
+# every JWKS_MIN_REFRESH_INTERVAL seconds when a token names a key we don't have (a key rotation)
+JWKS_REFRESH_INTERVAL = float(os.getenv("JWKS_REFRESH_INTERVAL", "600"))
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+
+# Audience and issuer Supabase puts in user access tokens, and clock skew tolerated on exp/nbf/iat (seconds)
+JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "authenticated")
+JWT_ISSUER = os.getenv("JWT_ISSUER", f"{SUPABASE_URL.rstrip('/')}/auth/v1" if SUPABASE_URL else "")
+JWT_LEEWAY = int(os.getenv("JWT_LEEWAY", "30"))
+
+# Profiles are kept PROFILE_CACHE_TTL seconds, for at most PROFILE_CACHE_SIZE users
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+
+# Algorithms a JWK of each key type may sign with, for keys that don't name their own "alg"
+_KEY_TYPE_ALGORITHMS = {
+    "RSA": frozenset({"RS256", "RS384", "RS512"}),
+    "EC": frozenset({"ES256", "ES384", "ES512"}),
+}
+_ASYMMETRIC_ALGORITHMS = frozenset().union(*_KEY_TYPE_ALGORITHMS.values())
+
+class InvalidTokenError(ValueError):
+    """Raised when an access token is malformed, expired, or not signed by Supabase."""
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally, without an Auth round trip.
+
+    HS256 tokens are checked against SUPABASE_JWT_SECRET; asymmetrically signed
+    tokens against the project's JWKS, which is cached and refreshed in the
+    background so verification never waits on the network. A token signed with
+    a key we haven't seen yet triggers one early refresh (rate limited), which
+    is how key rotations are picked up. The algorithm a token claims must be
+    the one its key is published for, so the unverified header can't pick it.
+    """
+
+    def __init__(
+        self,
+        secret: str = SUPABASE_JWT_SECRET,
+        jwks_url: str = SUPABASE_JWKS_URL,
+        audience: str = JWT_AUDIENCE,
+        issuer: str = JWT_ISSUER,
+        leeway: int = JWT_LEEWAY,
+        refresh_interval: float = JWKS_REFRESH_INTERVAL
+    ):
+        self.secret = secret
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        self.refresh_interval = refresh_interval
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        # Parsed keys by (kid, alg), so each JWK is only turned into a key object once
+        self._parsed: Dict[Tuple[str, str], Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"verified": 0, "rejected": 0, "jwks_refreshes": 0, "jwks_errors": 0}
+
+    async def start(self) -> None:
+        """Keep the signing keys fresh in the background; called from the FastAPI lifespan."""
+        if not self.jwks_url or self._task is not None:
+            return
+        # The first fetch doesn't hold up startup; tokens checked meanwhile wait for it
+        self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh_keys(self) -> bool:
+        """Refetch the JWKS; on failure the previous keys stay in use. Returns whether it succeeded."""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+
+        async with self._refresh_lock:
+            self._fetched_at = time.monotonic()
+            try:
+                response = await get_http_client().get(self.jwks_url)
+                response.raise_for_status()
+                keys = response.json().get("keys") or []
+            except Exception as e:
+                self._stats["jwks_errors"] += 1
+                logger.warning("Could not fetch signing keys from %s: %s", self.jwks_url, e)
+                return False
+
+            self._keys = {key["kid"]: key for key in keys if "kid" in key}
+            self._parsed = {}
+            self._stats["jwks_refreshes"] += 1
+            return True
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Check a token's signature, expiry, audience and issuer.
+
+        Returns:
+            The token's claims (sub is the user id)
+
+        Raises:
+            InvalidTokenError: The token must be rejected
+        """
+        # Imported here so python-jose only loads once a token is actually checked
+        from jose import jwt, JWTError
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key, algorithm = await self._signing_key(header)
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                issuer=self.issuer or None,
+                options={"leeway": self.leeway}
+            )
+        except (JWTError, KeyError, InvalidTokenError) as e:
+            self._stats["rejected"] += 1
+            raise InvalidTokenError(str(e) or "Invalid token") from e
+
+        if not claims.get("sub"):
+            self._stats["rejected"] += 1
+            raise InvalidTokenError("Token has no subject")
+        self._stats["verified"] += 1
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "keys": len(self._keys),
+            "keys_age": round(time.monotonic() - self._fetched_at, 1) if self._fetched_at is not None else None,
+        }
+
+    async def _signing_key(self, header: Dict[str, Any]) -> Tuple[Any, str]:
+        """The key to check a token with, and the one algorithm it may be signed with."""
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not self.secret:
+                raise InvalidTokenError("HS256 tokens are not accepted: SUPABASE_JWT_SECRET is not set")
+            return self.secret, algorithm
+
+        if algorithm not in _ASYMMETRIC_ALGORITHMS:
+            raise InvalidTokenError(f"Unsupported signing algorithm: {algorithm}")
+        if not self.jwks_url:
+            raise InvalidTokenError("Asymmetric tokens are not accepted: SUPABASE_JWKS_URL is not set")
+
+        kid = header.get("kid")
+        key = self._keys.get(kid)
+        if key is None:
+            if self._refresh_lock is not None and self._refresh_lock.locked():
+                # A refresh is under way (the first one, at startup); use what it fetches
+                async with self._refresh_lock:
+                    pass
+            elif self._fetched_at is None or time.monotonic() - self._fetched_at >= JWKS_MIN_REFRESH_INTERVAL:
+                # Possibly a key rotated in since the last refresh
+                await self.refresh_keys()
+            key = self._keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unknown signing key: {kid}")
+
+        allowed = {key["alg"]} if key.get("alg") else _KEY_TYPE_ALGORITHMS.get(key.get("kty"), frozenset())
+        if algorithm not in allowed:
+            raise InvalidTokenError(f"Signing key {kid} is not used with {algorithm}")
+
+        parsed = self._parsed.get((kid, algorithm))
+        if parsed is None:
+            from jose import jwk
+            from jose.exceptions import JWKError
+            try:
+                parsed = jwk.construct(key, algorithm)
+            except (JWKError, ValueError) as e:
+                raise InvalidTokenError(f"Unusable signing key {kid}: {e}") from e
+            self._parsed[(kid, algorithm)] = parsed
+        return parsed, algorithm
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await self.refresh_keys()
+            await asyncio.sleep(self.refresh_interval)
+
+class ProfileCache:
+    """
+    In-process cache of profiles rows by user id, bounded by age and count.
+
+    A user without a profile is cached as an empty dict, so they don't cost a
+    lookup per request either. Each worker has its own cache: an invalidation
+    only reaches the worker that made the change, and other workers see it
+    within PROFILE_CACHE_TTL.
+    """
+
+    def __init__(self, ttl: float = PROFILE_CACHE_TTL, max_size: int = PROFILE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached profile, or None on a miss."""
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self._stats["misses"] += 1
+            count_cache_lookup("profile", "miss")
+            return None
+        self._entries.move_to_end(user_id)
+        self._stats["hits"] += 1
+        count_cache_lookup("profile", "hit")
+        return dict(entry[1])
+
+    def set(self, user_id: str, profile: Dict[str, Any]) -> None:
+        self._entries[user_id] = (time.monotonic() + self.ttl, dict(profile))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        if self._entries.pop(user_id, None) is not None:
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+# Create singleton instances
+token_verifier = TokenVerifier()
+profile_cache = ProfileCache()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from .offload import run_blocking
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying a client whose construction failed
+CLIENT_RETRY_AFTER = float(os.getenv("CLIENT_RETRY_AFTER", "30"))
+
+class ClientUnavailableError(RuntimeError):
+    """Raised when a third-party client cannot be created (e.g. missing credentials)."""
+
+_registry: Dict[str, "LazyClient"] = {}
+
+class LazyClient:
+    """
+    Creates a third-party client on first use instead of at import time.
+
+    The factory does its own imports, so heavy modules such as praw, tweepy or
+    supabase are only loaded once their platform is actually used. A factory
+    that fails is not retried until CLIENT_RETRY_AFTER seconds have passed, so a
+    missing credential disables one platform instead of the whole app.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any], retry_after: float = CLIENT_RETRY_AFTER):
+        self.name = name
+        self.retry_after = retry_after
+        self._factory = factory
+        self._client = None
+        self._error: Optional[str] = None
+        self._failed_at: Optional[float] = None
+        self._init_ms: Optional[float] = None
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def get(self) -> Any:
+        """Returns the client, creating it if needed; raises ClientUnavailableError on failure."""
+        if self._client is not None:
+            return self._client
+
+        with self._lock:
+            if self._client is not None:
+                return self._client
+
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_after:
+                raise ClientUnavailableError(f"{self.name} client unavailable: {self._error}")
+
+            started = time.perf_counter()
+            try:
+                client = self._factory()
+            except Exception as e:
+                self._error = str(e)
+                self._failed_at = time.monotonic()
+                self._init_ms = round((time.perf_counter() - started) * 1000, 1)
+                logger.warning("Could not create %s client: %s", self.name, e)
+                raise ClientUnavailableError(f"{self.name} client unavailable: {e}") from e
+
+            self._client = client
+            self._error = None
+            self._failed_at = None
+            self._init_ms = round((time.perf_counter() - started) * 1000, 1)
+            return client
+
+    def status(self) -> Dict[str, Any]:
+        if self._client is not None:
+            state = "ready"
+        elif self._error is not None:
+            state = "failed"
+        else:
+            state = "not_initialized"
+        return {"status": state, "init_ms": self._init_ms, "error": self._error}
+
+def client_status() -> Dict[str, Dict[str, Any]]:
+    """Returns the state of every registered client."""
+    return {name: client.status() for name, client in _registry.items()}
+
+async def warm_up_clients(names: Optional[List[str]] = None) -> Dict[str, bool]:
+    """
+    Create the registered clients ahead of the first request.
+
+    Each factory runs in its backend's thread pool so warm-up never blocks the
+    event loop, and all clients warm up concurrently. Failures are logged and
+    reported, never raised.
+
+    Returns:
+        Mapping of client name to whether it is ready
+    """
+    clients = [client for name, client in _registry.items() if names is None or name in names]
+
+    async def warm_up(client: LazyClient) -> bool:
+        try:
+            await run_blocking(client.name, client.get)
+            return True
+        except ClientUnavailableError:
+            return False
+
+    outcomes = await asyncio.gather(*(warm_up(client) for client in clients))
+    return {client.name: ready for client, ready in zip(clients, outcomes)}
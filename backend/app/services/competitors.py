@@ -0,0 +1,170 @@
+import json
+import os
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+
+# Load environment variables
+load_dotenv()
+
+# Default competitor dictionary: a JSON object mapping each competitor to a list of aliases
+COMPETITORS_PATH = os.getenv("COMPETITORS_PATH", "")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+SENTIMENTS = ("positive", "neutral", "negative")
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+class CompetitorMatcher:
+    """
+    Aho-Corasick automaton over every competitor name and alias.
+
+    The automaton works on word tokens rather than characters: patterns and
+    contents go through the same tokenizer, so "Monday.com" matches
+    "monday com" and an alias never matches inside a longer word. Scanning a
+    content is a single pass over its tokens whatever the number of aliases.
+    """
+
+    def __init__(self, competitors: Dict[str, Sequence[str]]):
+        self.names = list(competitors)
+        # State 0 is the root; each state has token transitions, a failure link
+        # and the (competitor, alias length) pairs of the aliases ending there
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[int, int], ...]] = [()]
+
+        for code, name in enumerate(self.names):
+            for alias in {name, *competitors[name]}:
+                tokens = _tokenize(alias)
+                if tokens:
+                    self._add(tokens, code)
+        self._build_failure_links()
+
+    def _add(self, tokens: List[str], code: int) -> None:
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if (code, len(tokens)) not in self._output[state]:
+            self._output[state] += ((code, len(tokens)),)
+
+    def _build_failure_links(self) -> None:
+        # Breadth-first, so a state's failure target is always finished before the state itself
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                # Inherit matches that end in the failure state (aliases that are suffixes of this one)
+                self._output[next_state] += tuple(
+                    match for match in self._output[self._fail[next_state]] if match not in self._output[next_state]
+                )
+
+    def scan(self, text: str) -> Dict[int, int]:
+        """Returns {competitor code: occurrences} for one text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        counts: Dict[int, int] = {}
+        # Last token of each competitor's previous match, so overlapping aliases
+        # ("monday", "monday com") count as one occurrence
+        last_end: Dict[int, int] = {}
+        state = 0
+        for position, token in enumerate(_tokenize(text)):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for code, length in output[state]:
+                if position - length < last_end.get(code, -1):
+                    continue
+                last_end[code] = position
+                counts[code] = counts.get(code, 0) + 1
+        return counts
+
+def _engagement_weight(result: ResearchResult) -> float:
+    # Every result counts at least once; engagement adds to that (as in the aggregate analysis)
+    return 1.0 + sum(value for value in (result.engagement or {}).values() if isinstance(value, (int, float)))
+
+def extract_competitor_mentions(results: Sequence[ResearchResult], matcher: CompetitorMatcher) -> List[Dict[str, Any]]:
+    """
+    Count which results mention each competitor and how they feel about it.
+
+    Args:
+        results: Research results, with sentiment already filled in
+        matcher: Compiled competitor dictionary
+
+    Returns:
+        One entry per mentioned competitor, most mentioned first, with mentions
+        (results naming it), occurrences, the dominant sentiment, the sentiment
+        distribution, engagement and an engagement-weighted net sentiment in [-1, 1]
+    """
+    stats = [
+        {"mentions": 0, "occurrences": 0, "engagement": 0.0, "sentiment": dict.fromkeys(SENTIMENTS, 0), "weighted": dict.fromkeys(SENTIMENTS, 0.0)}
+        for _ in matcher.names
+    ]
+
+    for result in results:
+        matches = matcher.scan(result.content)
+        if not matches:
+            continue
+        weight = _engagement_weight(result)
+        for code, occurrences in matches.items():
+            entry = stats[code]
+            entry["mentions"] += 1
+            entry["occurrences"] += occurrences
+            entry["engagement"] += weight - 1.0
+            if result.sentiment in entry["sentiment"]:
+                entry["sentiment"][result.sentiment] += 1
+                entry["weighted"][result.sentiment] += weight
+
+    mentions = []
+    for name, entry in zip(matcher.names, stats):
+        if not entry["mentions"]:
+            continue
+        distribution = entry["sentiment"]
+        weighted = entry["weighted"]
+        weighted_total = sum(weighted.values())
+        mentions.append({
+            "name": name,
+            "mentions": entry["mentions"],
+            "occurrences": entry["occurrences"],
+            "sentiment": max(SENTIMENTS, key=distribution.get) if any(distribution.values()) else None,
+            "sentiment_distribution": distribution,
+            "engagement": entry["engagement"],
+            "weighted_net_sentiment": round((weighted["positive"] - weighted["negative"]) / weighted_total, 4) if weighted_total else 0.0,
+        })
+
+    mentions.sort(key=lambda mention: (mention["mentions"], mention["engagement"]), reverse=True)
+    return mentions
+
+def _load_competitors() -> Dict[str, List[str]]:
+    if not COMPETITORS_PATH:
+        return {}
+    with open(COMPETITORS_PATH, encoding="utf-8") as competitors_file:
+        return {name: list(aliases or []) for name, aliases in json.load(competitors_file).items()}
+
+_default_matcher: Optional[CompetitorMatcher] = None
+
+def get_competitor_matcher(competitors: Optional[Dict[str, List[str]]] = None) -> CompetitorMatcher:
+    """
+    Matcher for a request's own competitor dictionary, or for the configured
+    default (COMPETITORS_PATH), which is compiled once per process.
+    """
+    global _default_matcher
+    if competitors:
+        return CompetitorMatcher(competitors)
+    if _default_matcher is None:
+        _default_matcher = CompetitorMatcher(_load_competitors())
+    return _default_matcher
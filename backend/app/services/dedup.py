@@ -0,0 +1,237 @@
+import hashlib
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import numpy as np
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+
+# Load environment variables
+load_dotenv()
+
+# Results whose estimated Jaccard similarity reaches this are merged into one
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+
+# MinHash signature length and LSH banding (DEDUP_NUM_PERM must be divisible by DEDUP_BANDS)
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+
+# Contents are compared as sets of word n-grams of this size
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+
+# Signatures are computed in chunks of at most this many shingles to bound memory
+_SIGNATURE_CHUNK = 1 << 16
+
+# Combines the token hashes of a shingle (a large odd constant)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Query parameters that only track where a link was shared from
+_TRACKING_PARAMS = ("utm_", "ref", "share", "si", "fbclid", "gclid")
+
+def normalize_url(url: str) -> str:
+    """Scheme-, host-case-, fragment- and tracking-insensitive form of a URL."""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    ]
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit(("", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+def content_hash(tokens: Sequence[str]) -> bytes:
+    return hashlib.blake2b(" ".join(tokens).encode(), digest_size=16).digest()
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # The lower index stays the root so clusters keep their first-seen position
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+class MinHasher:
+    """
+    MinHash signatures for many documents at once.
+
+    Tokens are hashed once (crc32, so signatures are stable across processes)
+    and every document is laid out in one flat array. Shingle hashes are rolled
+    over that array a token position at a time, each of the num_perm hash
+    functions is a multiply-shift permutation applied to all shingles at once,
+    and np.minimum.reduceat takes the per-document minimum.
+    """
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, shingle_size: int = DEDUP_SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Odd multipliers make x -> a*x + b a bijection on 64-bit integers
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, documents: Sequence[Sequence[str]]) -> np.ndarray:
+        """Returns an array of shape (len(documents), num_perm); documents must not be empty."""
+        token_hashes: Dict[str, int] = {}
+        flat = []
+        for tokens in documents:
+            for token in tokens:
+                value = token_hashes.get(token)
+                if value is None:
+                    value = token_hashes[token] = zlib.crc32(token.encode()) + 1
+                flat.append(value)
+        tokens = np.array(flat, dtype=np.uint64)
+
+        lengths = np.array([len(tokens) for tokens in documents], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        # Documents shorter than a shingle count as a single (shorter) shingle
+        counts = np.maximum(lengths - self.shingle_size + 1, 1)
+        offsets = np.cumsum(counts) - counts
+
+        signatures = np.empty((len(documents), self.num_perm), dtype=np.uint32)
+        first = 0
+        while first < len(documents):
+            # Take documents until the chunk holds _SIGNATURE_CHUNK shingles (at least one document)
+            last = max(int(np.searchsorted(offsets, offsets[first] + _SIGNATURE_CHUNK)), first + 1)
+            chunk_counts = counts[first:last]
+            chunk_offsets = offsets[first:last] - offsets[first]
+            document_ends = np.repeat(ends[first:last], chunk_counts)
+            starts = np.repeat(ends[first:last] - lengths[first:last] - chunk_offsets, chunk_counts) + np.arange(chunk_counts.sum())
+
+            shingles = np.zeros(len(starts), dtype=np.uint64)
+            with np.errstate(over="ignore"):
+                for position in range(self.shingle_size):
+                    index = starts + position
+                    inside = index < document_ends
+                    shingles = shingles * _SHINGLE_MULTIPLIER + np.where(inside, tokens[np.where(inside, index, 0)], 0)
+                permuted = self._a[:, None] * shingles[None, :] + self._b[:, None]
+            # The high 32 bits of a multiply-shift hash are the well-mixed ones
+            permuted = (permuted >> np.uint64(32)).astype(np.uint32)
+            signatures[first:last] = np.minimum.reduceat(permuted, chunk_offsets, axis=1).T
+            first = last
+        return signatures
+
+def _merge_engagement(cluster: Sequence[ResearchResult], representative: ResearchResult) -> Optional[Dict[str, object]]:
+    merged: Dict[str, object] = dict(representative.engagement or {})
+    for result in cluster:
+        if result is representative:
+            continue
+        for metric, value in (result.engagement or {}).items():
+            if not isinstance(value, (int, float)):
+                merged.setdefault(metric, value)
+            elif isinstance(merged.get(metric), (int, float)):
+                merged[metric] += value
+            elif metric not in merged:
+                merged[metric] = value
+    return merged or None
+
+def _engagement_total(result: ResearchResult) -> float:
+    return sum(value for value in (result.engagement or {}).values() if isinstance(value, (int, float)))
+
+def deduplicate(
+    results: List[ResearchResult],
+    threshold: float = DEDUP_THRESHOLD,
+    bands: int = DEDUP_BANDS,
+    minhasher: Optional[MinHasher] = None
+) -> List[ResearchResult]:
+    """
+    Collapse duplicate and near-duplicate results into one per cluster.
+
+    Results sharing a normalized URL or normalized content are merged exactly;
+    the remaining distinct contents are clustered with MinHash and LSH banding,
+    so only results that collide in some band are compared. The representative
+    of a cluster is its most engaged result; it carries the summed engagement of
+    the cluster and the URLs of the results it absorbed.
+
+    Args:
+        results: Combined results of every platform
+        threshold: Minimum estimated Jaccard similarity of two contents' shingles
+        bands: Number of LSH bands the signature is split into
+
+    Returns:
+        Deduplicated results, in the order each cluster was first seen
+    """
+    if len(results) < 2:
+        return results
+
+    minhasher = minhasher or _default_minhasher
+    clusters = _UnionFind(len(results))
+
+    # Exact duplicates: same link, or same content once case and punctuation are ignored
+    first_by_url: Dict[str, int] = {}
+    first_by_hash: Dict[bytes, int] = {}
+    distinct: List[int] = []
+    documents: List[List[str]] = []
+    for index, result in enumerate(results):
+        if result.source_url:
+            clusters.union(first_by_url.setdefault(normalize_url(result.source_url), index), index)
+
+        tokens = _TOKEN_PATTERN.findall(result.content.lower())
+        if not tokens:
+            continue
+        first = first_by_hash.setdefault(content_hash(tokens), index)
+        clusters.union(first, index)
+        if first == index:
+            distinct.append(index)
+            documents.append(tokens)
+
+    # Near duplicates: candidates share every row of at least one band
+    if len(documents) > 1:
+        signatures = minhasher.signatures(documents)
+        rows = minhasher.num_perm // bands
+        for band in range(bands):
+            band_signatures = signatures[:, band * rows:(band + 1) * rows]
+            _, buckets, counts = np.unique(band_signatures, axis=0, return_inverse=True, return_counts=True)
+            buckets = buckets.ravel()
+            candidates = np.flatnonzero(counts[buckets] > 1)
+            if not len(candidates):
+                continue
+
+            order = candidates[np.argsort(buckets[candidates], kind="stable")]
+            boundaries = np.flatnonzero(np.diff(buckets[order])) + 1
+            for members in np.split(order, boundaries):
+                if len({clusters.find(distinct[member]) for member in members}) == 1:
+                    continue  # Already merged through an earlier band
+                # Verify candidates on the full signature to drop chance collisions
+                member_signatures = signatures[members]
+                similarity = (member_signatures[:, None, :] == member_signatures[None, :, :]).mean(axis=2)
+                for a, b in zip(*np.nonzero(np.triu(similarity >= threshold, k=1))):
+                    clusters.union(distinct[members[a]], distinct[members[b]])
+
+    grouped: Dict[int, List[ResearchResult]] = {}
+    for index, result in enumerate(results):
+        grouped.setdefault(clusters.find(index), []).append(result)
+
+    deduplicated = []
+    for cluster in grouped.values():
+        if len(cluster) == 1:
+            deduplicated.append(cluster[0])
+            continue
+
+        representative = max(cluster, key=_engagement_total)
+        duplicate_urls = list(dict.fromkeys(
+            result.source_url for result in cluster
+            if result.source_url and result.source_url != representative.source_url
+        ))
+        deduplicated.append(representative.model_copy(update={
+            "engagement": _merge_engagement(cluster, representative),
+            "duplicate_urls": duplicate_urls,
+        }))
+    return deduplicated
+
+_default_minhasher = MinHasher()
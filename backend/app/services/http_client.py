@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import AsyncIterator, Callable, Dict, Optional
+import httpx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Connection pool settings shared by every scraper in this worker
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_USER_AGENT = os.getenv("HTTP_USER_AGENT", "TheMomTestBot/1.0")
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that frees its host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Caps concurrent requests per host on top of the pool-wide limits.
+
+    httpx only limits connections for the pool as a whole, so one slow host
+    could take every connection. A request holds its host's slot until its
+    response body has been read or closed.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self._max_per_host)
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphores[request.url.host]
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, semaphore.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+def _create_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    http2 = HTTP2_ENABLED and _http2_available()
+    transport = HostLimitedTransport(
+        httpx.AsyncHTTPTransport(http2=http2, limits=limits),
+        max_per_host=HTTP_MAX_CONNECTIONS_PER_HOST
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=HTTP_TIMEOUT,
+        headers={"User-Agent": HTTP_USER_AGENT},
+        follow_redirects=True
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the worker's shared httpx.AsyncClient.
+
+    Scrapers must use this instead of opening their own AsyncClient so that
+    connections (and their TLS sessions) are reused across requests. The
+    client is normally opened and closed by the FastAPI lifespan; outside of
+    it, it is created on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_http_client()
+    return _client
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Open the shared client; called from the FastAPI lifespan."""
+    return get_http_client()
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+from .openai_client import get_async_openai_client
+from .singleflight import SingleFlight
+from .llm_cache import llm_cache, llm_cache_key
+from .offload import run_blocking
+from .metrics import count_cache_lookup, time_stage
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Map-reduce LLM analysis of research results; off unless enabled
+LLM_ANALYSIS_ENABLED = os.getenv("LLM_ANALYSIS_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_ANALYSIS_MODEL = os.getenv("LLM_ANALYSIS_MODEL", "gpt-4")
+
+# Prompt tokens per map chunk (and per reduce step), leaving the rest of the context window for the answer
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "3000"))
+
+# Concurrent completions in flight, and completions started per minute
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+
+# Completions kept in this process on top of the shared LLM cache
+LLM_MEMORY_CACHE_SIZE = int(os.getenv("LLM_MEMORY_CACHE_SIZE", "1024"))
+
+_TEMPERATURE = 0.2
+
+_SYSTEM_PROMPT = "You are an expert market researcher analyzing social media content to validate startup ideas."
+
+_MAP_PROMPT = (
+    "Summarize what these posts say about \"{query}\". List the problems and pain points people "
+    "describe, the tools or competitors they mention and how they feel about them, and any notable "
+    "quotes. Be concise and only use what the posts say.\n\n{posts}"
+)
+
+_COMBINE_PROMPT = (
+    "Merge these partial research summaries about \"{query}\" into one summary, keeping every distinct "
+    "pain point, competitor and quote.\n\n{summaries}"
+)
+
+_REDUCE_PROMPT = (
+    "These are summaries of social media research about \"{query}\". Write the final analysis for a startup "
+    "founder as a JSON object with the keys \"summary\" (a few paragraphs), \"user_pain_points\" (list of "
+    "strings), \"key_insights\" (list of strings) and \"recommended_next_steps\" (list of strings). "
+    "Respond with the JSON object only.\n\n{summaries}"
+)
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """Token count under the cl100k encoding, or an estimate when tiktoken isn't installed."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _encoding = False
+    if _encoding is False:
+        # About four characters per token for English text
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text, disallowed_special=()))
+
+def format_result(result: ResearchResult) -> str:
+    # No running index: a chunk's text, and so its cache key, must not depend on its position
+    return f"- [{result.platform}, {result.sentiment or 'unknown'}] {' '.join(result.content.split())}"
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """The text cut to about `budget` tokens (proportionally, by characters)."""
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        return text
+    return text[:int(len(text) * budget / tokens)]
+
+def chunk_texts(texts: Sequence[str], budget: int) -> List[List[str]]:
+    """Group texts greedily into chunks of at most `budget` tokens; oversized texts are truncated."""
+    chunks: List[List[str]] = []
+    chunk: List[str] = []
+    used = 0
+    for text in texts:
+        tokens = count_tokens(text) + 1  # The joining newline
+        if tokens > budget:
+            text = truncate_tokens(text, budget - 1)
+            tokens = count_tokens(text) + 1
+        if chunk and used + tokens > budget:
+            chunks.append(chunk)
+            chunk, used = [], 0
+        chunk.append(text)
+        used += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def _parse_analysis(text: str) -> Dict[str, Any]:
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.strip("`")
+        body = body[body.find("{"):]
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        # Not JSON after all; the whole answer is the summary
+        return {"summary": text.strip(), "user_pain_points": [], "key_insights": [], "recommended_next_steps": []}
+    return {
+        "summary": str(parsed.get("summary", "")).strip(),
+        "user_pain_points": [str(item) for item in parsed.get("user_pain_points") or []],
+        "key_insights": [str(item) for item in parsed.get("key_insights") or []],
+        "recommended_next_steps": [str(item) for item in parsed.get("recommended_next_steps") or []],
+    }
+
+class RateLimiter:
+    """Starts calls at least 60 / requests_per_minute seconds apart."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class LLMAnalyzer:
+    """
+    Map-reduce analysis of research results with an LLM.
+
+    Results are packed into chunks that fit a token budget and each chunk is
+    summarized by its own completion (map); the partial summaries are then
+    combined into the final analysis (reduce), merging them in budget-sized
+    groups first if they don't fit in one prompt. Map and merge answers are
+    capped at half the budget, so every merge round at least halves the
+    number of partials and the final prompt always fits. Completions run
+    concurrently under a semaphore and a rate limiter, and are cached in
+    memory and in the shared LLM cache by model and normalized prompt, so
+    unchanged chunks are never paid for twice.
+    """
+
+    def __init__(
+        self,
+        model: str = LLM_ANALYSIS_MODEL,
+        chunk_tokens: int = LLM_CHUNK_TOKENS,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        cache_size: int = LLM_MEMORY_CACHE_SIZE
+    ):
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.cache_size = cache_size
+        self._rate_limiter = RateLimiter(requests_per_minute)
+        self._max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._flight = SingleFlight("llm")
+        self._stats = {"completions": 0, "memory_hits": 0, "disk_hits": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    async def analyze(self, query: str, results: Sequence[ResearchResult]) -> Dict[str, Any]:
+        """
+        Analyze the results for the query.
+
+        Returns:
+            Dict with summary, user_pain_points, key_insights and recommended_next_steps
+        """
+        chunks = chunk_texts([format_result(result) for result in results], self.chunk_tokens)
+        if not chunks:
+            return _parse_analysis("")
+        summary_tokens = max(self.chunk_tokens // 2, 1)
+
+        # Map: one partial summary per chunk
+        partials = await asyncio.gather(*(
+            self._complete(_MAP_PROMPT.format(query=query, posts="\n".join(chunk)), max_tokens=summary_tokens)
+            for chunk in chunks
+        ))
+
+        # Reduce: merge groups of partials until they fit in one prompt
+        while len(partials) > 1 and sum(count_tokens(partial) for partial in partials) > self.chunk_tokens:
+            # Token counts are estimates, so partials are cut to half the budget here too
+            partials = [truncate_tokens(partial, summary_tokens) for partial in partials]
+            groups = chunk_texts(partials, self.chunk_tokens)
+            if len(groups) == len(partials):
+                # Two halves that still don't pack (rounding): pair them up so the round makes progress
+                groups = [partials[start:start + 2] for start in range(0, len(partials), 2)]
+            partials = await asyncio.gather(*(
+                self._complete(_COMBINE_PROMPT.format(query=query, summaries="\n\n".join(group)), max_tokens=summary_tokens)
+                for group in groups
+            ))
+
+        summaries = "\n\n".join(truncate_tokens(partial, self.chunk_tokens) for partial in partials)
+        answer = await self._complete(_REDUCE_PROMPT.format(query=query, summaries=summaries))
+        return _parse_analysis(answer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "cached": len(self._cache),
+            "single_flight": self._flight.stats(),
+            "shared_cache": llm_cache.stats(),
+        }
+
+    async def _complete(self, prompt: str, max_tokens: Optional[int] = None) -> str:
+        messages = [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        params: Dict[str, Any] = {"temperature": _TEMPERATURE}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        key = llm_cache_key(self.model, messages, **params)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            count_cache_lookup("llm_memory", "hit")
+            return cached
+        count_cache_lookup("llm_memory", "miss")
+
+        # Identical prompts in flight at the same time share one lookup and completion
+        answer, _ = await self._flight.do(key, lambda: self._fetch(key, messages, params))
+        self._cache[key] = answer
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return answer
+
+    async def _fetch(self, key: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        # Another worker, or an earlier run of this one, may already have paid for this prompt
+        cached = await run_blocking("llm_cache", llm_cache.get, key)
+        if cached is not None:
+            self._stats["disk_hits"] += 1
+            return cached
+
+        answer = await self._request(messages, params)
+        await run_blocking("llm_cache", llm_cache.set, key, answer)
+        return answer
+
+    async def _request(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async with self._semaphore:
+            await self._rate_limiter.acquire()
+            with time_stage("llm.request"):
+                response = await get_async_openai_client().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **params
+                )
+
+        self._stats["completions"] += 1
+        if response.usage is not None:
+            self._stats["prompt_tokens"] += response.usage.prompt_tokens
+            self._stats["completion_tokens"] += response.usage.completion_tokens
+        return response.choices[0].message.content or ""
+
+# Create a singleton instance
+llm_analyzer = LLMAnalyzer()
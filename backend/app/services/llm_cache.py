@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from .metrics import count_cache_lookup
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# SQLite file shared by every worker on the host; the cache is disabled when set to ""
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.db")
+
+# Responses live LLM_CACHE_TTL seconds; the least recently used are evicted beyond LLM_CACHE_MAX_BYTES
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Store responses zlib-compressed
+LLM_CACHE_COMPRESS = os.getenv("LLM_CACHE_COMPRESS", "true").lower() in ("1", "true", "yes")
+
+# Expire and evict every N writes rather than on each one
+_PRUNE_EVERY = 100
+
+def normalize_prompt(text: str, fold_case: bool = False) -> str:
+    """Whitespace-insensitive (and with fold_case, case-insensitive) form of a prompt."""
+    if fold_case:
+        text = text.lower()
+    return " ".join(text.split())
+
+def llm_cache_key(model: str, messages: List[Dict[str, str]], *, fold_case: bool = False, **params: Any) -> str:
+    """
+    Key for a chat completion: model, normalized messages and sampling parameters.
+
+    Whitespace never matters. Case matters unless fold_case is set, which
+    callers only do for prompts built from user-typed text where a case edit
+    shouldn't change the answer (the idea fields of a validation).
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": [(message["role"], normalize_prompt(message["content"], fold_case)) for message in messages],
+            "params": params,
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+class LLMCache:
+    """
+    Persistent cache of LLM responses in a local SQLite database.
+
+    The database runs in WAL mode so every uvicorn worker on the host reads
+    and writes the same entries. Methods are blocking; async callers run them
+    through run_blocking("llm_cache", ...). A database error is counted and
+    treated as a miss, as is an entry that can't be decompressed (which is
+    then deleted), so the cache can never fail a request.
+    """
+
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_DB,
+        ttl: float = LLM_CACHE_TTL,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        compress: bool = LLM_CACHE_COMPRESS
+    ):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._db_ready = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response, or None on a miss."""
+        if not self.db_path:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT value, compressed FROM llm_cache WHERE key = ? AND expires_at > ?",
+                        (key, time.time())
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning("LLM cache read failed: %s", e)
+            return None
+
+        response = None
+        if row is not None:
+            value, compressed = row
+            try:
+                response = (zlib.decompress(value) if compressed else bytes(value)).decode()
+            except (zlib.error, UnicodeDecodeError) as e:
+                self._count("errors")
+                logger.warning("Dropping a corrupt LLM cache entry: %s", e)
+                self._delete(key)
+
+        if response is None:
+            self._count("misses")
+            count_cache_lookup("llm", "miss")
+            return None
+        self._count("hits")
+        count_cache_lookup("llm", "hit")
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response."""
+        if not self.db_path:
+            return
+        value = response.encode()
+        if self.compress:
+            value = zlib.compress(value)
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, compressed, size, expires_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, value, int(self.compress), len(value), now + self.ttl, now)
+                    )
+                    self._count("writes")
+                    if self._stats["writes"] % _PRUNE_EVERY == 0:
+                        self._prune(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning("LLM cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "enabled": bool(self.db_path),
+        }
+
+    def _count(self, stat: str) -> None:
+        # Methods run on several offload threads at once
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, compressed INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _delete(self, key: str) -> None:
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._count("errors")
+            logger.warning("LLM cache delete failed: %s", e)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+
+        # Least recently used entries go first, until the total is back under budget
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+        with self._lock:
+            self._stats["evictions"] += len(evicted)
+
+# Create a singleton instance
+llm_cache = LLMCache()
@@ -0,0 +1,119 @@
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from .logs import request_id
+
+# Metrics live in prometheus_client's default registry, per process: each uvicorn worker
+# exports its own and Prometheus sums them across the scrape targets
+
+# Latency buckets in seconds, from cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def render_metrics() -> bytes:
+    """Every registered metric in the Prometheus text exposition format."""
+    return generate_latest()
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("method", "route", "status"),
+    buckets=DEFAULT_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    ("method",)
+)
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Time spent in one stage of handling a request: a scraper, an analysis step, an LLM call, a database read or write.",
+    ("stage", "outcome"),
+    buckets=DEFAULT_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit, stale_hit or miss; hits are further split by tier where there are several).",
+    ("cache", "result")
+)
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """
+    Record how long the block takes under STAGE_DURATION, with outcome "error"
+    if it raises (cancellation included) and "ok" otherwise.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STAGE_DURATION.labels(stage, outcome).observe(time.perf_counter() - started)
+
+def observe_stage(stage: str, outcome: str, seconds: float) -> None:
+    """Record a stage whose outcome isn't simply ok/error (a scraper that timed out, ...)."""
+    STAGE_DURATION.labels(stage, outcome).observe(seconds)
+
+def count_cache_lookup(cache: str, result: str) -> None:
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request and tags it with a request ID.
+
+    The ID is taken from the X-Request-ID header or generated, echoed back in
+    the response, and set for the duration of the request so every log record
+    it produces carries it. Requests are labelled by route template
+    (/research/jobs/{job_id}) rather than path, to keep the label set bounded.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+        self._routes: Optional[Dict[Any, str]] = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        rid = headers.get(b"x-request-id", b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        token = request_id.set(rid)
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        # The route is only known once the router has matched it, so in flight is tracked per method
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+
+        async def send_with_request_id(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            in_flight.dec()
+            route = self._route(scope)
+            HTTP_REQUEST_DURATION.labels(method, route, str(status)).observe(time.perf_counter() - started)
+            request_id.reset(token)
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            app = scope.get("app")
+            self._routes = {
+                route.endpoint: route.path for route in getattr(app, "routes", []) if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint, "unmatched")
@@ -1,16 +1,103 @@
+import json
+import logging
 import os
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, TypeVar
 from dotenv import load_dotenv
-import openai
-from ..routers.validation import InterviewQuestion
+from ..models.validation import InterviewQuestion
+from .openai_client import get_async_openai_client
+from .llm_cache import llm_cache, llm_cache_key
+from .offload import run_blocking
+from .metrics import time_stage
 
 # Load environment variables
 load_dotenv()
 
-# Set OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+logger = logging.getLogger(__name__)
 
-def analyze_idea(
+# Ask the LLM for the analysis and interview questions; off unless enabled. The
+# built-in answers below are used while it is off or when its answer can't be used.
+MOM_TEST_LLM_ENABLED = os.getenv("MOM_TEST_LLM_ENABLED", "false").lower() in ("1", "true", "yes")
+MOM_TEST_LLM_MODEL = os.getenv("MOM_TEST_LLM_MODEL", "gpt-4")
+
+# The prompts are deterministic, so the answers can be too
+_TEMPERATURE = 0
+
+_ANALYSIS_SYSTEM_PROMPT = "You are an expert in startup idea validation using The Mom Test principles."
+
+_ANALYSIS_PROMPT = (
+    "Analyze this startup idea:\nName: {idea_name}\nProblem: {problem_statement}\nTarget Audience: {target_audience}\n"
+    "Solution: {solution}\nValue Proposition: {value_proposition}\n\n"
+    "Respond with a JSON object only, with the keys \"overall_score\" (0 to 10), \"strengths\", \"weaknesses\", "
+    "\"mom_test_violations\" and \"validation_priorities\" (lists of strings)."
+)
+
+_QUESTIONS_SYSTEM_PROMPT = "You are an expert in The Mom Test methodology for startup validation."
+
+_QUESTIONS_PROMPT = (
+    "Generate 5 interview questions following The Mom Test principles for validating a solution to this "
+    "problem: {problem_area} for this target audience: {target_audience}\n\n"
+    "Respond with a JSON array only, one object per question with the keys \"question\", \"explanation\" "
+    "and \"category\"."
+)
+
+T = TypeVar("T")
+
+async def complete_json(system_prompt: str, prompt: str, parse: Callable[[Any], T]) -> Optional[T]:
+    """
+    Ask the LLM for a JSON answer, through the shared LLM cache.
+    
+    The prompts are built from the idea's fields, so the cache key ignores
+    their case and whitespace: an idea resubmitted with only such edits is
+    answered from the cache without spending tokens. Only answers that parse
+    are cached.
+    
+    Args:
+        system_prompt: The system message
+        prompt: The user message
+        parse: Turns the decoded JSON into the result; raises ValueError if it has the wrong shape
+    
+    Returns:
+        The parsed answer, or None if the LLM failed or its answer couldn't be parsed
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    key = llm_cache_key(MOM_TEST_LLM_MODEL, messages, fold_case=True, temperature=_TEMPERATURE)
+    cached = await run_blocking("llm_cache", llm_cache.get, key)
+    if cached is not None:
+        try:
+            return parse(json.loads(cached))
+        except ValueError:
+            pass  # Ask again; the fresh answer replaces this one
+    
+    try:
+        with time_stage("llm.request"):
+            response = await get_async_openai_client().chat.completions.create(
+                model=MOM_TEST_LLM_MODEL,
+                messages=messages,
+                temperature=_TEMPERATURE
+            )
+        answer = response.choices[0].message.content or ""
+        result = parse(json.loads(answer))
+    except Exception as e:
+        logger.warning("Mom Test LLM call failed, using the built-in answer: %s", e)
+        return None
+    
+    await run_blocking("llm_cache", llm_cache.set, key, answer)
+    return result
+
+def _parse_analysis(data: Any) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    return data
+
+def _parse_questions(data: Any) -> List[InterviewQuestion]:
+    if not isinstance(data, list) or not data:
+        raise ValueError("Expected a non-empty JSON array")
+    return [InterviewQuestion.model_validate(item) for item in data]
+
+async def analyze_idea(
     idea_name: str,
     problem_statement: str,
     target_audience: str,
@@ -22,22 +109,22 @@ def analyze_idea(
     
     Returns a dictionary with analysis results.
     """
-    # In a real implementation, this would use OpenAI or a custom-trained model
-    # For now, we'll return a mock analysis
-    
-    # Example of how you would call OpenAI in a real implementation:
-    """
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are an expert in startup idea validation using The Mom Test principles."},
-            {"role": "user", "content": f"Analyze this startup idea:\nName: {idea_name}\nProblem: {problem_statement}\nTarget Audience: {target_audience}\nSolution: {solution}\nValue Proposition: {value_proposition}"}
-        ]
-    )
-    analysis_text = response.choices[0].message.content
-    """
+    if MOM_TEST_LLM_ENABLED:
+        analysis = await complete_json(
+            _ANALYSIS_SYSTEM_PROMPT,
+            _ANALYSIS_PROMPT.format(
+                idea_name=idea_name,
+                problem_statement=problem_statement,
+                target_audience=target_audience,
+                solution=solution,
+                value_proposition=value_proposition
+            ),
+            _parse_analysis
+        )
+        if analysis is not None:
+            return analysis
     
-    # Mock analysis for demonstration
+    # Built-in analysis, used when the LLM is off or failed
     analysis = {
         "overall_score": 7.5,
         "strengths": [
@@ -61,7 +148,7 @@ def analyze_idea(
     
     return analysis
 
-def generate_interview_questions(
+async def generate_interview_questions(
     problem_area: str,
     target_audience: str
 ) -> List[InterviewQuestion]:
@@ -70,22 +157,16 @@ def generate_interview_questions(
     
     Returns a list of InterviewQuestion objects.
     """
-    # In a real implementation, this would use OpenAI or a custom-trained model
-    # For now, we'll return mock questions
-    
-    # Example of how you would call OpenAI in a real implementation:
-    """
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are an expert in The Mom Test methodology for startup validation."},
-            {"role": "user", "content": f"Generate 5 interview questions following The Mom Test principles for validating a solution to this problem: {problem_area} for this target audience: {target_audience}"}
-        ]
-    )
-    questions_text = response.choices[0].message.content
-    """
+    if MOM_TEST_LLM_ENABLED:
+        questions = await complete_json(
+            _QUESTIONS_SYSTEM_PROMPT,
+            _QUESTIONS_PROMPT.format(problem_area=problem_area, target_audience=target_audience),
+            _parse_questions
+        )
+        if questions is not None:
+            return questions
     
-    # Mock questions for demonstration
+    # Built-in questions, used when the LLM is off or failed
     questions = [
         InterviewQuestion(
             question="Can you tell me about the last time you encountered [problem area]?",
@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Threads per backend pool; OFFLOAD_<BACKEND>_POOL_SIZE overrides the default
+OFFLOAD_POOL_SIZE = int(os.getenv("OFFLOAD_POOL_SIZE", "4"))
+
+# In debug mode, log any callback or coroutine step that holds the loop longer than this (seconds)
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+LOOP_BLOCK_THRESHOLD = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def get_executor(backend: str) -> ThreadPoolExecutor:
+    """
+    Returns the bounded thread pool for a blocking backend (e.g. "reddit", "supabase").
+
+    Each backend gets its own pool so a slow backend can only exhaust its own
+    threads, never the ones other backends (or the default loop executor) use.
+    """
+    executor = _executors.get(backend)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(backend)
+            if executor is None:
+                size = int(os.getenv(f"OFFLOAD_{backend.upper()}_POOL_SIZE", OFFLOAD_POOL_SIZE))
+                executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"offload-{backend}")
+                _executors[backend] = executor
+    return executor
+
+async def run_blocking(backend: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a synchronous client call in the backend's thread pool and await its result.
+
+    Args:
+        backend: Name of the pool to run in
+        func: The blocking callable
+        *args, **kwargs: Passed through to func
+
+    Returns:
+        Whatever func returns; exceptions raised by func propagate to the caller
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(backend), call)
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down every backend pool, waiting for in-flight calls by default."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+def install_loop_monitor(
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    threshold: float = LOOP_BLOCK_THRESHOLD
+) -> None:
+    """
+    Log every coroutine step that holds the event loop longer than `threshold` seconds.
+
+    Uses asyncio debug mode, which reports slow callbacks through the "asyncio"
+    logger along with the task that ran them. Debug mode adds overhead, so this
+    is only meant to be enabled when DEBUG is set.
+    """
+    loop = loop or asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
+    logger.warning("Event loop monitor enabled (threshold %.0f ms)", threshold * 1000)
@@ -0,0 +1,33 @@
+import os
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+from .clients import LazyClient
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Load environment variables
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Alternative OpenAI-compatible endpoint (e.g. a local stub server); the official API when unset
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+def _create_async_openai_client() -> "AsyncOpenAI":
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY must be set")
+
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+
+# Created on first use; importing openai alone costs a noticeable part of boot time
+async_openai_client = LazyClient("openai_async", _create_async_openai_client)
+
+def get_async_openai_client() -> "AsyncOpenAI":
+    """
+    Returns the async OpenAI client instance, creating it on first use.
+    
+    Raises ClientUnavailableError if the client cannot be created.
+    """
+    return async_openai_client.get()
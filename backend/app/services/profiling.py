@@ -0,0 +1,239 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Profiling is off unless a token is set; then the profiling routes and middleware are
+# installed and every profiling request must carry the token in X-Profiling-Token
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_ENABLED = bool(PROFILING_TOKEN)
+
+# Longest CPU profile one request may ask for, and the default time between samples (seconds)
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "60"))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.005"))
+
+# Per-request profiles kept for retrieval
+PROFILING_MAX_REQUEST_PROFILES = int(os.getenv("PROFILING_MAX_REQUEST_PROFILES", "20"))
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one of the same kind is running."""
+
+def token_matches(token: Optional[str]) -> bool:
+    return PROFILING_ENABLED and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    # ";" separates frames in the collapsed format, so it can't appear inside one
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for a live worker.
+
+    A background thread snapshots the stack of every other thread every
+    `interval` seconds and counts identical stacks. The result is in the
+    collapsed-stack format that flamegraph.pl and speedscope read: one line
+    per stack, root first, with the thread name as the root frame. Nothing is
+    hooked into the interpreter, so the cost is confined to the sampling
+    thread and goes away when it stops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval: float = PROFILING_SAMPLE_INTERVAL) -> str:
+        """Sample for `seconds` and return the collapsed stacks. Blocking; run it off the event loop."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A CPU profile is already running")
+        try:
+            return self._sample(seconds, interval)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> str:
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}").replace(";", ":").replace(" ", "_"))
+                stacks[";".join(reversed(labels))] += 1
+            time.sleep(interval)
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+class RequestProfiles:
+    """
+    cProfile runs of individual requests, kept for retrieval by id.
+
+    cProfile traces the whole event loop thread, so a profile also contains
+    whatever other requests ran during it; only one request is profiled at a
+    time.
+    """
+
+    def __init__(self, max_profiles: int = PROFILING_MAX_REQUEST_PROFILES):
+        self.max_profiles = max_profiles
+        self._active = False
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """A running profiler, or None if another request is being profiled."""
+        if self._active:
+            return None
+        self._active = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def finish(self, profiler: cProfile.Profile, profile_id: str, method: str, path: str, elapsed: float) -> None:
+        """Stop the profiler and store its stats under profile_id."""
+        profiler.disable()
+        self._active = False
+
+        self._profiles[profile_id] = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "profiler": profiler,
+        }
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in profile.items() if key != "profiler"}
+            for profile in reversed(self._profiles.values())
+        ]
+
+    def report(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        """pstats report of a stored profile, or None if there is no such profile."""
+        profile = self._profiles.get(profile_id)
+        if profile is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(profile["profiler"], stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return f"{profile['method']} {profile['path']} ({profile['elapsed_ms']} ms)\n{out.getvalue()}"
+
+class MemoryTracker:
+    """
+    tracemalloc snapshots for finding memory growth.
+
+    Tracing slows allocations down noticeably, so it only runs between start()
+    and stop(). snapshot() records a baseline; diff() compares the current
+    allocations against it, largest growth first.
+    """
+
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    def start(self, frames: int = 1) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = tracemalloc.take_snapshot()
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        tracemalloc.stop()
+        self._baseline = None
+        return self.status()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Make the current allocations the baseline for diff()."""
+        self._require_tracing()
+        self._baseline = tracemalloc.take_snapshot()
+        return self.status()
+
+    def diff(self, limit: int = 25, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        self._require_tracing()
+        current = tracemalloc.take_snapshot()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = current.filter_traces(filters).compare_to(self._baseline.filter_traces(filters), group_by)
+        return [
+            {
+                "location": str(stat.traceback),
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {"tracing": tracing, "traced_bytes": current, "peak_bytes": peak, "has_baseline": self._baseline is not None}
+
+    def _require_tracing(self) -> None:
+        if not tracemalloc.is_tracing() or self._baseline is None:
+            raise RuntimeError("Memory tracing is not running; start it first")
+
+class ProfilingMiddleware:
+    """
+    Runs a request under cProfile when it carries X-Profile: 1 and a valid
+    X-Profiling-Token. The response gets an X-Profile-Id header naming the
+    stored profile ("busy" if another request was being profiled).
+
+    Only installed when profiling is enabled.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile") != b"1" or not token_matches(headers.get(b"x-profiling-token", b"").decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = request_profiles.start()
+        if profiler is None:
+            await self.app(scope, receive, self._with_header(send, "busy"))
+            return
+
+        # The id goes out with the response headers, before the profile is finished and stored
+        profile_id = uuid.uuid4().hex[:12]
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, self._with_header(send, profile_id))
+        finally:
+            request_profiles.finish(profiler, profile_id, scope["method"], scope["path"], time.perf_counter() - started)
+
+    @staticmethod
+    def _with_header(send: Callable, value: str) -> Callable:
+        async def wrapped(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + [(b"x-profile-id", value.encode())]
+            await send(message)
+        return wrapped
+
+# Create singleton instances
+sampling_profiler = SamplingProfiler()
+request_profiles = RequestProfiles()
+memory_tracker = MemoryTracker()
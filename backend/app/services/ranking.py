@@ -0,0 +1,100 @@
+import heapq
+import math
+import os
+import re
+from typing import List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+
+# Load environment variables
+load_dotenv()
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Share of the final score that comes from engagement rather than text relevance (0..1)
+RANKING_ENGAGEMENT_WEIGHT = float(os.getenv("RANKING_ENGAGEMENT_WEIGHT", "0.3"))
+
+# Engagement counters that feed the prior, with their relative weight
+ENGAGEMENT_PRIOR_WEIGHTS = {
+    "upvotes": 1.0,
+    "likes": 1.0,
+    "retweets": 2.0,
+    "comments": 1.5,
+    "replies": 1.5,
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+def bm25_scores(query: str, contents: Sequence[str], k1: float = BM25_K1, b: float = BM25_B) -> np.ndarray:
+    """
+    BM25 score of every content against the query.
+
+    Only the query's own terms are counted, so the term-frequency matrix is
+    (documents x query terms) and the scoring itself is a few array operations.
+    """
+    terms = {term: column for column, term in enumerate(dict.fromkeys(_TOKEN_PATTERN.findall(query.lower())))}
+    if not terms or not contents:
+        return np.zeros(len(contents))
+
+    frequencies = np.zeros((len(contents), len(terms)))
+    lengths = np.empty(len(contents))
+    for row, content in enumerate(contents):
+        tokens = _TOKEN_PATTERN.findall(content.lower())
+        lengths[row] = len(tokens)
+        for column in map(terms.get, tokens):
+            if column is not None:
+                frequencies[row, column] += 1
+
+    documents = len(contents)
+    document_frequency = (frequencies > 0).sum(axis=0)
+    idf = np.log(1 + (documents - document_frequency + 0.5) / (document_frequency + 0.5))
+    average_length = lengths.mean() or 1.0
+    saturation = frequencies + k1 * (1 - b + b * lengths[:, None] / average_length)
+    return (idf * frequencies * (k1 + 1) / saturation).sum(axis=1)
+
+def engagement_prior(result: ResearchResult) -> float:
+    """Log-damped weighted engagement, so a viral post doesn't drown out relevance."""
+    engagement = result.engagement or {}
+    total = sum(
+        weight * engagement[metric] for metric, weight in ENGAGEMENT_PRIOR_WEIGHTS.items()
+        if isinstance(engagement.get(metric), (int, float)) and engagement[metric] > 0
+    )
+    return math.log1p(total)
+
+def rank_results(
+    query: str,
+    results: List[ResearchResult],
+    limit: Optional[int] = None,
+    engagement_weight: float = RANKING_ENGAGEMENT_WEIGHT
+) -> List[ResearchResult]:
+    """
+    Order results by relevance to the query and keep the best `limit`.
+
+    The score blends BM25 against the query and the engagement prior, each
+    scaled to 0..1 by its maximum over this result set. Selection uses a heap,
+    so only the kept results are ever sorted; ties keep their original order.
+
+    Args:
+        query: The research query
+        results: Results to rank
+        limit: Number of results to keep; all of them when None
+
+    Returns:
+        The top results, best first
+    """
+    if not results:
+        return results
+
+    relevance = bm25_scores(query, [result.content for result in results])
+    prior = np.array([engagement_prior(result) for result in results])
+    if relevance.max() > 0:
+        relevance /= relevance.max()
+    if prior.max() > 0:
+        prior /= prior.max()
+    scores = ((1 - engagement_weight) * relevance + engagement_weight * prior).tolist()
+
+    count = len(results) if limit is None else min(limit, len(results))
+    return [results[index] for index in heapq.nlargest(count, range(len(results)), key=scores.__getitem__)]
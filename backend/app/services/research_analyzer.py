@@ -1,111 +1,114 @@
-import os
-from typing import List, Dict, Any, Tuple
-from dotenv import load_dotenv
-import openai
-from ..routers.research import ResearchResult
+from typing import List, Dict, Any, Optional, Tuple
+from ..models.research import ResearchResult
+from .aggregation import ResearchAggregate
+from .themes import extract_themes
+from .competitors import extract_competitor_mentions, get_competitor_matcher
 
-# Load environment variables
-load_dotenv()
+# Negative results quoted as pain points, and the length each is cut to
+PAIN_POINT_LIMIT = 5
+PAIN_POINT_LENGTH = 200
 
-# Set OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Net sentiment (-1 .. 1) at which the summary calls the results mostly positive or negative
+SENTIMENT_LEAN = 0.2
 
-def analyze_research_data(results: List[ResearchResult]) -> Tuple[Dict[str, Any], str]:
+def analyze_research_data(
+    results: List[ResearchResult],
+    competitors: Optional[Dict[str, List[str]]] = None,
+    aggregate: Optional[ResearchAggregate] = None
+) -> Tuple[Dict[str, Any], str]:
     """
     Analyze research data from various platforms.
     
     Args:
         results: List of ResearchResult objects
+        competitors: Competitor name -> aliases; defaults to the configured dictionary
+        aggregate: Aggregate of the results if already known (an incremental
+            refresh merges the stored one with the new results' instead of
+            rebuilding it)
         
     Returns:
         Tuple of (analysis_dict, summary_text)
     """
-    # In a real implementation, this would use OpenAI or a custom-trained model
-    # For now, we'll return mock analysis
+    # Heuristic analysis computed locally; when LLM_ANALYSIS_ENABLED is set, analyze_results
+    # adds a map-reduce LLM analysis on top (see llm_analysis.py)
     
-    # Example of how you would call OpenAI in a real implementation:
+    # Aggregate platforms, sentiment, engagement and dates in one columnar pass
+    if aggregate is None:
+        aggregate = ResearchAggregate.from_results(results)
+    
+    analysis = {
+        **aggregate.to_analysis(),
+        "key_themes": extract_themes(results),
+        "competitor_mentions": extract_competitor_mentions(results, get_competitor_matcher(competitors)),
+        "user_pain_points": extract_pain_points(results)
+    }
+    
+    return analysis, summarize_analysis(analysis)
+
+def extract_pain_points(results: List[ResearchResult], limit: int = PAIN_POINT_LIMIT) -> List[str]:
     """
-    # Prepare the content for analysis
-    content_for_analysis = ""
-    for i, result in enumerate(results):
-        content_for_analysis += f"[{i+1}] Platform: {result.platform}\n"
-        content_for_analysis += f"Content: {result.content}\n"
-        content_for_analysis += f"Author: {result.author}\n"
-        content_for_analysis += f"Sentiment: {result.sentiment}\n\n"
+    The complaints that resonated most: the opening line of each negative
+    result, most engaged first.
+    """
+    negative = [result for result in results if result.sentiment == "negative" and result.content.strip()]
+    negative.sort(key=_engagement, reverse=True)
     
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are an expert market researcher analyzing social media content to validate startup ideas."},
-            {"role": "user", "content": f"Analyze the following social media content and provide insights for a startup founder:\n\n{content_for_analysis}"}
-        ]
-    )
-    analysis_text = response.choices[0].message.content
+    pain_points = []
+    for result in negative:
+        line = result.content.strip().splitlines()[0].strip()
+        if len(line) > PAIN_POINT_LENGTH:
+            line = line[:PAIN_POINT_LENGTH - 1].rstrip() + "\u2026"
+        if line not in pain_points:
+            pain_points.append(line)
+        if len(pain_points) == limit:
+            break
+    return pain_points
+
+def summarize_analysis(analysis: Dict[str, Any]) -> str:
+    """
+    Describe the computed analysis in a few sentences; every claim comes from
+    its fields.
     
-    # Parse the analysis text into structured data
-    # This would require more sophisticated parsing in a real implementation
+    Args:
+        analysis: The analysis dict built by analyze_research_data
+        
+    Returns:
+        The summary text
     """
+    total = analysis["total_results"]
+    if not total:
+        return "No results were found for this query, so there is nothing to analyze yet. Try a broader query or more platforms."
     
-    # Count platforms
-    platform_counts = {}
-    for result in results:
-        platform = result.platform
-        platform_counts[platform] = platform_counts.get(platform, 0) + 1
+    platforms = sorted(analysis["platform_distribution"].items(), key=lambda item: item[1], reverse=True)
+    sentences = [
+        f"Analyzed {total} result{'s' if total != 1 else ''} "
+        f"({', '.join(f'{count} from {platform}' for platform, count in platforms if count)})."
+    ]
     
-    # Count sentiments
-    sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0, "unknown": 0}
-    for result in results:
-        sentiment = result.sentiment or "unknown"
-        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
+    counts = analysis["sentiment_analysis"]
+    if total - counts.get("unknown", 0):
+        net = analysis["engagement_weighted_sentiment"]["net_score"]
+        lean = "mostly positive" if net >= SENTIMENT_LEAN else "mostly negative" if net <= -SENTIMENT_LEAN else "mixed"
+        sentences.append(
+            f"Sentiment is {lean}: {counts['positive']} positive, {counts['neutral']} neutral and "
+            f"{counts['negative']} negative, a net score of {net:+.2f} once weighted by engagement."
+        )
     
-    # Mock analysis for demonstration
-    analysis = {
-        "total_results": len(results),
-        "platform_distribution": platform_counts,
-        "sentiment_analysis": sentiment_counts,
-        "key_themes": [
-            {
-                "theme": "Cost concerns",
-                "frequency": 8,
-                "sample_quote": "Current options are too expensive for small businesses."
-            },
-            {
-                "theme": "Ease of use issues",
-                "frequency": 12,
-                "sample_quote": "The learning curve is too steep for most users."
-            },
-            {
-                "theme": "Integration problems",
-                "frequency": 5,
-                "sample_quote": "Doesn't work well with existing tools."
-            }
-        ],
-        "competitor_mentions": [
-            {"name": "Competitor A", "mentions": 15, "sentiment": "negative"},
-            {"name": "Competitor B", "mentions": 7, "sentiment": "neutral"},
-            {"name": "Competitor C", "mentions": 3, "sentiment": "positive"}
-        ],
-        "user_pain_points": [
-            "Time-consuming setup process",
-            "Poor customer support",
-            "Limited customization options",
-            "Reliability issues"
-        ]
-    }
+    themes = analysis["key_themes"][:3]
+    if themes:
+        sentences.append("The largest themes are " + "; ".join(f"{theme['theme']} ({theme['frequency']})" for theme in themes) + ".")
     
-    # Generate a summary
-    summary = """
-    Based on the analysis of social media content, there appears to be significant dissatisfaction with existing solutions in this market. Users frequently mention cost concerns and ease-of-use issues as major pain points. Competitor A receives the most mentions, primarily negative, suggesting an opportunity to improve upon their weaknesses.
-
-    The sentiment analysis shows a mix of opinions, with a slight lean toward negative experiences. This indicates unmet needs in the market that could be addressed by a new solution.
-
-    Key themes that emerged include cost concerns (especially for small businesses), ease of use issues, and integration problems with existing tools. These should be priority areas to address in your solution.
-
-    Recommended next steps:
-    1. Focus on addressing the top pain points: cost, ease of use, and integration
-    2. Consider how to differentiate from Competitor A while learning from their mistakes
-    3. Conduct direct user interviews to validate these findings
-    4. Develop a prototype that specifically addresses these pain points
-    """
+    mentions = analysis["competitor_mentions"]
+    if mentions:
+        top = mentions[0]
+        feeling = f", mostly {top['sentiment']}" if top["sentiment"] else ""
+        sentences.append(f"{top['name']} is the most mentioned competitor ({top['mentions']} result{'s' if top['mentions'] != 1 else ''}{feeling}).")
     
-    return analysis, summary.strip() 
\ No newline at end of file
+    pain_points = analysis["user_pain_points"]
+    if pain_points:
+        sentences.append(f"The most engaged complaint: \"{pain_points[0]}\"")
+    
+    return " ".join(sentences)
+
+def _engagement(result: ResearchResult) -> float:
+    return sum(value for value in (result.engagement or {}).values() if isinstance(value, (int, float)))
@@ -0,0 +1,222 @@
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+from .offload import run_blocking
+from .metrics import count_cache_lookup
+
+# Load environment variables
+load_dotenv()
+
+# In-process tier: entries live RESEARCH_CACHE_TTL seconds, total size capped at RESEARCH_CACHE_MAX_BYTES
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", "900"))
+RESEARCH_CACHE_MAX_BYTES = int(os.getenv("RESEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Expired entries are kept this much longer, to serve while a platform is unavailable
+RESEARCH_CACHE_STALE_TTL = float(os.getenv("RESEARCH_CACHE_STALE_TTL", str(24 * 3600)))
+
+# Shared on-disk tier (SQLite), readable by every uvicorn worker; disabled when unset
+RESEARCH_CACHE_DB = os.getenv("RESEARCH_CACHE_DB", "")
+
+# Prune expired rows from the disk tier every N writes
+_DISK_PRUNE_EVERY = 200
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used for cache keys."""
+    return " ".join(query.lower().split())
+
+def cache_key(platform: str, query: str, max_results: Optional[int]) -> str:
+    return f"{platform}:{max_results}:{normalize_query(query)}"
+
+class ResearchCache:
+    """
+    Two-tier cache of per-platform search results.
+
+    Entries are keyed on (platform, max_results, normalized query), so a request
+    for a subset of platforms reuses what earlier requests fetched. Values are
+    stored as serialized JSON: that gives an exact byte count for the budget and
+    callers always get fresh ResearchResult objects they are free to mutate.
+    
+    Expired entries linger for stale_ttl seconds, where only lookups that ask
+    for stale results (a platform is down and anything beats nothing) see them.
+    """
+
+    def __init__(
+        self,
+        ttl: float = RESEARCH_CACHE_TTL,
+        max_bytes: int = RESEARCH_CACHE_MAX_BYTES,
+        db_path: str = RESEARCH_CACHE_DB,
+        stale_ttl: float = RESEARCH_CACHE_STALE_TTL
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_writes = 0
+        self._db_ready = False
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "disk_errors": 0,
+        }
+
+    async def get(
+        self,
+        platform: str,
+        query: str,
+        max_results: Optional[int],
+        allow_stale: bool = False
+    ) -> Optional[List[ResearchResult]]:
+        """
+        Returns cached results for one platform, or None on a miss.
+        
+        With allow_stale, results that expired less than stale_ttl seconds ago
+        are returned too.
+        """
+        key = cache_key(platform, query, max_results)
+
+        entry = self._get_memory(key, allow_stale)
+        tier = "memory_hits"
+        if entry is None and self.db_path:
+            try:
+                entry = await run_blocking("research_cache", self._get_disk, key, allow_stale)
+            except sqlite3.Error:
+                self._stats["disk_errors"] += 1
+            if entry is not None:
+                self._set_memory(key, entry[1], entry[0])
+                tier = "disk_hits"
+
+        if entry is None:
+            self._stats["misses"] += 1
+            count_cache_lookup("research", "miss")
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            tier = "stale_hits"
+        self._stats[tier] += 1
+        count_cache_lookup("research", tier[:-1])
+        return self._decode(value)
+
+    async def set(self, platform: str, query: str, max_results: Optional[int], results: List[ResearchResult]) -> None:
+        """Cache one platform's results in both tiers."""
+        key = cache_key(platform, query, max_results)
+        value = json.dumps([result.model_dump() for result in results]).encode()
+        expires_at = time.time() + self.ttl
+
+        self._set_memory(key, value, expires_at)
+
+        if self.db_path:
+            try:
+                await run_blocking("research_cache", self._set_disk, key, value, expires_at)
+            except sqlite3.Error:
+                self._stats["disk_errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory usage."""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": bool(self.db_path),
+        }
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the disk tier is shared and left alone)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    @staticmethod
+    def _decode(value: bytes) -> List[ResearchResult]:
+        return [ResearchResult(**item) for item in json.loads(value)]
+
+    def _get_memory(self, key: str, allow_stale: bool = False) -> Optional[Tuple[float, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _ = entry
+        now = time.time()
+        if expires_at + self.stale_ttl <= now:
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return None
+        if expires_at <= now and not allow_stale:
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set_memory(self, key: str, value: bytes, expires_at: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += len(value)
+
+        # Evict least recently used entries until we are back under budget
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS research_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _get_disk(self, key: str, allow_stale: bool = False) -> Optional[Tuple[float, bytes]]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT expires_at, value FROM research_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time() - (self.stale_ttl if allow_stale else 0))
+            ).fetchone()
+        finally:
+            conn.close()
+        return (row[0], bytes(row[1])) if row else None
+
+    def _set_disk(self, key: str, value: bytes, expires_at: float) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO research_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                self._disk_writes += 1
+                if self._disk_writes % _DISK_PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM research_cache WHERE expires_at <= ?", (time.time() - self.stale_ttl,))
+        finally:
+            conn.close()
+
+# Create a singleton instance
+research_cache = ResearchCache()
@@ -0,0 +1,352 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from ..models.research import PlatformStatus, ResearchJob, ResearchQuery, ResearchResponse
+from .offload import run_blocking
+from .logs import request_id
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding the job queue; every worker process on the host shares it
+RESEARCH_JOBS_DB = os.getenv("RESEARCH_JOBS_DB", "research_jobs.db")
+
+# Jobs run concurrently by each process; 0 leaves jobs to dedicated worker processes (research_worker.py)
+RESEARCH_JOB_WORKERS = int(os.getenv("RESEARCH_JOB_WORKERS", "2"))
+
+# Seconds between queue polls when idle
+RESEARCH_JOB_POLL_INTERVAL = float(os.getenv("RESEARCH_JOB_POLL_INTERVAL", "1"))
+
+# A running job without a heartbeat for this long is assumed lost (its worker died) and requeued
+RESEARCH_JOB_STALE_AFTER = float(os.getenv("RESEARCH_JOB_STALE_AFTER", "120"))
+RESEARCH_JOB_MAX_ATTEMPTS = int(os.getenv("RESEARCH_JOB_MAX_ATTEMPTS", "3"))
+
+# Finished jobs are deleted after this many seconds
+RESEARCH_JOB_RETENTION = float(os.getenv("RESEARCH_JOB_RETENTION", str(7 * 24 * 3600)))
+
+# Runs one research query; reports each platform's outcome through the callback as it finishes
+JobHandler = Callable[
+    [ResearchQuery, Callable[[str, PlatformStatus], Awaitable[None]]],
+    Awaitable[ResearchResponse]
+]
+
+def _datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp is not None else None
+
+class ResearchJobQueue:
+    """
+    Durable queue of research jobs in a local SQLite database, with a pool of
+    asyncio workers that run them.
+
+    Jobs are claimed with a conditional UPDATE, so any number of processes on
+    the host (web workers and dedicated research_worker.py processes) can
+    share one queue. Every change to a job bumps its version, which is what
+    the status endpoint's ETag is made of. Running jobs send a heartbeat; a job
+    whose worker died is requeued, up to RESEARCH_JOB_MAX_ATTEMPTS attempts.
+    Progress and outcomes are only written while the job is still leased to
+    the worker that claimed it, so a worker that was presumed dead can't
+    overwrite the run that replaced it.
+    """
+
+    def __init__(
+        self,
+        db_path: str = RESEARCH_JOBS_DB,
+        poll_interval: float = RESEARCH_JOB_POLL_INTERVAL,
+        stale_after: float = RESEARCH_JOB_STALE_AFTER,
+        max_attempts: int = RESEARCH_JOB_MAX_ATTEMPTS
+    ):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._db_ready = False
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "requeued": 0}
+
+    async def submit(self, query: ResearchQuery) -> ResearchJob:
+        """Queue a research query and return the new job."""
+        job_id = uuid.uuid4().hex
+        await run_blocking("research_jobs", self._insert, job_id, query)
+        self._stats["submitted"] += 1
+        if self._wake is not None:
+            self._wake.set()
+        job, _ = await self.get(job_id)
+        return job
+
+    async def version(self, job_id: str) -> Optional[int]:
+        """Current version of a job (None if it doesn't exist); cheap enough to call on every poll."""
+        return await run_blocking("research_jobs", self._get_version, job_id)
+
+    async def get(self, job_id: str) -> Optional[Tuple[ResearchJob, int]]:
+        """Returns (job, version), or None if there is no such job."""
+        return await run_blocking("research_jobs", self._load, job_id)
+
+    async def start(self, handler: JobHandler, concurrency: int = RESEARCH_JOB_WORKERS) -> None:
+        """Start `concurrency` workers in this process; called from the FastAPI lifespan or the worker script."""
+        if self._tasks or concurrency <= 0:
+            return
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(handler)) for _ in range(concurrency)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running go back to the queue for another worker."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wake = None
+        try:
+            released = await run_blocking("research_jobs", self._release, self.worker_id)
+        except sqlite3.Error as e:
+            logger.warning("Could not requeue this worker's research jobs: %s", e)
+        else:
+            self._stats["requeued"] += released
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "workers": max(len(self._tasks) - 1, 0), "running": len(self._running)}
+
+    async def _work(self, handler: JobHandler) -> None:
+        while True:
+            try:
+                claimed = await run_blocking("research_jobs", self._claim, self.worker_id)
+            except Exception as e:
+                # Database errors, or a claimed row that doesn't parse (it is recovered once stale)
+                logger.warning("Could not claim a research job: %s", e)
+                claimed = None
+
+            if claimed is None:
+                # Idle: wait for a local submission or the next poll, whichever comes first
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, query, attempt = claimed
+            self._running[job_id] = asyncio.current_task()
+            # Log records of the job carry its id in place of a request ID
+            token = request_id.set(job_id)
+            try:
+                await self._run(handler, job_id, query, attempt)
+            except sqlite3.Error as e:
+                # Couldn't record the outcome; the heartbeat stops, so the job is retried once it goes stale
+                logger.warning("Could not record the outcome of research job %s: %s", job_id, e)
+            except Exception:
+                # Keep the worker alive; the job is retried the same way
+                logger.exception("Research job %s crashed", job_id)
+            finally:
+                request_id.reset(token)
+                del self._running[job_id]
+
+    async def _run(self, handler: JobHandler, job_id: str, query: ResearchQuery, attempt: int) -> None:
+        # This worker's lease on the job: a later claim of it (even by this process) has a higher attempt
+        lease = (self.worker_id, attempt)
+
+        async def on_platform_status(platform: str, outcome: PlatformStatus) -> None:
+            await run_blocking("research_jobs", self._set_progress, job_id, lease, platform, outcome)
+
+        try:
+            response = await handler(query, on_platform_status)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Research job %s failed: %s", job_id, e)
+            if await run_blocking("research_jobs", self._finish, job_id, lease, "failed", None, str(e)):
+                self._stats["failed"] += 1
+            return
+
+        if await run_blocking("research_jobs", self._finish, job_id, lease, "succeeded", response, None):
+            self._stats["succeeded"] += 1
+
+    async def _heartbeat(self) -> None:
+        # Keep this worker's jobs alive, requeue other workers' dead ones and drop old finished jobs
+        while True:
+            await asyncio.sleep(self.stale_after / 4)
+            try:
+                if self._running:
+                    await run_blocking("research_jobs", self._touch, self.worker_id, list(self._running))
+                requeued = await run_blocking("research_jobs", self._recover)
+                self._stats["requeued"] += requeued
+            except sqlite3.Error as e:
+                logger.warning("Research job heartbeat failed: %s", e)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._db_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS research_jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, query TEXT NOT NULL, progress TEXT NOT NULL, "
+                "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, version INTEGER NOT NULL DEFAULT 1, "
+                "worker TEXT, heartbeat_at REAL, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS research_jobs_status ON research_jobs (status, created_at)")
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _insert(self, job_id: str, query: ResearchQuery) -> None:
+        progress = {platform: None for platform in dict.fromkeys(query.platforms)}
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO research_jobs (id, status, query, progress, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                    (job_id, query.model_dump_json(), json.dumps(progress), time.time())
+                )
+        finally:
+            conn.close()
+
+    def _claim(self, worker: str) -> Optional[Tuple[str, ResearchQuery, int]]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                # The status check in the UPDATE makes the claim safe against other processes
+                row = conn.execute(
+                    "UPDATE research_jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                    "started_at = ?, heartbeat_at = ?, version = version + 1 "
+                    "WHERE id = (SELECT id FROM research_jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) "
+                    "AND status = 'queued' RETURNING id, query, attempts",
+                    (worker, now, now)
+                ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return row[0], ResearchQuery.model_validate_json(row[1]), row[2]
+
+    def _set_progress(self, job_id: str, lease: Tuple[str, int], platform: str, outcome: PlatformStatus) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE research_jobs SET progress = json_set(progress, ?, json(?)), heartbeat_at = ?, "
+                    "version = version + 1 WHERE id = ? AND status = 'running' AND worker = ? AND attempts = ?",
+                    (f'$."{platform}"', outcome.model_dump_json(), time.time(), job_id, *lease)
+                )
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, lease: Tuple[str, int], status: str, response: Optional[ResearchResponse], error: Optional[str]) -> bool:
+        """Record a job's outcome; False if the lease was lost (the job was requeued meanwhile)."""
+        result = response.model_dump_json() if response is not None else None
+        conn = self._connect()
+        try:
+            with conn:
+                updated = conn.execute(
+                    "UPDATE research_jobs SET status = ?, result = ?, error = ?, finished_at = ?, worker = NULL, "
+                    "version = version + 1 WHERE id = ? AND status = 'running' AND worker = ? AND attempts = ?",
+                    (status, result, error, time.time(), job_id, *lease)
+                ).rowcount
+        finally:
+            conn.close()
+        if not updated:
+            logger.warning("Research job %s was requeued while this worker ran it; discarding its outcome", job_id)
+        return bool(updated)
+
+    def _touch(self, worker: str, job_ids: List[str]) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE research_jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+                    [(time.time(), job_id, worker) for job_id in job_ids]
+                )
+        finally:
+            conn.close()
+
+    def _recover(self) -> int:
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                failed = conn.execute(
+                    "UPDATE research_jobs SET status = 'failed', error = 'Worker lost too many times', "
+                    "finished_at = ?, worker = NULL, version = version + 1 "
+                    "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                    (now, now - self.stale_after, self.max_attempts)
+                ).rowcount
+                requeued = conn.execute(
+                    "UPDATE research_jobs SET status = 'queued', progress = ("
+                    "SELECT json_group_object(key, json('null')) FROM json_each(research_jobs.progress)), "
+                    "worker = NULL, version = version + 1 WHERE status = 'running' AND heartbeat_at < ?",
+                    (now - self.stale_after,)
+                ).rowcount
+                conn.execute(
+                    "DELETE FROM research_jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                    (now - RESEARCH_JOB_RETENTION,)
+                )
+        finally:
+            conn.close()
+        if failed or requeued:
+            logger.warning("Recovered research jobs from lost workers: %d requeued, %d failed", requeued, failed)
+        return requeued
+
+    def _release(self, worker: str) -> int:
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(
+                    "UPDATE research_jobs SET status = 'queued', progress = ("
+                    "SELECT json_group_object(key, json('null')) FROM json_each(research_jobs.progress)), "
+                    "attempts = MAX(attempts - 1, 0), worker = NULL, version = version + 1 "
+                    "WHERE status = 'running' AND worker = ?",
+                    (worker,)
+                ).rowcount
+        finally:
+            conn.close()
+
+    def _get_version(self, job_id: str) -> Optional[int]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT version FROM research_jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def _load(self, job_id: str) -> Optional[Tuple[ResearchJob, int]]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, status, query, progress, result, error, attempts, created_at, started_at, finished_at, version "
+                "FROM research_jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+
+        job_id, status, query, progress, result, error, attempts, created_at, started_at, finished_at, version = row
+        job = ResearchJob(
+            id=job_id,
+            status=status,
+            query=ResearchQuery.model_validate_json(query),
+            progress=json.loads(progress),
+            result=ResearchResponse.model_validate_json(result) if result else None,
+            error=error,
+            attempts=attempts,
+            created_at=_datetime(created_at),
+            started_at=_datetime(started_at),
+            finished_at=_datetime(finished_at)
+        )
+        return job, version
+
+# Create a singleton instance
+research_jobs = ResearchJobQueue()
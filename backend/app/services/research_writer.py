@@ -0,0 +1,286 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+from .aggregation import ResearchAggregate
+from .offload import run_blocking
+from .supabase_client import get_supabase_client
+from .metrics import time_stage
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# A batch is flushed when it reaches RESEARCH_WRITE_BATCH_SIZE rows or its oldest row is RESEARCH_WRITE_MAX_AGE seconds old
+RESEARCH_WRITE_BATCH_SIZE = int(os.getenv("RESEARCH_WRITE_BATCH_SIZE", "50"))
+RESEARCH_WRITE_MAX_AGE = float(os.getenv("RESEARCH_WRITE_MAX_AGE", "2"))
+RESEARCH_WRITE_QUEUE_SIZE = int(os.getenv("RESEARCH_WRITE_QUEUE_SIZE", "10000"))
+
+# Failed batches are retried with exponential backoff before being spilled to disk
+RESEARCH_WRITE_MAX_RETRIES = int(os.getenv("RESEARCH_WRITE_MAX_RETRIES", "4"))
+RESEARCH_WRITE_RETRY_BASE = float(os.getenv("RESEARCH_WRITE_RETRY_BASE", "0.5"))
+
+# Directory for the append-only spill files, one per worker process
+RESEARCH_SPILL_DIR = os.getenv("RESEARCH_SPILL_DIR", "spill")
+
+# Queued after the last row by stop(): the flusher writes what it has and exits
+_STOP = object()
+
+class ResearchWriter:
+    """
+    Write-behind queue for research_results rows.
+
+    Rows are serialized once when enqueued and inserted in batches, so a burst
+    of searches costs one Supabase round trip per batch instead of one per
+    search. A batch that still fails after its retries is appended to a local
+    spill file; spill files are replayed when a worker starts and after the
+    next successful flush.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = RESEARCH_WRITE_BATCH_SIZE,
+        max_age: float = RESEARCH_WRITE_MAX_AGE,
+        queue_size: int = RESEARCH_WRITE_QUEUE_SIZE,
+        spill_dir: str = RESEARCH_SPILL_DIR
+    ):
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.queue_size = queue_size
+        self.spill_dir = spill_dir
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._has_spill = False
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "retries": 0, "spilled": 0, "replayed": 0, "rejected": 0}
+
+    @property
+    def spill_path(self) -> str:
+        return os.path.join(self.spill_dir, f"research_results-{os.getpid()}.jsonl")
+
+    @property
+    def rejected_path(self) -> str:
+        # Spilled lines that can't be parsed are kept here for inspection; the replay glob skips them
+        return os.path.join(self.spill_dir, f"research_results-{os.getpid()}.rejected")
+
+    async def start(self) -> None:
+        """Start the flusher; called from the FastAPI lifespan."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = False
+        self._has_spill = bool(glob.glob(os.path.join(self.spill_dir, "research_results-*.jsonl")))
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Flush everything still queued, then stop the flusher.
+
+        The flusher is told to drain rather than cancelled, so a batch whose
+        insert is already under way is neither lost nor written twice. Once
+        stopping, failed batches are spilled instead of retried.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        if not self._task.done():
+            await self._queue.put(_STOP)
+        try:
+            await self._task
+        except Exception:
+            logger.exception("Research writer stopped with an error")
+        self._task = None
+
+        # Rows enqueued while the flusher was draining
+        queue, self._queue = self._queue, None
+        rows = [row for row in (queue.get_nowait() for _ in range(queue.qsize())) if row is not _STOP]
+        for start in range(0, len(rows), self.batch_size):
+            await self._flush(rows[start:start + self.batch_size], retries=1)
+
+    def enqueue(
+        self,
+        query: str,
+        results: List[ResearchResult],
+        analysis: Dict[str, Any],
+        cursors: Optional[Dict[str, str]] = None,
+        aggregate: Optional[ResearchAggregate] = None
+    ) -> None:
+        """
+        Queue one research run for insertion. Never blocks and never raises.
+        
+        The row also records each platform's refresh cursor and the results'
+        aggregate columns, which an incremental refresh picks up from.
+        """
+        if aggregate is None:
+            aggregate = ResearchAggregate.from_results(results)
+        row = {
+            "query": query,
+            "results": [result.model_dump() for result in results],
+            "analysis": analysis,
+            "cursors": cursors or {},
+            "aggregate": aggregate.to_dict(),
+            # Captured now rather than defaulted by the database, since the insert is delayed
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        self._stats["enqueued"] += 1
+
+        if self._queue is None:
+            # Writer not running (e.g. outside the app lifespan): keep the row on disk
+            self._spill([row])
+            return
+
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self._spill([row])
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "queued": self._queue.qsize() if self._queue is not None else 0}
+
+    async def _run(self) -> None:
+        # Rows left on disk by an earlier run (or another worker) go first
+        if self._has_spill:
+            await self._replay_spill()
+
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            deadline = time.monotonic() + self.max_age
+            stop = False
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stop = True
+                    break
+                batch.append(row)
+
+            try:
+                flushed = await self._flush(batch)
+                if flushed and self._has_spill and not stop:
+                    await self._replay_spill()
+            except Exception:
+                # Keep the flusher alive; anything it was holding is on disk or already written
+                logger.exception("Error in the research results flusher")
+            if stop:
+                return
+
+    async def _flush(self, rows: List[Dict[str, Any]], retries: int = RESEARCH_WRITE_MAX_RETRIES) -> bool:
+        """Insert rows as one batch, retrying with backoff; spill them if every attempt fails."""
+        for attempt in range(retries):
+            try:
+                await self._insert(rows)
+                self._stats["written"] += len(rows)
+                self._stats["batches"] += 1
+                return True
+            except Exception as e:
+                logger.warning("Error storing %d research results (attempt %d/%d): %s", len(rows), attempt + 1, retries, e)
+                if attempt + 1 < retries and not self._stopping:
+                    self._stats["retries"] += 1
+                    delay = RESEARCH_WRITE_RETRY_BASE * 2 ** attempt
+                    await asyncio.sleep(delay + random.uniform(0, delay))
+                else:
+                    break
+
+        self._spill(rows)
+        return False
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        supabase = get_supabase_client()
+        insert = supabase.table("research_results").insert(rows)
+        with time_stage("db.write"):
+            await run_blocking("supabase", insert.execute)
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as spill:
+                for row in rows:
+                    spill.write(json.dumps(row, default=str) + "\n")
+        except OSError as e:
+            logger.error("Dropping %d research results, could not spill them: %s", len(rows), e)
+            return
+        self._stats["spilled"] += len(rows)
+        self._has_spill = True
+
+    async def _replay_spill(self) -> None:
+        """
+        Re-queue rows from every worker's spill file, claiming each file by renaming it.
+
+        Lines that aren't a JSON row (say, a write cut short by a crash) are
+        moved to the rejected file. A claimed file that can't be read is
+        renamed back under a name the next replay picks up.
+        """
+        self._has_spill = False
+        for path in glob.glob(os.path.join(self.spill_dir, "research_results-*.jsonl")):
+            claimed = f"{path}.replay-{os.getpid()}"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # Another worker claimed it first
+
+            try:
+                rows = self._read_spill(claimed)
+                os.remove(claimed)
+            except OSError as e:
+                logger.error("Could not replay spilled research results from %s: %s", claimed, e)
+                self._unclaim(claimed)
+                continue
+
+            self._stats["replayed"] += len(rows)
+            for start in range(0, len(rows), self.batch_size):
+                await self._flush(rows[start:start + self.batch_size])
+
+    def _read_spill(self, path: str) -> List[Dict[str, Any]]:
+        rows = []
+        rejected = []
+        with open(path, "rb") as spill:
+            for line in spill:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                if isinstance(row, dict):
+                    rows.append(row)
+                else:
+                    rejected.append(line if line.endswith(b"\n") else line + b"\n")
+
+        if rejected:
+            self._stats["rejected"] += len(rejected)
+            try:
+                with open(self.rejected_path, "ab") as out:
+                    out.writelines(rejected)
+                logger.warning("Skipping %d unreadable lines in %s; kept in %s", len(rejected), path, self.rejected_path)
+            except OSError as e:
+                logger.error("Dropping %d unreadable lines in %s, could not keep them: %s", len(rejected), path, e)
+        return rows
+
+    def _unclaim(self, claimed: str) -> None:
+        # A fresh name, since the owner may have started a new spill file under the old one
+        returned = os.path.join(self.spill_dir, f"research_results-{os.getpid()}-{time.time_ns()}.jsonl")
+        try:
+            os.rename(claimed, returned)
+            self._has_spill = True
+        except OSError as e:
+            logger.error("Could not return %s to the spill directory: %s", claimed, e)
+
+# Create a singleton instance
+research_writer = ResearchWriter()
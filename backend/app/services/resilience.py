@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional, TypeVar
+import httpx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Requests per minute and burst size per platform, matching each API's quota;
+# RATE_LIMIT_<PLATFORM>_PER_MINUTE and RATE_LIMIT_<PLATFORM>_BURST override them
+PLATFORM_RATE_LIMITS = {
+    "twitter": (30.0, 10),   # Recent search: 450 requests / 15 minutes per app
+    "reddit": (100.0, 20),   # OAuth clients: 100 queries per minute
+    "quora": (20.0, 5),      # No API; stay well under what gets a scraper banned
+}
+DEFAULT_RATE_LIMIT = (60.0, 10)
+
+# Attempts per call, and the base of the jittered exponential backoff between them (seconds)
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+
+# A Retry-After longer than this isn't waited out: the call fails and the breaker opens for that long;
+# a shorter one that still ends the call (its retries ran out) holds back the next call instead
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "5"))
+
+# Consecutive failures that open a platform's breaker, and seconds before it lets a probe call through
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RECOVERY_TIME = float(os.getenv("BREAKER_RECOVERY_TIME", "30"))
+
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a platform whose breaker is open."""
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    # httpx, tweepy and prawcore errors all carry the HTTP response
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    return status if isinstance(status, int) else None
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After, as seconds or an HTTP date), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limiting, server errors and network failures are worth retrying; anything else is not."""
+    if isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    return _status_code(exc) in _RETRYABLE_STATUS
+
+class TokenBucket:
+    """
+    Allows `rate` calls per second on average, with bursts of up to `capacity`.
+
+    A caller that finds the bucket empty reserves the next token (the bucket
+    goes into debt) and sleeps until it has accumulated, so waiters are served
+    in order. A reservation is given back if its caller is cancelled while
+    waiting, and the debt never exceeds `capacity` tokens: callers beyond that
+    wait without reserving until it has been paid down.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Take a token, waiting for one to accumulate if the bucket is empty."""
+        self._refill()
+        while self._tokens - 1 < -self.capacity:
+            await asyncio.sleep((1 - self.capacity - self._tokens) / self.rate)
+            self._refill()
+
+        self._tokens -= 1
+        if self._tokens < 0:
+            # The debt reserves our place: later callers wait behind us
+            try:
+                await asyncio.sleep(-self._tokens / self.rate)
+            except asyncio.CancelledError:
+                self._refill()
+                self._tokens = min(self.capacity, self._tokens + 1)
+                raise
+
+    def defer(self, seconds: float) -> None:
+        """Hold the next call back for at least `seconds` (a short Retry-After)."""
+        self._refill()
+        self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+class CircuitBreaker:
+    """
+    Fails fast while a platform is unhealthy.
+
+    Closed: calls go through and consecutive failures are counted. Open (after
+    failure_threshold failures, or a Retry-After over max_retry_after): calls are
+    refused until recovery_time has passed. Half-open: one probe call goes
+    through; its success closes the breaker and its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_time: float = BREAKER_RECOVERY_TIME,
+        max_retry_after: float = RETRY_MAX_DELAY
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.max_retry_after = max_retry_after
+        self.state = "closed"
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go through now; a True in half-open state claims the probe."""
+        now = time.monotonic()
+        if self.state == "open" and now >= self._open_until:
+            self.state = "half_open"
+            self._probe_in_flight = False
+
+        if self.state == "closed":
+            return True
+        # A probe that never reported back (its caller was cancelled) is given up on after recovery_time
+        if self.state == "half_open" and (not self._probe_in_flight or now - self._probe_started >= self.recovery_time):
+            self._probe_in_flight = True
+            self._probe_started = now
+            return True
+
+        self._stats["rejected"] += 1
+        return False
+
+    def record_success(self) -> None:
+        self._stats["successes"] += 1
+        if self.state != "closed":
+            logger.info("Circuit for %s closed", self.name)
+        self.state = "closed"
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        self._stats["failures"] += 1
+        self._failures += 1
+        self._probe_in_flight = False
+        long_retry_after = retry_after is not None and retry_after > self.max_retry_after
+        if self.state == "half_open" or self._failures >= self.failure_threshold or long_retry_after:
+            self._open(max(self.recovery_time, retry_after or 0.0))
+
+    def _open(self, duration: float) -> None:
+        if self.state != "open":
+            self._stats["opened"] += 1
+            logger.warning("Circuit for %s opened for %.1fs after %d consecutive failures", self.name, duration, self._failures)
+        self.state = "open"
+        self._open_until = time.monotonic() + duration
+
+    def status(self) -> Dict[str, Any]:
+        retry_in = max(self._open_until - time.monotonic(), 0.0) if self.state == "open" else 0.0
+        return {
+            **self._stats,
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(retry_in, 1),
+        }
+
+class PlatformGuard:
+    """Token bucket, retry policy and circuit breaker for one platform."""
+
+    def __init__(self, platform: str):
+        per_minute, burst = PLATFORM_RATE_LIMITS.get(platform, DEFAULT_RATE_LIMIT)
+        per_minute = float(os.getenv(f"RATE_LIMIT_{platform.upper()}_PER_MINUTE", per_minute))
+        burst = int(os.getenv(f"RATE_LIMIT_{platform.upper()}_BURST", burst))
+
+        self.platform = platform
+        self.bucket = TokenBucket(per_minute / 60.0, burst)
+        self.breaker = CircuitBreaker(platform)
+        self._stats = {"retries": 0}
+
+    async def admit(self) -> None:
+        """
+        Clear the breaker and take a rate-limit token for a new call.
+
+        Raises CircuitOpenError if the breaker refuses the call. The token wait
+        is local queueing, so callers enforce their deadline after this rather
+        than around it.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.platform} is unavailable, retrying in {self.breaker.status()['retry_in']:g}s")
+        await self.bucket.acquire()
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Iterate a platform stream admitted with admit(), retrying failures that
+        happen before the first item with jittered backoff (or the server's
+        Retry-After). Each retry takes another rate-limit token. A stream that
+        fails after yielding is not restarted, since its items have already
+        been passed on.
+
+        The caller reports the outcome with record_success / record_failure, so
+        deadlines it enforces count as failures too.
+        """
+        for attempt in range(RETRY_ATTEMPTS):
+            if attempt:
+                await self.bucket.acquire()
+            yielded = False
+            try:
+                async for item in open_stream():
+                    yielded = True
+                    yield item
+                return
+            except Exception as e:
+                if yielded or attempt + 1 == RETRY_ATTEMPTS or not is_retryable(e):
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    backoff = RETRY_BASE_DELAY * 2 ** attempt
+                    delay = backoff + random.uniform(0, backoff)
+                elif delay > RETRY_MAX_DELAY:
+                    raise
+                self._stats["retries"] += 1
+                logger.info("Retrying %s in %.2fs after: %s", self.platform, delay, e)
+                await asyncio.sleep(delay)
+
+    def record_success(self) -> None:
+        self.breaker.record_success()
+
+    def record_failure(self, exc: Optional[BaseException] = None) -> None:
+        # A long Retry-After keeps the platform closed for at least that long; a short one delays the next call
+        delay = retry_after(exc) if exc is not None else None
+        self.breaker.record_failure(delay)
+        if delay is not None and delay <= self.breaker.max_retry_after:
+            self.bucket.defer(delay)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.status(),
+            "tokens": round(self.bucket.tokens, 2),
+            "rate_per_minute": round(self.bucket.rate * 60, 2),
+            "burst": self.bucket.capacity,
+            **self._stats,
+        }
+
+_guards: Dict[str, PlatformGuard] = {}
+
+def get_guard(platform: str) -> PlatformGuard:
+    """Returns the shared guard for a platform, creating it on first use."""
+    guard = _guards.get(platform)
+    if guard is None:
+        guard = _guards[platform] = PlatformGuard(platform)
+    return guard
+
+def guard_status() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and rate-limit headroom of every platform used so far."""
+    return {platform: guard.status() for platform, guard in _guards.items()}
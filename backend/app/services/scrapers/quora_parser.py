@@ -0,0 +1,219 @@
+import logging
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "lxml" (C parser, incremental), "bs4" (html.parser, parses the whole page) or "auto": lxml when installed
+QUORA_PARSER = os.getenv("QUORA_PARSER", "auto")
+
+def _class_test(name: str) -> str:
+    # What the CSS class selector .name compiles to in XPath
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _question(title: str, path: str, answer: str, author: Optional[str]) -> Dict[str, str]:
+    return {"title": title, "path": path, "answer": answer, "author": author or "Anonymous"}
+
+class LxmlQuestionParser:
+    """
+    Incremental parser on lxml's C HTML parser.
+
+    Response bytes are fed as they arrive, without decoding them first. Each
+    question is extracted as soon as its container closes and is then dropped
+    from the tree, so memory stays flat however long the page is, and a caller
+    that has enough questions can stop reading the rest of it. Fields are read
+    with XPath expressions compiled once per process.
+    """
+
+    name = "lxml"
+    _xpaths: Optional[Dict[str, Any]] = None
+
+    def __init__(self, encoding: Optional[str] = None):
+        from lxml import etree
+
+        if LxmlQuestionParser._xpaths is None:
+            # The same selectors as SoupQuestionParser's, in XPath
+            LxmlQuestionParser._xpaths = {
+                "title": etree.XPath(f"string(.//span[{_class_test('question_title')}])"),
+                "path": etree.XPath("string((.//a)[1]/@href)"),
+                "answer": etree.XPath(f"string(.//div[{_class_test('answer_content')}])"),
+                "author": etree.XPath(f"string((.//a[{_class_test('user')}])[1])"),
+            }
+        self._parser = etree.HTMLPullParser(
+            events=("end",),
+            tag="div",
+            encoding=encoding or "utf-8",
+            remove_comments=True,
+            no_network=True
+        )
+
+    def feed(self, chunk: bytes) -> List[Dict[str, str]]:
+        """Parse the next chunk of the page; returns the questions it completed."""
+        self._parser.feed(chunk)
+        return self._read()
+
+    def close(self) -> List[Dict[str, str]]:
+        """Finish the page; returns any questions completed by its end."""
+        self._parser.close()
+        return self._read()
+
+    def _read(self) -> List[Dict[str, str]]:
+        xpaths = self._xpaths
+        questions = []
+        for _, element in self._parser.read_events():
+            if "question_container" not in (element.get("class") or "").split():
+                continue
+            questions.append(_question(
+                xpaths["title"](element),
+                xpaths["path"](element),
+                xpaths["answer"](element),
+                xpaths["author"](element)
+            ))
+            # Done with this question and everything before it
+            element.clear(keep_tail=True)
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return questions
+
+class SoupQuestionParser:
+    """
+    Fallback on BeautifulSoup's pure-Python html.parser.
+
+    Only question containers are built into the tree (a SoupStrainer) and
+    fields are found with soupsieve selectors compiled once per process, but
+    the page is still parsed whole: chunks are buffered and parsed on close().
+    """
+
+    name = "bs4"
+    _selectors: Optional[Dict[str, Any]] = None
+
+    def __init__(self, encoding: Optional[str] = None):
+        import soupsieve
+
+        if SoupQuestionParser._selectors is None:
+            SoupQuestionParser._selectors = {
+                "title": soupsieve.compile("span.question_title"),
+                "link": soupsieve.compile("a"),
+                "answer": soupsieve.compile("div.answer_content"),
+                "author": soupsieve.compile("a.user"),
+            }
+        self.encoding = encoding
+        self._chunks: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> List[Dict[str, str]]:
+        self._chunks.append(chunk)
+        return []
+
+    def close(self) -> List[Dict[str, str]]:
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        selectors = self._selectors
+        soup = BeautifulSoup(
+            b"".join(self._chunks),
+            "html.parser",
+            parse_only=SoupStrainer("div", class_="question_container"),
+            from_encoding=self.encoding
+        )
+        self._chunks = []
+        questions = []
+        for element in soup.find_all("div", class_="question_container", recursive=False):
+            title = selectors["title"].select_one(element)
+            link = selectors["link"].select_one(element)
+            answer = selectors["answer"].select_one(element)
+            author = selectors["author"].select_one(element)
+            questions.append(_question(
+                title.text if title is not None else "",
+                link.get("href", "") if link is not None else "",
+                answer.text if answer is not None else "",
+                author.text if author is not None else None
+            ))
+        return questions
+
+PARSERS: Dict[str, Callable[..., Any]] = {
+    "lxml": LxmlQuestionParser,
+    "bs4": SoupQuestionParser,
+}
+
+_auto_backend: Optional[str] = None
+
+def parser_backend(backend: str = QUORA_PARSER) -> str:
+    """The backend to use: the one asked for, or for "auto" lxml when it is installed and bs4 otherwise."""
+    global _auto_backend
+    if backend != "auto":
+        if backend not in PARSERS:
+            raise ValueError(f"Unknown Quora parser {backend!r}; choose from {sorted(PARSERS)} or 'auto'")
+        return backend
+    if _auto_backend is None:
+        try:
+            import lxml.etree  # noqa: F401
+            _auto_backend = "lxml"
+        except ImportError:
+            logger.info("lxml is not installed; parsing Quora pages with BeautifulSoup")
+            _auto_backend = "bs4"
+    return _auto_backend
+
+def create_parser(encoding: Optional[str] = None, backend: str = QUORA_PARSER) -> Any:
+    """
+    A parser for one search results page.
+
+    Args:
+        encoding: The page's charset, if the response declared one (UTF-8 otherwise)
+        backend: "lxml", "bs4" or "auto"
+
+    Returns:
+        An object with feed(chunk: bytes) and close(), each returning the
+        questions (dicts with title, path, answer and author) completed so far
+    """
+    return PARSERS[parser_backend(backend)](encoding)
+
+def parse_questions(
+    page: bytes,
+    max_results: Optional[int] = None,
+    encoding: Optional[str] = None,
+    backend: str = QUORA_PARSER,
+    chunk_size: int = 64 * 1024
+) -> List[Dict[str, str]]:
+    """
+    Extract the questions from a whole page, stopping once max_results are found.
+
+    The page is fed in chunk_size slices, so an incremental backend stops
+    parsing at the chunk that completes the last question needed.
+    """
+    parser = create_parser(encoding, backend)
+    questions: List[Dict[str, str]] = []
+    for start in range(0, len(page), chunk_size):
+        questions.extend(parser.feed(page[start:start + chunk_size]))
+        if max_results is not None and len(questions) >= max_results:
+            return questions[:max_results]
+    questions.extend(parser.close())
+    return questions[:max_results] if max_results is not None else questions
+
+async def iter_questions(
+    chunks: AsyncIterator[bytes],
+    max_results: Optional[int] = None,
+    encoding: Optional[str] = None,
+    backend: str = QUORA_PARSER
+) -> AsyncIterator[Dict[str, str]]:
+    """
+    Extract questions from a page as its bytes arrive (e.g. response.aiter_bytes()).
+
+    Stops reading chunks once max_results questions have been yielded, so the
+    rest of the page is neither downloaded nor parsed.
+    """
+    parser = create_parser(encoding, backend)
+    count = 0
+    async for chunk in chunks:
+        for question in parser.feed(chunk):
+            yield question
+            count += 1
+            if max_results is not None and count >= max_results:
+                return
+    for question in parser.close():
+        if max_results is not None and count >= max_results:
+            return
+        yield question
+        count += 1
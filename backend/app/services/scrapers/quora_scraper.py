@@ -1,13 +1,104 @@
+import logging
 import os
-import httpx
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from dotenv import load_dotenv
-from ...routers.research import ResearchResult
+from ...models.research import ResearchResult
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Site root; only changed to point the scraper at a stand-in server (benchmarks/stubs.py)
+QUORA_BASE_URL = os.getenv("QUORA_BASE_URL", "https://www.quora.com")
+
+def cursor(results: List[ResearchResult], previous: Optional[str] = None) -> Optional[str]:
+    """
+    High-water mark for an incremental refresh: the URL of the newest question
+    seen. Quora exposes no IDs or dates, but its results come newest first.
+    """
+    return results[0].source_url if results else previous
+
+async def stream(query: str, max_results: int = 50, since: Optional[str] = None) -> AsyncIterator[ResearchResult]:
+    """
+    Stream Quora questions and answers matching the query, yielding each result
+    as soon as it is fetched.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to yield
+        since: Stop at this question URL, the newest one seen before (a cursor())
+        
+    Yields:
+        ResearchResult objects
+    """
+    # In a real implementation, this would scrape Quora
+    # For now, we'll return mock data
+    
+    # Example of how you would scrape Quora in a real implementation:
+    """
+    # Format query for URL
+    formatted_query = query.replace(" ", "+")
+    url = f"{QUORA_BASE_URL}/search?q={formatted_query}&time=newest"
+    
+    # Stream the page on the worker's pooled client (reuses open connections)
+    # and parse the bytes as they arrive: once max_results questions are out,
+    # the rest of the page is neither downloaded nor parsed
+    client = get_http_client()
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for question in iter_questions(response.aiter_bytes(), max_results, response.charset_encoding):
+            question_url = QUORA_BASE_URL + question["path"]
+            if question_url == since:
+                break  # Everything from here on was fetched last time
+            
+            yield ResearchResult(
+                platform="quora",
+                source_url=question_url,
+                content=f"Q: {question['title']}\n\nA: {question['answer']}",
+                author=question["author"],
+                date=None,  # Quora doesn't easily expose dates
+                engagement=None,  # Quora doesn't easily expose engagement metrics
+                sentiment=None  # Would be analyzed separately
+            )
+    """
+    
+    # Mock data for demonstration
+    results = [
+        ResearchResult(
+            platform="quora",
+            source_url=f"https://www.quora.com/What-are-the-best-ways-to-solve-{query.replace(' ', '-')}",
+            content=f"Q: What are the best ways to solve {query}?\n\nA: In my experience working with over 50 startups, the most effective approach is to start by clearly defining the problem. Many entrepreneurs rush to solutions without fully understanding the underlying issues...",
+            author="Jane Smith, Startup Advisor",
+            date=None,
+            engagement=None,
+            sentiment="positive"
+        ),
+        ResearchResult(
+            platform="quora",
+            source_url=f"https://www.quora.com/Why-is-{query.replace(' ', '-')}-so-difficult-for-startups",
+            content=f"Q: Why is {query} so difficult for startups?\n\nA: The main reason startups struggle with this is lack of resources. Unlike established companies, startups don't have the luxury of dedicated teams to handle these challenges...",
+            author="Michael Johnson, Serial Entrepreneur",
+            date=None,
+            engagement=None,
+            sentiment="neutral"
+        ),
+        ResearchResult(
+            platform="quora",
+            source_url=f"https://www.quora.com/How-do-you-know-if-your-solution-to-{query.replace(' ', '-')}-is-working",
+            content=f"Q: How do you know if your solution to {query} is working?\n\nA: The key metrics to track are customer retention and engagement. If users are sticking around and actively using your product, that's a strong signal...",
+            author="Sarah Williams, Product Manager",
+            date=None,
+            engagement=None,
+            sentiment="positive"
+        )
+    ]
+    
+    for result in results:
+        if result.source_url == since:
+            break
+        yield result
+
 async def search(query: str, max_results: int = 50) -> List[ResearchResult]:
     """
     Search Quora for questions and answers matching the query.
@@ -20,81 +111,8 @@ async def search(query: str, max_results: int = 50) -> List[ResearchResult]:
         List of ResearchResult objects
     """
     try:
-        # In a real implementation, this would scrape Quora
-        # For now, we'll return mock data
-        
-        # Example of how you would scrape Quora in a real implementation:
-        """
-        results = []
-        
-        # Format query for URL
-        formatted_query = query.replace(" ", "+")
-        url = f"https://www.quora.com/search?q={formatted_query}"
-        
-        # Make request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find question elements
-            question_elements = soup.find_all('div', class_='question_container')
-            
-            for element in question_elements[:max_results]:
-                question_title = element.find('span', class_='question_title').text
-                question_url = "https://www.quora.com" + element.find('a')['href']
-                
-                # Get the top answer if available
-                answer_element = element.find('div', class_='answer_content')
-                answer_text = answer_element.text if answer_element else ""
-                
-                # Get author if available
-                author_element = element.find('a', class_='user')
-                author = author_element.text if author_element else "Anonymous"
-                
-                results.append(ResearchResult(
-                    platform="quora",
-                    source_url=question_url,
-                    content=f"Q: {question_title}\n\nA: {answer_text}",
-                    author=author,
-                    date=None,  # Quora doesn't easily expose dates
-                    engagement=None,  # Quora doesn't easily expose engagement metrics
-                    sentiment=None  # Would be analyzed separately
-                ))
-        """
-        
-        # Mock data for demonstration
-        results = [
-            ResearchResult(
-                platform="quora",
-                source_url=f"https://www.quora.com/What-are-the-best-ways-to-solve-{query.replace(' ', '-')}",
-                content=f"Q: What are the best ways to solve {query}?\n\nA: In my experience working with over 50 startups, the most effective approach is to start by clearly defining the problem. Many entrepreneurs rush to solutions without fully understanding the underlying issues...",
-                author="Jane Smith, Startup Advisor",
-                date=None,
-                engagement=None,
-                sentiment="positive"
-            ),
-            ResearchResult(
-                platform="quora",
-                source_url=f"https://www.quora.com/Why-is-{query.replace(' ', '-')}-so-difficult-for-startups",
-                content=f"Q: Why is {query} so difficult for startups?\n\nA: The main reason startups struggle with this is lack of resources. Unlike established companies, startups don't have the luxury of dedicated teams to handle these challenges...",
-                author="Michael Johnson, Serial Entrepreneur",
-                date=None,
-                engagement=None,
-                sentiment="neutral"
-            ),
-            ResearchResult(
-                platform="quora",
-                source_url=f"https://www.quora.com/How-do-you-know-if-your-solution-to-{query.replace(' ', '-')}-is-working",
-                content=f"Q: How do you know if your solution to {query} is working?\n\nA: The key metrics to track are customer retention and engagement. If users are sticking around and actively using your product, that's a strong signal...",
-                author="Sarah Williams, Product Manager",
-                date=None,
-                engagement=None,
-                sentiment="positive"
-            )
-        ]
-        
-        return results
+        return [result async for result in stream(query, max_results=max_results)]
         
     except Exception as e:
-        print(f"Error searching Quora: {str(e)}")
-        return [] 
\ No newline at end of file
+        logger.warning("Error searching Quora: %s", e)
+        return []
@@ -1,115 +1,186 @@
+import logging
 import os
-import praw
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Dict, Any, Optional
 from dotenv import load_dotenv
-from ...routers.research import ResearchResult
+from ...models.research import ResearchResult
+from ..clients import LazyClient
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Reddit API credentials
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "TheMomTestBot/1.0")
 
-# Initialize Reddit client
-reddit = praw.Reddit(
-    client_id=REDDIT_CLIENT_ID,
-    client_secret=REDDIT_CLIENT_SECRET,
-    user_agent=REDDIT_USER_AGENT
-)
+# API hosts; only changed to point the client at a stand-in server (benchmarks/stubs.py)
+REDDIT_OAUTH_URL = os.getenv("REDDIT_OAUTH_URL", "https://oauth.reddit.com")
+REDDIT_URL = os.getenv("REDDIT_URL", "https://www.reddit.com")
 
-async def search(query: str, max_results: int = 50) -> List[ResearchResult]:
+def _create_reddit_client():
+    if not REDDIT_CLIENT_ID or not REDDIT_CLIENT_SECRET:
+        raise ValueError("REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET must be set")
+
+    import praw
+    return praw.Reddit(
+        client_id=REDDIT_CLIENT_ID,
+        client_secret=REDDIT_CLIENT_SECRET,
+        user_agent=REDDIT_USER_AGENT,
+        oauth_url=REDDIT_OAUTH_URL,
+        reddit_url=REDDIT_URL
+    )
+
+# Reddit client, created on first use
+reddit_client = LazyClient("reddit", _create_reddit_client)
+
+def get_reddit_client():
+    """Returns the praw.Reddit instance, creating it on first use."""
+    return reddit_client.get()
+
+def _created_utc(result: ResearchResult) -> Optional[float]:
+    if not result.date:
+        return None
+    created = datetime.fromisoformat(result.date)
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
+def cursor(results: List[ResearchResult], previous: Optional[str] = None) -> Optional[str]:
+    """High-water mark for an incremental refresh: the newest created_utc seen so far."""
+    created = [timestamp for timestamp in map(_created_utc, results) if timestamp is not None]
+    if previous is not None:
+        created.append(float(previous))
+    return repr(max(created)) if created else None
+
+async def stream(query: str, max_results: int = 50, since: Optional[str] = None) -> AsyncIterator[ResearchResult]:
     """
-    Search Reddit for posts and comments matching the query.
+    Stream Reddit posts and comments matching the query, yielding each result
+    as soon as it is fetched.
     
     Args:
         query: The search query
-        max_results: Maximum number of results to return
+        max_results: Maximum number of results to yield
+        since: Only yield posts and comments created after this created_utc (a cursor())
         
-    Returns:
-        List of ResearchResult objects
+    Yields:
+        ResearchResult objects
     """
-    try:
-        # In a real implementation, this would use the Reddit API
-        # For now, we'll return mock data
-        
-        # Example of how you would call the Reddit API in a real implementation:
-        """
-        results = []
+    # In a real implementation, this would use the Reddit API
+    # For now, we'll return mock data
+    
+    # Example of how you would call the Reddit API in a real implementation:
+    """
+    reddit = get_reddit_client()
+    created_after = float(since) if since is not None else 0.0
+    
+    # praw is synchronous and listings fetch lazily while iterated, so the
+    # whole fetch runs in the Reddit thread pool instead of on the event loop.
+    # Newest first, so a refresh stops paging at the first item it has seen
+    def fetch():
+        submissions = list(itertools.takewhile(
+            lambda submission: submission.created_utc > created_after,
+            reddit.subreddit("all").search(query, sort="new", limit=max_results//2)
+        ))
+        comments = list(itertools.takewhile(
+            lambda comment: comment.created_utc > created_after,
+            reddit.subreddit("all").comments(limit=max_results//2)
+        ))
+        return submissions, comments
+    
+    submissions, comments = await run_blocking("reddit", fetch)
+    
+    # Search for submissions
+    for submission in submissions:
+        yield ResearchResult(
+            platform="reddit",
+            source_url=f"https://www.reddit.com{submission.permalink}",
+            content=submission.title + "\n\n" + submission.selftext,
+            author=submission.author.name if submission.author else "[deleted]",
+            date=datetime.fromtimestamp(submission.created_utc, timezone.utc).isoformat(),
+            engagement={
+                "upvotes": submission.score,
+                "comments": submission.num_comments
+            },
+            sentiment=None  # Would be analyzed separately
+        )
         
-        # Search for submissions
-        for submission in reddit.subreddit("all").search(query, limit=max_results//2):
-            results.append(ResearchResult(
+    # Search for comments
+    for comment in comments:
+        if query.lower() in comment.body.lower():
+            yield ResearchResult(
                 platform="reddit",
-                source_url=f"https://www.reddit.com{submission.permalink}",
-                content=submission.title + "\n\n" + submission.selftext,
-                author=submission.author.name if submission.author else "[deleted]",
-                date=datetime.fromtimestamp(submission.created_utc).isoformat(),
+                source_url=f"https://www.reddit.com{comment.permalink}",
+                content=comment.body,
+                author=comment.author.name if comment.author else "[deleted]",
+                date=datetime.fromtimestamp(comment.created_utc, timezone.utc).isoformat(),
                 engagement={
-                    "upvotes": submission.score,
-                    "comments": submission.num_comments
+                    "upvotes": comment.score
                 },
                 sentiment=None  # Would be analyzed separately
-            ))
-            
-        # Search for comments
-        for comment in reddit.subreddit("all").comments(limit=max_results//2):
-            if query.lower() in comment.body.lower():
-                results.append(ResearchResult(
-                    platform="reddit",
-                    source_url=f"https://www.reddit.com{comment.permalink}",
-                    content=comment.body,
-                    author=comment.author.name if comment.author else "[deleted]",
-                    date=datetime.fromtimestamp(comment.created_utc).isoformat(),
-                    engagement={
-                        "upvotes": comment.score
-                    },
-                    sentiment=None  # Would be analyzed separately
-                ))
-        """
-        
-        # Mock data for demonstration
-        results = [
-            ResearchResult(
-                platform="reddit",
-                source_url="https://www.reddit.com/r/startups/comments/123456/dealing_with_problem",
-                content=f"[Advice Needed] How do you deal with {query}?\n\nI've been struggling with this for my startup and would appreciate any advice from those who've overcome this challenge.",
-                author="startup_founder123",
-                date="2023-01-20T10:25:00Z",
-                engagement={
-                    "upvotes": 78,
-                    "comments": 32
-                },
-                sentiment="neutral"
-            ),
-            ResearchResult(
-                platform="reddit",
-                source_url="https://www.reddit.com/r/Entrepreneur/comments/789012/success_story",
-                content=f"How I solved {query} and grew my business 3x\n\nAfter months of struggling, I finally found a solution that worked for me. Here's my journey...",
-                author="successful_entrepreneur",
-                date="2023-01-18T16:40:00Z",
-                engagement={
-                    "upvotes": 215,
-                    "comments": 47
-                },
-                sentiment="positive"
-            ),
-            ResearchResult(
-                platform="reddit",
-                source_url="https://www.reddit.com/r/SaaS/comments/345678/comment/abc123",
-                content=f"The problem with most solutions for {query} is that they're built by engineers who don't understand the actual business needs. What we really need is...",
-                author="saas_veteran",
-                date="2023-01-12T08:15:00Z",
-                engagement={
-                    "upvotes": 42
-                },
-                sentiment="negative"
             )
-        ]
+    """
+    
+    # Mock data for demonstration
+    results = [
+        ResearchResult(
+            platform="reddit",
+            source_url="https://www.reddit.com/r/startups/comments/123456/dealing_with_problem",
+            content=f"[Advice Needed] How do you deal with {query}?\n\nI've been struggling with this for my startup and would appreciate any advice from those who've overcome this challenge.",
+            author="startup_founder123",
+            date="2023-01-20T10:25:00Z",
+            engagement={
+                "upvotes": 78,
+                "comments": 32
+            },
+            sentiment="neutral"
+        ),
+        ResearchResult(
+            platform="reddit",
+            source_url="https://www.reddit.com/r/Entrepreneur/comments/789012/success_story",
+            content=f"How I solved {query} and grew my business 3x\n\nAfter months of struggling, I finally found a solution that worked for me. Here's my journey...",
+            author="successful_entrepreneur",
+            date="2023-01-18T16:40:00Z",
+            engagement={
+                "upvotes": 215,
+                "comments": 47
+            },
+            sentiment="positive"
+        ),
+        ResearchResult(
+            platform="reddit",
+            source_url="https://www.reddit.com/r/SaaS/comments/345678/comment/abc123",
+            content=f"The problem with most solutions for {query} is that they're built by engineers who don't understand the actual business needs. What we really need is...",
+            author="saas_veteran",
+            date="2023-01-12T08:15:00Z",
+            engagement={
+                "upvotes": 42
+            },
+            sentiment="negative"
+        )
+    ]
+    
+    for result in results:
+        created = _created_utc(result)
+        if since is None or (created is not None and created > float(since)):
+            yield result
+
+async def search(query: str, max_results: int = 50) -> List[ResearchResult]:
+    """
+    Search Reddit for posts and comments matching the query.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
         
-        return results
+    Returns:
+        List of ResearchResult objects
+    """
+    try:
+        return [result async for result in stream(query, max_results=max_results)]
         
     except Exception as e:
-        print(f"Error searching Reddit: {str(e)}")
-        return [] 
\ No newline at end of file
+        logger.warning("Error searching Reddit: %s", e)
+        return []
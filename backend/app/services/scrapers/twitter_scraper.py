@@ -1,12 +1,16 @@
+import logging
 import os
-import tweepy
-from typing import List, Dict, Any, Optional
+import re
+from typing import AsyncIterator, List, Dict, Any, Optional
 from dotenv import load_dotenv
-from ...routers.research import ResearchResult
+from ...models.research import ResearchResult
+from ..clients import LazyClient
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Twitter API credentials
 TWITTER_API_KEY = os.getenv("TWITTER_API_KEY")
 TWITTER_API_SECRET = os.getenv("TWITTER_API_SECRET")
@@ -14,14 +18,129 @@ TWITTER_ACCESS_TOKEN = os.getenv("TWITTER_ACCESS_TOKEN")
 TWITTER_ACCESS_SECRET = os.getenv("TWITTER_ACCESS_SECRET")
 TWITTER_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
 
-# Initialize Twitter client
-client = tweepy.Client(
-    bearer_token=TWITTER_BEARER_TOKEN,
-    consumer_key=TWITTER_API_KEY,
-    consumer_secret=TWITTER_API_SECRET,
-    access_token=TWITTER_ACCESS_TOKEN,
-    access_token_secret=TWITTER_ACCESS_SECRET
-)
+def _create_twitter_client():
+    if not TWITTER_BEARER_TOKEN:
+        raise ValueError("TWITTER_BEARER_TOKEN must be set")
+
+    import tweepy
+    return tweepy.Client(
+        bearer_token=TWITTER_BEARER_TOKEN,
+        consumer_key=TWITTER_API_KEY,
+        consumer_secret=TWITTER_API_SECRET,
+        access_token=TWITTER_ACCESS_TOKEN,
+        access_token_secret=TWITTER_ACCESS_SECRET
+    )
+
+# Twitter client, created on first use
+twitter_client = LazyClient("twitter", _create_twitter_client)
+
+def get_twitter_client():
+    """Returns the tweepy.Client instance, creating it on first use."""
+    return twitter_client.get()
+
+_STATUS_ID = re.compile(r"/status/(\d+)")
+
+def _tweet_id(result: ResearchResult) -> Optional[int]:
+    match = _STATUS_ID.search(result.source_url)
+    return int(match.group(1)) if match else None
+
+def cursor(results: List[ResearchResult], previous: Optional[str] = None) -> Optional[str]:
+    """High-water mark for an incremental refresh: the newest tweet ID seen so far."""
+    ids = [tweet_id for tweet_id in map(_tweet_id, results) if tweet_id is not None]
+    if previous is not None:
+        ids.append(int(previous))
+    return str(max(ids)) if ids else None
+
+async def stream(query: str, max_results: int = 50, since: Optional[str] = None) -> AsyncIterator[ResearchResult]:
+    """
+    Stream tweets matching the query, yielding each result as soon as
+    it is fetched.
+    
+    Args:
+        query: The search query
+        max_results: Maximum number of results to yield
+        since: Only yield tweets newer than this tweet ID (a cursor())
+        
+    Yields:
+        ResearchResult objects
+    """
+    # In a real implementation, this would use the Twitter API
+    
+    # Example of how you would call the Twitter API in a real implementation:
+    """
+    # tweepy is synchronous, so the call runs in the Twitter thread pool
+    tweets = await run_blocking(
+        "twitter",
+        get_twitter_client().search_recent_tweets,
+        query=query,
+        max_results=max_results,
+        since_id=since,
+        tweet_fields=['created_at', 'public_metrics', 'author_id']
+    )
+    
+    for tweet in tweets.data:
+        yield ResearchResult(
+            platform="twitter",
+            source_url=f"https://twitter.com/user/status/{tweet.id}",
+            content=tweet.text,
+            author=tweet.author_id,  # Would need to look up actual username
+            date=tweet.created_at.isoformat(),
+            engagement={
+                "likes": tweet.public_metrics['like_count'],
+                "retweets": tweet.public_metrics['retweet_count'],
+                "replies": tweet.public_metrics['reply_count']
+            },
+            sentiment=None  # Would be analyzed separately
+        )
+    """
+    
+    # Mock data for demonstration
+    results = [
+        ResearchResult(
+            platform="twitter",
+            source_url="https://twitter.com/user1/status/123456789",
+            content=f"I've been struggling with {query} for months. Wish there was a better solution!",
+            author="@user1",
+            date="2023-01-15T14:30:00Z",
+            engagement={
+                "likes": 45,
+                "retweets": 12,
+                "replies": 8
+            },
+            sentiment="negative"
+        ),
+        ResearchResult(
+            platform="twitter",
+            source_url="https://twitter.com/user2/status/987654321",
+            content=f"Just discovered an amazing tool for {query}. Game changer!",
+            author="@user2",
+            date="2023-01-10T09:15:00Z",
+            engagement={
+                "likes": 132,
+                "retweets": 28,
+                "replies": 15
+            },
+            sentiment="positive"
+        ),
+        ResearchResult(
+            platform="twitter",
+            source_url="https://twitter.com/user3/status/456789123",
+            content=f"Anyone have recommendations for dealing with {query}? Current options are too expensive.",
+            author="@user3",
+            date="2023-01-05T18:45:00Z",
+            engagement={
+                "likes": 23,
+                "retweets": 5,
+                "replies": 19
+            },
+            sentiment="neutral"
+        )
+    ]
+    
+    for result in results:
+        tweet_id = _tweet_id(result)
+        if since is None or (tweet_id is not None and tweet_id > int(since)):
+            yield result
 
 async def search(query: str, max_results: int = 50) -> List[ResearchResult]:
     """
@@ -35,78 +154,8 @@ async def search(query: str, max_results: int = 50) -> List[ResearchResult]:
         List of ResearchResult objects
     """
     try:
-        # In a real implementation, this would use the Twitter API
-        
-        # Example of how you would call the Twitter API in a real implementation:
-        """
-        tweets = client.search_recent_tweets(
-            query=query,
-            max_results=max_results,
-            tweet_fields=['created_at', 'public_metrics', 'author_id']
-        )
-        
-        results = []
-        for tweet in tweets.data:
-            results.append(ResearchResult(
-                platform="twitter",
-                source_url=f"https://twitter.com/user/status/{tweet.id}",
-                content=tweet.text,
-                author=tweet.author_id,  # Would need to look up actual username
-                date=tweet.created_at.isoformat(),
-                engagement={
-                    "likes": tweet.public_metrics['like_count'],
-                    "retweets": tweet.public_metrics['retweet_count'],
-                    "replies": tweet.public_metrics['reply_count']
-                },
-                sentiment=None  # Would be analyzed separately
-            ))
-        """
-        
-        # Mock data for demonstration
-        results = [
-            ResearchResult(
-                platform="twitter",
-                source_url="https://twitter.com/user1/status/123456789",
-                content=f"I've been struggling with {query} for months. Wish there was a better solution!",
-                author="@user1",
-                date="2023-01-15T14:30:00Z",
-                engagement={
-                    "likes": 45,
-                    "retweets": 12,
-                    "replies": 8
-                },
-                sentiment="negative"
-            ),
-            ResearchResult(
-                platform="twitter",
-                source_url="https://twitter.com/user2/status/987654321",
-                content=f"Just discovered an amazing tool for {query}. Game changer!",
-                author="@user2",
-                date="2023-01-10T09:15:00Z",
-                engagement={
-                    "likes": 132,
-                    "retweets": 28,
-                    "replies": 15
-                },
-                sentiment="positive"
-            ),
-            ResearchResult(
-                platform="twitter",
-                source_url="https://twitter.com/user3/status/456789123",
-                content=f"Anyone have recommendations for dealing with {query}? Current options are too expensive.",
-                author="@user3",
-                date="2023-01-05T18:45:00Z",
-                engagement={
-                    "likes": 23,
-                    "retweets": 5,
-                    "replies": 19
-                },
-                sentiment="neutral"
-            )
-        ]
-        
-        return results
+        return [result async for result in stream(query, max_results=max_results)]
         
     except Exception as e:
-        print(f"Error searching Twitter: {str(e)}")
-        return [] 
\ No newline at end of file
+        logger.warning("Error searching Twitter: %s", e)
+        return []
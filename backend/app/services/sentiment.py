@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+from .offload import run_blocking
+
+# Load environment variables
+load_dotenv()
+
+# Batches at least this large are split across a process pool of SENTIMENT_PROCESSES workers
+SENTIMENT_PROCESS_THRESHOLD = int(os.getenv("SENTIMENT_PROCESS_THRESHOLD", "5000"))
+SENTIMENT_PROCESSES = int(os.getenv("SENTIMENT_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+# Scores are cached by content hash
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "50000"))
+
+# Optional extra lexicon: one "word<TAB>weight" per line, overriding the built-in weights
+SENTIMENT_LEXICON_PATH = os.getenv("SENTIMENT_LEXICON_PATH", "")
+
+# Compound scores beyond +/- this are labelled positive / negative
+NEUTRAL_BAND = 0.05
+
+# A negator flips (and damps) the polarity of the next few tokens
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.74
+
+# Normalizes raw sums into (-1, 1) the way VADER does
+_NORMALIZATION_ALPHA = 15.0
+
+# Word weights on a -4..4 scale, tuned for product and market feedback
+LEXICON: Dict[str, float] = {
+    # Positive
+    "amazing": 2.8, "awesome": 3.1, "best": 3.2, "better": 1.9, "brilliant": 2.8, "changer": 1.5,
+    "cheap": 1.0, "clean": 1.7, "convenient": 1.8, "easy": 1.9, "effective": 2.1, "efficient": 1.8,
+    "enjoy": 2.2, "excellent": 3.2, "fantastic": 2.6, "fast": 1.3, "favorite": 2.0, "fine": 0.8,
+    "fixed": 1.0, "glad": 2.0, "good": 1.9, "great": 3.1, "happy": 2.7, "helpful": 1.9,
+    "impressed": 2.1, "improved": 1.9, "intuitive": 1.8, "like": 1.5, "love": 3.2, "loved": 2.9,
+    "nice": 1.8, "perfect": 2.7, "pleased": 1.9, "recommend": 1.5, "reliable": 1.9, "saved": 1.6,
+    "seamless": 1.9, "simple": 1.2, "smooth": 1.5, "solved": 1.7, "solid": 1.6, "success": 2.7,
+    "superb": 3.1, "thanks": 1.9, "useful": 1.9, "valuable": 2.1, "win": 2.8, "wonderful": 2.7,
+    "worth": 0.9,
+    # Negative
+    "annoying": -1.7, "awful": -2.0, "bad": -2.5, "broken": -2.1, "buggy": -2.0, "clunky": -1.6,
+    "complicated": -1.4, "confusing": -1.7, "costly": -1.4, "crash": -2.2, "crashes": -2.2,
+    "difficult": -1.5, "disappointed": -2.3, "disappointing": -2.2, "expensive": -1.6, "fail": -2.5,
+    "failed": -2.3, "fails": -2.3, "frustrated": -2.4, "frustrating": -2.2, "hard": -0.4,
+    "hate": -2.7, "horrible": -2.5, "impossible": -1.6, "issue": -0.8, "issues": -0.9,
+    "lacking": -1.4, "lag": -1.1, "missing": -1.2, "nightmare": -2.8, "overpriced": -2.0,
+    "pain": -2.3, "painful": -2.4, "poor": -2.1, "problem": -1.7, "problems": -1.7,
+    "ridiculous": -1.9, "slow": -1.3, "struggle": -2.0, "struggled": -2.0, "struggling": -2.0,
+    "stuck": -1.6, "terrible": -2.9, "tedious": -1.6, "unreliable": -2.0, "unusable": -2.6,
+    "useless": -2.5, "waste": -1.8, "wish": -0.5, "worse": -2.1, "worst": -3.1, "wrong": -2.1,
+}
+
+NEGATORS = frozenset({
+    "not", "no", "never", "none", "nothing", "neither", "nor", "without", "cannot", "can't",
+    "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "weren't", "won't", "wouldn't",
+    "shouldn't", "couldn't", "hardly", "barely",
+})
+
+# Joins a batch into one string for tokenizing; matched as a token of its own
+_SEPARATOR = "\x1f"
+_TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|\x1f")
+
+class CompiledLexicon:
+    """
+    Lexicon compiled into a vocabulary index plus weight and negator vectors.
+
+    Scoring a batch tokenizes every text once, maps tokens to vocabulary ids,
+    and then works on flat arrays: negation scopes come from a running maximum
+    over negator positions, and per-document sums from one weighted bincount
+    (a sparse document-by-vocabulary product with the weight vector).
+    """
+
+    def __init__(self, lexicon: Dict[str, float], negators: frozenset):
+        words = sorted(set(lexicon) | set(negators))
+        self.vocabulary = {word: index for index, word in enumerate(words)}
+        # Out-of-vocabulary tokens map to an extra slot with no weight, and the
+        # batch separator gets a slot of its own
+        self.oov = len(words)
+        self.separator = len(words) + 1
+        self.vocabulary[_SEPARATOR] = self.separator
+        self.weights = np.zeros(len(words) + 2, dtype=np.float64)
+        self.is_negator = np.zeros(len(words) + 2, dtype=bool)
+        for word in words:
+            index = self.vocabulary[word]
+            self.weights[index] = lexicon.get(word, 0.0)
+            self.is_negator[index] = word in negators
+
+    def tokenize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns flat (token_ids, doc_ids) arrays for the whole batch."""
+        # One regex pass and one C-level dict lookup over the whole batch: the
+        # texts are joined with a separator token that marks document boundaries
+        tokens = _TOKEN_PATTERN.findall(_SEPARATOR.join(texts).lower())
+        token_ids = np.fromiter(
+            map(self.vocabulary.get, tokens, repeat(self.oov)),
+            dtype=np.int64,
+            count=len(tokens)
+        )
+        separators = token_ids == self.separator
+        if int(separators.sum()) != len(texts) - 1:
+            # A text contained the separator itself; fall back to one pass per text
+            return self._tokenize_each(texts)
+
+        doc_ids = np.cumsum(separators)[~separators]
+        return token_ids[~separators], doc_ids
+
+    def _tokenize_each(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        token_ids: List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for doc, text in enumerate(texts):
+            tokens = _TOKEN_PATTERN.findall(text.lower().replace(_SEPARATOR, " "))
+            token_ids.extend(map(self.vocabulary.get, tokens, repeat(self.oov)))
+            lengths[doc] = len(tokens)
+        return np.array(token_ids, dtype=np.int64), np.repeat(np.arange(len(texts)), lengths)
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        """Compound score in (-1, 1) for every text."""
+        if not texts:
+            return np.empty(0, dtype=np.float64)
+
+        token_ids, doc_ids = self.tokenize(texts)
+        positions = np.arange(len(token_ids))
+
+        # Position of the closest negator at or before each token (-1 if none yet)
+        negator_positions = np.where(self.is_negator[token_ids], positions, -1)
+        last_negator = np.maximum.accumulate(negator_positions) if len(token_ids) else negator_positions
+
+        # Index of the first token of each token's document, so scopes don't leak across documents
+        doc_starts = np.searchsorted(doc_ids, doc_ids, side="left")
+        distance = positions - last_negator
+        negated = (last_negator >= doc_starts) & (distance > 0) & (distance <= NEGATION_WINDOW)
+
+        token_scores = self.weights[token_ids] * np.where(negated, NEGATION_FACTOR, 1.0)
+        sums = np.bincount(doc_ids, weights=token_scores, minlength=len(texts))
+        return sums / np.sqrt(sums * sums + _NORMALIZATION_ALPHA)
+
+def _load_lexicon() -> CompiledLexicon:
+    lexicon = dict(LEXICON)
+    if SENTIMENT_LEXICON_PATH:
+        with open(SENTIMENT_LEXICON_PATH, encoding="utf-8") as lexicon_file:
+            for line in lexicon_file:
+                word, _, weight = line.strip().partition("\t")
+                if word and weight:
+                    lexicon[word.lower()] = float(weight)
+    return CompiledLexicon(lexicon, NEGATORS)
+
+_lexicon: Optional[CompiledLexicon] = None
+
+def get_lexicon() -> CompiledLexicon:
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = _load_lexicon()
+    return _lexicon
+
+def label(score: float) -> str:
+    if score > NEUTRAL_BAND:
+        return "positive"
+    if score < -NEUTRAL_BAND:
+        return "negative"
+    return "neutral"
+
+def score_texts(texts: Sequence[str]) -> List[str]:
+    """Label a batch of texts in this process, without the cache."""
+    return [label(score) for score in get_lexicon().score(texts)]
+
+class SentimentScorer:
+    """
+    Batch sentiment labelling with a content-hash cache.
+
+    Cached texts are never rescored; the rest are scored in one batch, inline
+    for small batches and split across a process pool for large ones.
+    """
+
+    def __init__(self, cache_size: int = SENTIMENT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _lookup(self, texts: Sequence[str]) -> Tuple[List[Optional[str]], List[int]]:
+        labels: List[Optional[str]] = []
+        missing = []
+        for index, text in enumerate(texts):
+            key = self._key(text)
+            cached = self._cache.get(key)
+            if cached is None:
+                missing.append(index)
+                self._stats["misses"] += 1
+            else:
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+            labels.append(cached)
+        return labels, missing
+
+    def _store(self, texts: Sequence[str], labels: Sequence[str]) -> None:
+        for text, sentiment in zip(texts, labels):
+            self._cache[self._key(text)] = sentiment
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def score(self, texts: Sequence[str]) -> List[str]:
+        """Label texts synchronously (always in-process)."""
+        labels, missing = self._lookup(texts)
+        if missing:
+            fresh = score_texts([texts[index] for index in missing])
+            self._store([texts[index] for index in missing], fresh)
+            for index, sentiment in zip(missing, fresh):
+                labels[index] = sentiment
+        return labels
+
+    async def score_async(self, texts: Sequence[str]) -> List[str]:
+        """
+        Label texts off the event loop: the uncached part of the batch is
+        scored on the "analysis" threads, or in the process pool when large.
+        """
+        labels, missing = self._lookup(texts)
+        if not missing:
+            return labels
+
+        pending = [texts[index] for index in missing]
+        if len(pending) >= SENTIMENT_PROCESS_THRESHOLD and SENTIMENT_PROCESSES > 1:
+            fresh = await self._score_in_pool(pending)
+        else:
+            fresh = await run_blocking("analysis", score_texts, pending)
+
+        self._store(pending, fresh)
+        for index, sentiment in zip(missing, fresh):
+            labels[index] = sentiment
+        return labels
+
+    async def _score_in_pool(self, texts: List[str]) -> List[str]:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=SENTIMENT_PROCESSES)
+        loop = asyncio.get_running_loop()
+        size = -(-len(texts) // SENTIMENT_PROCESSES)
+        chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+        scored = await asyncio.gather(*(loop.run_in_executor(self._pool, score_texts, chunk) for chunk in chunks))
+        return [sentiment for chunk in scored for sentiment in chunk]
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._cache)}
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+# Create a singleton instance
+sentiment_scorer = SentimentScorer()
+
+async def fill_sentiment(results: List[ResearchResult]) -> None:
+    """Set `sentiment` in place on every result that doesn't have one yet."""
+    unscored = [result for result in results if result.sentiment is None]
+    if not unscored:
+        return
+    labels = await sentiment_scorer.score_async([result.content for result in unscored])
+    for result, sentiment in zip(unscored, labels):
+        result.sentiment = sentiment
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task. Each caller waits through
+    asyncio.shield, so a client that disconnects only cancels its own wait,
+    never the work the other callers depend on. Once the task finishes the
+    key is released and the next call starts fresh work.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._stats = {"started": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run fn() for this key, or join the run already in flight.
+
+        Returns:
+            Tuple of (result, shared); shared is True when this caller joined
+            work started by another caller
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+            self._stats["started"] += 1
+        else:
+            self._stats["coalesced"] += 1
+
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "in_flight": len(self._inflight)}
+
+    def _release(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,50 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Reference point for the report: this module is imported first thing in main.py
+BOOT_STARTED = time.perf_counter()
+
+_phases: List[Dict[str, Any]] = []
+_ready_at = None
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Time one step of worker boot (imports, app creation, lifespan startup, ...)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append({
+            "phase": name,
+            "started_ms": round((started - BOOT_STARTED) * 1000, 1),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
+
+def mark_ready() -> None:
+    """Record the moment the worker starts accepting requests."""
+    global _ready_at
+    _ready_at = time.perf_counter()
+
+def startup_report() -> Dict[str, Any]:
+    """
+    Returns where boot time went: each timed phase, time until the worker was
+    ready, and how long each lazily created client took (or why it failed).
+    """
+    from .clients import client_status
+
+    return {
+        "ready_ms": round((_ready_at - BOOT_STARTED) * 1000, 1) if _ready_at else None,
+        "phases": list(_phases),
+        "clients": client_status()
+    }
+
+def log_startup_report() -> None:
+    """Log a one-line-per-phase summary of the startup report."""
+    report = startup_report()
+    logger.info("Worker ready in %s ms", report["ready_ms"])
+    for phase in report["phases"]:
+        logger.info("  %-28s %8.1f ms", phase["phase"], phase["elapsed_ms"])
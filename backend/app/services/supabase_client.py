@@ -1,6 +1,10 @@
 import os
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
+from .clients import LazyClient
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Load environment variables
 load_dotenv()
@@ -9,11 +13,20 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+def _create_supabase_client() -> "Client":
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
+
+    from supabase import create_client
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Created on first use so importing the app never touches Supabase
+supabase = LazyClient("supabase", _create_supabase_client)
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """
-    Returns the Supabase client instance.
+    Returns the Supabase client instance, creating it on first use.
+    
+    Raises ClientUnavailableError if the client cannot be created.
     """
-    return supabase 
\ No newline at end of file
+    return supabase.get()
@@ -0,0 +1,149 @@
+import logging
+import math
+import os
+import re
+import warnings
+from typing import Any, Dict, List, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from ..models.research import ResearchResult
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# At most this many themes are reported per analysis
+THEME_MAX_THEMES = int(os.getenv("THEME_MAX_THEMES", "8"))
+
+# Vocabulary cap for the TF-IDF matrix (unigrams and bigrams)
+THEME_MAX_FEATURES = int(os.getenv("THEME_MAX_FEATURES", "20000"))
+
+# Terms used to label a theme
+THEME_LABEL_TERMS = int(os.getenv("THEME_LABEL_TERMS", "3"))
+
+# Below this many results clustering says little; no themes are reported
+THEME_MIN_RESULTS = int(os.getenv("THEME_MIN_RESULTS", "4"))
+
+# Rows per k-means mini-batch
+_BATCH_SIZE = 1024
+
+# Words of two or more characters, keeping contractions whole ("don't", "i've") so their
+# fragments ("ve", "don") don't end up as theme terms
+_TOKEN_PATTERN = r"(?u)\b\w(?:\w|'\w)+\b"
+_POSSESSIVE = re.compile(r"'s\b")
+
+# Contractions, which scikit-learn's English stop words leave out; possessive 's is stripped before tokenizing
+_CONTRACTIONS = frozenset({
+    "i'm", "i've", "i'd", "i'll", "you're", "you've", "you'd", "you'll", "he'd", "he'll", "she'd", "she'll",
+    "we're", "we've", "we'd", "we'll", "they're", "they've", "they'd", "they'll", "it'll", "that'll",
+    "don't", "doesn't", "didn't", "can't", "couldn't", "won't", "wouldn't", "shouldn't", "isn't", "aren't",
+    "wasn't", "weren't", "haven't", "hasn't", "hadn't", "ain't", "y'all",
+})
+
+def _preprocess(text: str) -> str:
+    # Typographic apostrophes are common in scraped posts
+    return _POSSESSIVE.sub("", text.lower().replace("\u2019", "'"))
+
+def _theme_count(documents: int, max_themes: int) -> int:
+    # Roughly sqrt(n / 2) clusters, a common rule of thumb for short texts
+    return max(2, min(max_themes, round(math.sqrt(documents / 2)), documents))
+
+def _label_terms(weights: np.ndarray, terms: np.ndarray, count: int) -> List[str]:
+    """Top weighted n-grams of a centroid, skipping ones already covered by a picked term."""
+    picked: List[str] = []
+    for index in np.argsort(weights)[::-1]:
+        if weights[index] <= 0 or len(picked) == count:
+            break
+        term = terms[index]
+        words = set(term.split())
+        if any(words <= set(other.split()) or set(other.split()) <= words for other in picked):
+            continue
+        picked.append(term)
+    return picked
+
+def extract_themes(results: Sequence[ResearchResult], max_themes: int = THEME_MAX_THEMES) -> List[Dict[str, Any]]:
+    """
+    Cluster result contents into themes.
+
+    Contents are vectorized once into a sparse, L2-normalized TF-IDF matrix
+    over unigrams and bigrams and clustered with mini-batch k-means, so the
+    cost stays close to linear in the number of results. Each theme is
+    labelled with its centroid's top n-grams, and its sample quote is the
+    member closest to the centroid.
+
+    Args:
+        results: Research results to cluster
+        max_themes: Upper bound on the number of themes
+
+    Returns:
+        Themes ordered by frequency, each with theme, frequency, terms and sample_quote
+    """
+    try:
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+    except ImportError:
+        logger.warning("scikit-learn is not installed; key themes are not extracted")
+        return []
+
+    contents = [result.content for result in results if result.content and result.content.strip()]
+    if len(contents) < THEME_MIN_RESULTS:
+        return []
+
+    vectorizer = TfidfVectorizer(
+        ngram_range=(1, 2),
+        preprocessor=_preprocess,
+        token_pattern=_TOKEN_PATTERN,
+        stop_words=sorted(ENGLISH_STOP_WORDS | _CONTRACTIONS),
+        # Terms must recur to describe a theme, once there are enough results for that to be expected
+        min_df=2 if len(contents) >= 50 else 1,
+        max_df=0.5,
+        max_features=THEME_MAX_FEATURES,
+        sublinear_tf=True,
+        dtype=np.float32
+    )
+    try:
+        matrix = vectorizer.fit_transform(contents)
+    except ValueError:
+        # Nothing but stop words
+        return []
+
+    # Rows with no remaining terms can't be placed in any theme
+    kept = np.flatnonzero(matrix.getnnz(axis=1))
+    matrix = matrix[kept]
+    if matrix.shape[0] < THEME_MIN_RESULTS:
+        return []
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=_theme_count(matrix.shape[0], max_themes),
+        batch_size=_BATCH_SIZE,
+        n_init=3,
+        random_state=0
+    )
+    with warnings.catch_warnings():
+        # Fewer distinct posts than clusters only means some themes come out empty
+        warnings.simplefilter("ignore")
+        labels = kmeans.fit_predict(matrix)
+
+    terms = vectorizer.get_feature_names_out()
+    # Rows are L2-normalized, so a dot product with the centroid ranks members by cosine similarity
+    similarity = np.asarray(matrix @ kmeans.cluster_centers_.T)[np.arange(len(labels)), labels]
+
+    themes = []
+    for cluster, centroid in enumerate(kmeans.cluster_centers_):
+        members = np.flatnonzero(labels == cluster)
+        if not len(members):
+            continue
+        label_terms = _label_terms(centroid, terms, THEME_LABEL_TERMS)
+        if not label_terms:
+            continue
+        representative = kept[members[np.argmax(similarity[members])]]
+        themes.append({
+            "theme": ", ".join(label_terms),
+            "frequency": int(len(members)),
+            "terms": label_terms,
+            "sample_quote": contents[representative],
+        })
+
+    themes.sort(key=lambda theme: theme["frequency"], reverse=True)
+    return themes
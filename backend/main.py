@@ -1,36 +1,116 @@
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from app.services.startup_report import startup_phase, startup_report, mark_ready, log_startup_report
+
+with startup_phase("import fastapi"):
+    from fastapi import FastAPI, HTTPException, Depends, Request, status
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, Response
+    from pydantic import BaseModel
+
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # Import our modules
-from app.routers import validation, research, auth
-from app.services.supabase_client import get_supabase_client
+with startup_phase("import routers"):
+    from app.routers import validation, research, auth, profiling
+    from app.services.supabase_client import get_supabase_client
+    from app.services.offload import DEBUG, install_loop_monitor, shutdown_executors
+    from app.services.clients import ClientUnavailableError, warm_up_clients
+    from app.services.http_client import start_http_client, close_http_client
+    from app.services.research_writer import research_writer
+    from app.services.research_jobs import research_jobs
+    from app.services.sentiment import sentiment_scorer
+    from app.services.auth import token_verifier
+    from app.services.logs import configure_logging
+    from app.services.metrics import MetricsMiddleware, render_metrics, METRICS_CONTENT_TYPE
+    from app.services.profiling import ProfilingMiddleware, PROFILING_ENABLED
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(
-    title="The Mom Test Bot API",
-    description="API for validating startup ideas using The Mom Test principles",
-    version="0.1.0",
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(validation.router, prefix="/validation", tags=["Validation"])
-app.include_router(research.router, prefix="/research", tags=["Research"])
+# Log records are tagged with the ID of the request that produced them
+configure_logging()
+
+# Clients to create in the background at startup: "all", "none" or a comma-separated list
+WARM_UP_CLIENTS = os.getenv("WARM_UP_CLIENTS", "all")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_phase("lifespan startup"):
+        if DEBUG:
+            install_loop_monitor()
+        
+        # One pooled HTTP client per worker, shared by all scrapers
+        await start_http_client()
+        
+        # Keeps Supabase's signing keys cached so access tokens are verified locally
+        await token_verifier.start()
+        
+        # Batches research_results inserts; flushed on shutdown
+        await research_writer.start()
+        
+        # Background research jobs (RESEARCH_JOB_WORKERS per process; 0 leaves them to research_worker.py)
+        await research_jobs.start(research.run_research_job)
+        
+        # Warm clients up without delaying readiness; failures are only logged
+        warm_up_task = None
+        if WARM_UP_CLIENTS != "none":
+            names = None if WARM_UP_CLIENTS == "all" else [name.strip() for name in WARM_UP_CLIENTS.split(",")]
+            warm_up_task = asyncio.create_task(warm_up_clients(names))
+    
+    mark_ready()
+    log_startup_report()
+    yield
+    
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await research_jobs.stop()
+    await research_writer.stop()
+    await token_verifier.stop()
+    await close_http_client()
+    sentiment_scorer.shutdown()
+    # Let in-flight blocking calls finish before the worker exits
+    shutdown_executors()
+
+with startup_phase("create app"):
+    app = FastAPI(
+        title="The Mom Test Bot API",
+        description="API for validating startup ideas using The Mom Test principles",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Per-route latency, requests in flight and request IDs
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
+    app.include_router(validation.router, prefix="/validation", tags=["Validation"])
+    app.include_router(research.router, prefix="/research", tags=["Research"])
+
+    # Profiling routes and the per-request profiler exist only when PROFILING_TOKEN is set
+    if PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+        app.include_router(profiling.router, prefix="/debug/profile", tags=["Profiling"], include_in_schema=False)
+
+@app.exception_handler(ClientUnavailableError)
+async def client_unavailable_handler(request: Request, exc: ClientUnavailableError):
+    # A platform without credentials degrades to 503 instead of taking the app down
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)}
+    )
 
 @app.get("/")
 async def root():
@@ -40,6 +120,16 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Latency histograms, in-flight requests, stage timers and cache counters in Prometheus format."""
+    return Response(render_metrics(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+@app.get("/health/startup")
+async def startup_health():
+    """Where this worker's boot time went, and the state of each lazily created client."""
+    return startup_report()
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
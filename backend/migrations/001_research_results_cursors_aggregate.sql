@@ -0,0 +1,8 @@
+-- Incremental research refresh (POST /research/refresh).
+-- cursors: each platform's refresh cursor, e.g. {"twitter": "1615012345678901234", "reddit": "1674210300.0"}
+-- aggregate: the results' aggregate columns (ResearchAggregate.to_dict()), extended by each refresh
+-- Rows stored before this migration have neither; a refresh of them runs a full search for
+-- platforms without a cursor and rebuilds the aggregate once.
+alter table research_results
+    add column if not exists cursors jsonb,
+    add column if not exists aggregate jsonb;
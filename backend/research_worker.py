@@ -0,0 +1,58 @@
+"""
+Dedicated research job worker.
+
+Runs queued research jobs without serving HTTP, so research capacity can be
+scaled separately from the web workers (run those with RESEARCH_JOB_WORKERS=0
+and start as many of these as needed on the same host):
+
+    python research_worker.py --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from app.services.logs import configure_logging
+from app.routers.research import run_research_job
+from app.services.http_client import start_http_client, close_http_client
+from app.services.offload import shutdown_executors
+from app.services.research_jobs import research_jobs, RESEARCH_JOB_WORKERS
+from app.services.research_writer import research_writer
+from app.services.sentiment import sentiment_scorer
+
+logger = logging.getLogger("research_worker")
+
+async def run(concurrency: int) -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+
+    await start_http_client()
+    await research_writer.start()
+    await research_jobs.start(run_research_job, concurrency)
+    logger.info("Research worker %s running %d jobs at a time", research_jobs.worker_id, concurrency)
+
+    await stopping.wait()
+
+    # Jobs still running go back to the queue for another worker
+    await research_jobs.stop()
+    await research_writer.stop()
+    await close_http_client()
+    sentiment_scorer.shutdown()
+    shutdown_executors()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued research jobs.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(RESEARCH_JOB_WORKERS, 1),
+        help="Jobs run at the same time (default: RESEARCH_JOB_WORKERS, at least 1)"
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    asyncio.run(run(args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import asyncio
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk, jwt
+from app.services import auth
+from app.services.auth import InvalidTokenError, TokenVerifier
+
+ISSUER = "https://project.supabase.test/auth/v1"
+
+def _private_pem(key) -> bytes:
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+
+def _public_jwk(key, algorithm: str, kid: str) -> dict:
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {**jwk.construct(public_pem, algorithm).to_dict(), "kid": kid}
+
+RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+EC_KEY = ec.generate_private_key(ec.SECP256R1())
+
+def _token(key=RSA_KEY, algorithm: str = "RS256", kid: str = "rsa-1", **claims) -> str:
+    claims = {"sub": "user-1", "aud": "authenticated", "iss": ISSUER, "exp": int(time.time()) + 60, **claims}
+    signing_key = key if isinstance(key, str) else _private_pem(key)
+    return jwt.encode(claims, signing_key, algorithm=algorithm, headers={"kid": kid} if kid else None)
+
+class _JWKSServer:
+    """Serves a JWKS to refresh_keys and counts the fetches."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.fetches = 0
+
+    async def get(self, url):
+        self.fetches += 1
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"keys": self.keys}
+
+@pytest.fixture
+def jwks(monkeypatch):
+    server = _JWKSServer([_public_jwk(RSA_KEY, "RS256", "rsa-1")])
+    monkeypatch.setattr(auth, "get_http_client", lambda: server)
+    return server
+
+def _verifier(**kwargs) -> TokenVerifier:
+    options = {"secret": "", "jwks_url": "https://project.supabase.test/jwks", "issuer": ISSUER}
+    return TokenVerifier(**{**options, **kwargs})
+
+def _verify(verifier: TokenVerifier, *tokens: str):
+    async def run():
+        return [await verifier.verify(token) for token in tokens]
+    return asyncio.run(run())
+
+def test_keys_are_fetched_once_and_cached(jwks):
+    verifier = _verifier()
+    claims = _verify(verifier, _token(), _token(sub="user-2"))
+    assert [c["sub"] for c in claims] == ["user-1", "user-2"]
+    assert jwks.fetches == 1
+    assert verifier.stats()["verified"] == 2
+
+def test_unknown_key_refreshes_at_most_once_per_interval(jwks):
+    verifier = _verifier()
+    _verify(verifier, _token())
+    with pytest.raises(InvalidTokenError):
+        _verify(verifier, _token(kid="rotated"))
+    # Refreshed a moment ago, so a second unknown key doesn't refetch
+    verifier._fetched_at = time.monotonic()
+    with pytest.raises(InvalidTokenError):
+        _verify(verifier, _token(kid="rotated"))
+    assert jwks.fetches == 1
+
+def test_rotated_key_is_picked_up(jwks, monkeypatch):
+    verifier = _verifier()
+    _verify(verifier, _token())
+    jwks.keys = [_public_jwk(EC_KEY, "ES256", "ec-1")]
+    monkeypatch.setattr(auth, "JWKS_MIN_REFRESH_INTERVAL", 0)
+    assert _verify(verifier, _token(EC_KEY, "ES256", "ec-1"))[0]["sub"] == "user-1"
+    assert jwks.fetches == 2
+
+def test_failed_refresh_keeps_the_previous_keys(jwks):
+    verifier = _verifier()
+    asyncio.run(verifier.refresh_keys())
+
+    async def unavailable(url):
+        raise ConnectionError("down")
+
+    jwks.get = unavailable
+    assert not asyncio.run(verifier.refresh_keys())
+    assert _verify(verifier, _token())[0]["sub"] == "user-1"
+    assert verifier.stats()["jwks_errors"] == 1
+
+def test_algorithm_must_match_the_key(jwks):
+    verifier = _verifier()
+    # Signed with the right key, but claiming an algorithm the JWK isn't published for
+    with pytest.raises(InvalidTokenError, match="not used with RS384"):
+        _verify(verifier, _token(algorithm="RS384"))
+    # An EC token pointed at the RSA key
+    with pytest.raises(InvalidTokenError):
+        _verify(verifier, _token(EC_KEY, "ES256", "rsa-1"))
+
+def test_unusable_key_is_rejected_not_raised(jwks):
+    jwks.keys = [{"kid": "broken", "kty": "RSA", "n": "AQAB", "e": "AQAB"}]
+    with pytest.raises(InvalidTokenError, match="Unusable signing key"):
+        _verify(_verifier(), _token(kid="broken"))
+
+def test_issuer_and_audience_are_checked(jwks):
+    verifier = _verifier()
+    with pytest.raises(InvalidTokenError):
+        _verify(verifier, _token(iss="https://attacker.test/auth/v1"))
+    with pytest.raises(InvalidTokenError):
+        _verify(verifier, _token(aud="anon"))
+    assert verifier.stats()["rejected"] == 2
+
+def test_hs256_uses_the_secret_only():
+    verifier = _verifier(secret="project-secret", jwks_url="")
+    assert _verify(verifier, _token("project-secret", "HS256", None))[0]["sub"] == "user-1"
+    with pytest.raises(InvalidTokenError):
+        _verify(verifier, _token("another-secret", "HS256", None))
+    with pytest.raises(InvalidTokenError, match="SUPABASE_JWKS_URL"):
+        _verify(verifier, _token())
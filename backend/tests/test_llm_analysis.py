@@ -0,0 +1,120 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from app.models.research import ResearchResult
+from app.services import llm_analysis
+from app.services.llm_analysis import LLMAnalyzer, RateLimiter, chunk_texts, count_tokens
+from app.services.llm_cache import LLMCache
+
+ANALYSIS = {
+    "summary": "Freelancers hate reconciling invoices.",
+    "user_pain_points": ["Reconciling takes hours"],
+    "key_insights": ["Spreadsheets are the main competitor"],
+    "recommended_next_steps": ["Interview ten freelancers"],
+}
+
+class FakeCompletions:
+    """A stand-in for the async OpenAI client's chat.completions."""
+
+    def __init__(self, partial_tokens: int = 40, delay: float = 0.0):
+        self.partial_tokens = partial_tokens
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, model, messages, temperature, max_tokens=None):
+        prompt = messages[-1]["content"]
+        self.calls.append((prompt, max_tokens))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+
+        if prompt.startswith("These are summaries"):
+            content = json.dumps(ANALYSIS)
+        else:
+            # Summaries as long as the answer may be, and no shorter: the worst case for the reduce
+            content = "pain " * (self.partial_tokens if max_tokens is None else min(self.partial_tokens, max_tokens))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=count_tokens(prompt), completion_tokens=count_tokens(content))
+        )
+
+@pytest.fixture
+def completions(monkeypatch, tmp_path) -> FakeCompletions:
+    fake = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=fake))
+    monkeypatch.setattr(llm_analysis, "get_async_openai_client", lambda: client)
+    monkeypatch.setattr(llm_analysis, "llm_cache", LLMCache(db_path=str(tmp_path / "llm.db")))
+    return fake
+
+def _results(count: int) -> list:
+    return [
+        ResearchResult(platform="reddit", source_url=f"https://reddit.com/{index}", content=f"Post {index}: " + "invoices take forever " * 10)
+        for index in range(count)
+    ]
+
+def _kind(prompt: str) -> str:
+    return {"Summarize": "map", "Merge": "combine", "These": "reduce"}[prompt.split()[0]]
+
+def test_chunks_respect_the_budget_and_keep_order():
+    texts = [f"text {index} " * (5 + index) for index in range(20)] + ["huge " * 500]
+    chunks = chunk_texts(texts, 50)
+
+    assert [text for chunk in chunks for text in chunk][:-1] == texts[:-1]
+    assert all(sum(count_tokens(text) + 1 for text in chunk) <= 50 for chunk in chunks)
+    assert chunks[-1] == [chunks[-1][0]] and count_tokens(chunks[-1][0]) <= 50
+
+def test_every_prompt_fits_the_budget_even_when_summaries_fill_their_answers(completions):
+    completions.partial_tokens = 10_000
+    analyzer = LLMAnalyzer(chunk_tokens=200, requests_per_minute=0)
+
+    analysis = asyncio.run(analyzer.analyze("invoicing", _results(40)))
+
+    assert analysis == ANALYSIS
+    kinds = [_kind(prompt) for prompt, _ in completions.calls]
+    assert kinds.count("reduce") == 1 and kinds[-1] == "reduce"
+    assert "combine" in kinds
+    template = max(count_tokens(llm_analysis._COMBINE_PROMPT), count_tokens(llm_analysis._REDUCE_PROMPT))
+    for prompt, max_tokens in completions.calls:
+        assert count_tokens(prompt) <= 200 + template
+        assert max_tokens == (None if _kind(prompt) == "reduce" else 100)
+
+def test_repeated_analyses_are_served_from_memory_then_from_disk(completions):
+    results = _results(10)
+    first = LLMAnalyzer(chunk_tokens=200, requests_per_minute=0)
+    asyncio.run(first.analyze("invoicing", results))
+    paid = len(completions.calls)
+
+    asyncio.run(first.analyze("invoicing", results))
+    assert len(completions.calls) == paid
+    assert first.stats()["memory_hits"] == paid
+
+    # Another worker: nothing in its memory, everything in the shared cache
+    second = LLMAnalyzer(chunk_tokens=200, requests_per_minute=0)
+    assert asyncio.run(second.analyze("invoicing", results)) == ANALYSIS
+    assert len(completions.calls) == paid
+    assert second.stats()["disk_hits"] == paid
+
+def test_completions_are_bounded_by_the_semaphore(completions):
+    completions.delay = 0.02
+    analyzer = LLMAnalyzer(chunk_tokens=100, max_concurrency=2, requests_per_minute=0)
+
+    asyncio.run(analyzer.analyze("invoicing", _results(20)))
+
+    assert completions.max_active == 2
+
+def test_rate_limiter_spaces_out_calls():
+    limiter = RateLimiter(requests_per_minute=1200)  # One every 50 ms
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) >= 0.09
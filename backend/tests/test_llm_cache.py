@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import LLMCache, llm_cache_key
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _messages(text: str) -> list:
+    return [{"role": "user", "content": text}]
+
+def test_key_ignores_whitespace_and_only_folds_case_when_asked():
+    assert llm_cache_key("gpt-4", _messages("Freelancers  lose\nhours")) == llm_cache_key("gpt-4", _messages("Freelancers lose hours"))
+    assert llm_cache_key("gpt-4", _messages("Freelancers lose hours")) != llm_cache_key("gpt-4", _messages("freelancers lose hours"))
+    assert (
+        llm_cache_key("gpt-4", _messages("Freelancers lose hours"), fold_case=True)
+        == llm_cache_key("gpt-4", _messages("FREELANCERS LOSE HOURS"), fold_case=True)
+    )
+    assert llm_cache_key("gpt-4", _messages("hi"), temperature=0.2) != llm_cache_key("gpt-4", _messages("hi"), temperature=0.5)
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    cache = LLMCache(db_path=str(tmp_path / "llm.db"), ttl=0.05)
+    cache.set("key", "answer")
+    assert cache.get("key") == "answer"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+    assert cache.stats()["misses"] == 1
+
+def test_least_recently_used_entries_are_evicted_over_the_size_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "_PRUNE_EVERY", 1)
+    cache = LLMCache(db_path=str(tmp_path / "llm.db"), max_bytes=2500, compress=False)
+    cache.set("old", "a" * 1000)
+    time.sleep(0.01)
+    cache.set("used", "b" * 1000)
+    time.sleep(0.01)
+    assert cache.get("old") == "a" * 1000
+    time.sleep(0.01)
+    cache.set("new", "c" * 1000)
+
+    assert cache.get("used") is None
+    assert cache.get("old") == "a" * 1000
+    assert cache.get("new") == "c" * 1000
+    assert cache.stats()["evictions"] == 1
+
+def test_compressed_and_plain_entries_read_back(tmp_path):
+    path = str(tmp_path / "llm.db")
+    text = "The same pain point, over and over. " * 50
+    LLMCache(db_path=path, compress=True).set("compressed", text)
+    LLMCache(db_path=path, compress=False).set("plain", text)
+
+    with sqlite3.connect(path) as conn:
+        sizes = dict(conn.execute("SELECT key, size FROM llm_cache"))
+    assert sizes["compressed"] < sizes["plain"] == len(text)
+
+    cache = LLMCache(db_path=path)
+    assert cache.get("compressed") == text
+    assert cache.get("plain") == text
+
+def test_a_corrupt_entry_is_a_miss_and_is_deleted(tmp_path):
+    path = str(tmp_path / "llm.db")
+    cache = LLMCache(db_path=path)
+    cache.set("key", "answer")
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE llm_cache SET value = ?, compressed = 1 WHERE key = 'key'", (b"not zlib",))
+
+    assert cache.get("key") is None
+    assert cache.stats()["errors"] == 1
+    assert cache.stats()["misses"] == 1
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone() == (0,)
+
+def test_entries_are_shared_with_other_processes(tmp_path):
+    path = str(tmp_path / "llm.db")
+    writer = textwrap.dedent(f"""
+        from app.services.llm_cache import LLMCache
+        LLMCache(db_path={path!r}).set("key", "written by another worker")
+    """)
+    subprocess.run([sys.executable, "-c", writer], check=True, cwd=BACKEND_DIR)
+
+    assert LLMCache(db_path=path).get("key") == "written by another worker"
+
+def test_an_empty_path_disables_the_cache():
+    cache = LLMCache(db_path="")
+    cache.set("key", "answer")
+    assert cache.get("key") is None
+    assert cache.stats()["enabled"] is False
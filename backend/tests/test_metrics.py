@@ -0,0 +1,44 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.services.metrics import MetricsMiddleware, count_cache_lookup, render_metrics, time_stage
+
+def _sample(name: str, **labels) -> float:
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_time_stage_records_the_outcome():
+    before_ok = _sample("stage_duration_seconds_count", stage="test.stage", outcome="ok")
+    before_error = _sample("stage_duration_seconds_count", stage="test.stage", outcome="error")
+    with time_stage("test.stage"):
+        pass
+    with pytest.raises(RuntimeError):
+        with time_stage("test.stage"):
+            raise RuntimeError("failed")
+    assert _sample("stage_duration_seconds_count", stage="test.stage", outcome="ok") == before_ok + 1
+    assert _sample("stage_duration_seconds_count", stage="test.stage", outcome="error") == before_error + 1
+
+def test_cache_lookups_are_exported():
+    count_cache_lookup("test_cache", "hit")
+    assert b'cache_lookups_total{cache="test_cache",result="hit"}' in render_metrics()
+
+def test_middleware_labels_by_route_and_echoes_the_request_id():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    async def run():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            given = await client.get("/items/1", headers={"X-Request-ID": "abc"})
+            generated = await client.get("/items/2")
+        return given, generated
+
+    given, generated = asyncio.run(run())
+    assert given.headers["x-request-id"] == "abc"
+    assert len(generated.headers["x-request-id"]) == 32
+    assert _sample("http_request_duration_seconds_count", method="GET", route="/items/{item_id}", status="200") == 2
+    assert _sample("http_requests_in_flight", method="GET") == 0
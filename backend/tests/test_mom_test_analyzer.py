@@ -0,0 +1,76 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from app.services import mom_test_analyzer
+from app.services.llm_cache import LLMCache
+
+IDEA = {
+    "idea_name": "Ledger",
+    "problem_statement": "Freelancers lose hours reconciling invoices",
+    "target_audience": "Freelance designers",
+    "solution": "Automatic invoice matching",
+    "value_proposition": "Saves five hours a month",
+}
+
+ANALYSIS = {
+    "overall_score": 6,
+    "strengths": ["Specific audience"],
+    "weaknesses": ["Unproven willingness to pay"],
+    "mom_test_violations": [],
+    "validation_priorities": ["Ask how they reconcile invoices today"],
+}
+
+class FakeCompletions:
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.calls = []
+
+    async def create(self, model, messages, temperature):
+        self.calls.append(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))])
+
+def _use_llm(monkeypatch, tmp_path, answer: str) -> FakeCompletions:
+    completions = FakeCompletions(answer)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(mom_test_analyzer, "MOM_TEST_LLM_ENABLED", True)
+    monkeypatch.setattr(mom_test_analyzer, "get_async_openai_client", lambda: client)
+    monkeypatch.setattr(mom_test_analyzer, "llm_cache", LLMCache(db_path=str(tmp_path / "llm.db")))
+    return completions
+
+def test_a_resubmission_with_case_and_spacing_edits_costs_no_tokens(monkeypatch, tmp_path):
+    completions = _use_llm(monkeypatch, tmp_path, json.dumps(ANALYSIS))
+    edited = {name: "  " + value.upper().replace(" ", "   ") for name, value in IDEA.items()}
+
+    first = asyncio.run(mom_test_analyzer.analyze_idea(**IDEA))
+    second = asyncio.run(mom_test_analyzer.analyze_idea(**edited))
+
+    assert first == second == ANALYSIS
+    assert len(completions.calls) == 1
+    assert mom_test_analyzer.llm_cache.stats()["hits"] == 1
+
+def test_questions_come_from_the_llm(monkeypatch, tmp_path):
+    questions = [{"question": "When did this last happen?", "explanation": "A specific story", "category": "Past Behavior"}]
+    _use_llm(monkeypatch, tmp_path, json.dumps(questions))
+
+    result = asyncio.run(mom_test_analyzer.generate_interview_questions(IDEA["problem_statement"], IDEA["target_audience"]))
+
+    assert [question.model_dump() for question in result] == questions
+
+def test_an_unusable_answer_falls_back_and_is_not_cached(monkeypatch, tmp_path):
+    completions = _use_llm(monkeypatch, tmp_path, "Sure! Here is my analysis:")
+
+    for _ in range(2):
+        analysis = asyncio.run(mom_test_analyzer.analyze_idea(**IDEA))
+        assert analysis["overall_score"] == 7.5
+
+    assert len(completions.calls) == 2
+    assert mom_test_analyzer.llm_cache.stats()["writes"] == 0
+
+def test_the_llm_is_not_called_unless_enabled(monkeypatch, tmp_path):
+    completions = _use_llm(monkeypatch, tmp_path, json.dumps(ANALYSIS))
+    monkeypatch.setattr(mom_test_analyzer, "MOM_TEST_LLM_ENABLED", False)
+
+    questions = asyncio.run(mom_test_analyzer.generate_interview_questions(IDEA["problem_statement"], IDEA["target_audience"]))
+
+    assert len(questions) == 5
+    assert completions.calls == []
@@ -0,0 +1,104 @@
+import asyncio
+from app.models.research import ResearchQuery, ResearchResult
+from app.routers import research
+from app.services.scrapers import reddit_scraper, twitter_scraper
+
+def _collect(stream) -> list:
+    async def run():
+        return [result async for result in stream]
+    return asyncio.run(run())
+
+def test_mock_streams_only_yield_results_after_the_cursor():
+    tweets = _collect(twitter_scraper.stream("invoicing"))
+    newest = twitter_scraper.cursor(tweets)
+    assert _collect(twitter_scraper.stream("invoicing", since=newest)) == []
+
+    posts = _collect(reddit_scraper.stream("invoicing"))
+    oldest = min(reddit_scraper._created_utc(post) for post in posts)
+    assert len(_collect(reddit_scraper.stream("invoicing", since=repr(oldest)))) == len(posts) - 1
+
+def test_refresh_ignores_null_stored_cursors(monkeypatch):
+    stored = {
+        "results": [],
+        "cursors": {"twitter": None, "reddit": None},
+        "aggregate": None,
+    }
+    written = []
+
+    async def load_stored_research(query):
+        return stored
+
+    monkeypatch.setattr(research, "load_stored_research", load_stored_research)
+    monkeypatch.setattr(research.research_writer, "enqueue", lambda *args, **kwargs: written.append(kwargs))
+
+    query = ResearchQuery(query="invoicing", platforms=["twitter", "reddit"], max_results=10)
+    response = asyncio.run(research.run_refresh(query))
+
+    assert response.results
+    assert all(isinstance(result, ResearchResult) for result in response.results)
+    assert set(response.cursors) == {"twitter", "reddit"}
+    assert None not in response.cursors.values()
+    assert written
+
+class _FakeTable:
+    def __init__(self, updates: list, fail: bool = False):
+        self.updates = updates
+        self.fail = fail
+
+    def update(self, row):
+        self.row = row
+        return self
+
+    def eq(self, column, value):
+        self.match = (column, value)
+        return self
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.updates.append((self.match, self.row))
+
+def _refresh(monkeypatch, stored, fail_update=False):
+    updates, written = [], []
+
+    async def load_stored_research(query):
+        return stored
+
+    class FakeClient:
+        def table(self, name):
+            assert name == "research_results"
+            return _FakeTable(updates, fail_update)
+
+    monkeypatch.setattr(research, "load_stored_research", load_stored_research)
+    monkeypatch.setattr(research, "get_supabase_client", FakeClient)
+    monkeypatch.setattr(research.research_writer, "enqueue", lambda *args, **kwargs: written.append(args))
+
+    query = ResearchQuery(query="invoicing", platforms=["twitter", "reddit"], max_results=3)
+    return asyncio.run(research.run_refresh(query)), updates, written
+
+def _stored_results(count: int) -> list:
+    return [
+        ResearchResult(platform="reddit", source_url=f"https://reddit.com/r/freelance/{index}", content=f"invoicing pain {index}").model_dump()
+        for index in range(count)
+    ]
+
+def test_refresh_keeps_max_results_and_updates_the_stored_row(monkeypatch):
+    response, updates, written = _refresh(monkeypatch, {"id": 7, "results": _stored_results(3), "cursors": {}, "aggregate": None})
+
+    assert len(response.results) == 3
+    assert response.analysis["new_results"] > 0
+    assert response.analysis["results_trimmed"] >= response.analysis["new_results"]
+    assert written == []
+    [(match, row)] = updates
+    assert match == ("id", 7)
+    assert len(row["results"]) == 3
+    # The aggregate still counts every result the query has fetched
+    assert response.analysis["total_results"] == 3 + response.analysis["new_results"]
+
+def test_refresh_stores_a_new_row_when_the_update_fails(monkeypatch):
+    response, updates, written = _refresh(monkeypatch, {"id": 7, "results": _stored_results(1), "cursors": {}, "aggregate": None}, fail_update=True)
+
+    assert updates == []
+    [(query, results, analysis)] = written
+    assert query == "invoicing"
+    assert len(results) == 3
@@ -0,0 +1,47 @@
+from app.models.research import ResearchResult
+from app.services.research_analyzer import analyze_research_data, extract_pain_points
+
+def _result(content: str, sentiment: str, upvotes: int = 0, platform: str = "reddit") -> ResearchResult:
+    return ResearchResult(
+        platform=platform,
+        source_url=f"https://example.test/{abs(hash(content))}",
+        content=content,
+        author="someone",
+        date="2023-01-20T10:25:00Z",
+        engagement={"upvotes": upvotes},
+        sentiment=sentiment
+    )
+
+def test_summary_is_built_from_the_computed_fields():
+    results = [
+        _result("Acme is great for invoicing, saves me hours", "positive", 10, "twitter"),
+        _result("Acme pricing went up again and support never answers", "negative", 50),
+        _result("Exporting invoices is still manual and slow", "negative", 5),
+    ]
+    analysis, summary = analyze_research_data(results, competitors={"Acme": []})
+
+    assert summary.startswith("Analyzed 3 results (2 from reddit, 1 from twitter).")
+    assert "1 positive, 0 neutral and 2 negative" in summary
+    assert "Acme is the most mentioned competitor (2 results" in summary
+    assert analysis["user_pain_points"][0] == "Acme pricing went up again and support never answers"
+    # Nothing the data doesn't back
+    assert "Competitor A" not in summary
+    assert "cost concerns" not in summary
+
+def test_no_results_has_no_claims():
+    analysis, summary = analyze_research_data([])
+    assert analysis["user_pain_points"] == []
+    assert summary.startswith("No results were found")
+
+def test_pain_points_are_negative_results_by_engagement():
+    results = [
+        _result("Setup took a week\nthe rest of the post", "negative", 3),
+        _result("Love it", "positive", 100),
+        _result("Support never replies", "negative", 30),
+        _result("Support never replies", "negative", 1),
+        _result("x" * 500, "negative", 0),
+    ]
+    pain_points = extract_pain_points(results)
+    assert pain_points[:2] == ["Support never replies", "Setup took a week"]
+    assert len(pain_points) == 3
+    assert len(pain_points[2]) == 200
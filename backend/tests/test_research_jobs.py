@@ -0,0 +1,112 @@
+import asyncio
+import os
+from app.models.research import PlatformStatus, ResearchQuery, ResearchResponse
+from app.services.research_jobs import ResearchJobQueue
+
+QUERY = ResearchQuery(query="invoicing", platforms=["twitter"], max_results=5)
+RESPONSE = ResearchResponse(results=[], analysis={}, summary="nothing yet")
+
+def _queue(tmp_path, **kwargs) -> ResearchJobQueue:
+    return ResearchJobQueue(db_path=os.path.join(str(tmp_path), "jobs.db"), poll_interval=0.01, **kwargs)
+
+async def _wait_for(queue: ResearchJobQueue, job_id: str, status: str):
+    for _ in range(500):
+        job, _ = await queue.get(job_id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+def test_jobs_run_and_report_progress(tmp_path):
+    async def handler(query, on_platform_status):
+        await on_platform_status("twitter", PlatformStatus(status="ok", result_count=0, elapsed_ms=1.0))
+        return RESPONSE
+
+    async def run():
+        queue = _queue(tmp_path)
+        await queue.start(handler, concurrency=1)
+        submitted = await queue.submit(QUERY)
+        job = await _wait_for(queue, submitted.id, "succeeded")
+        await queue.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.result.summary == "nothing yet"
+    assert job.progress["twitter"].status == "ok"
+    assert job.attempts == 1
+
+def test_outcome_of_a_lost_lease_is_discarded(tmp_path):
+    queue = _queue(tmp_path, stale_after=-1)
+    queue._insert("job", QUERY)
+
+    job_id, _, attempt = queue._claim("worker-a")
+    # worker-a stops heartbeating; the job is requeued and claimed again
+    assert queue._recover() == 1
+    _, _, next_attempt = queue._claim("worker-b")
+
+    assert not queue._finish(job_id, ("worker-a", attempt), "failed", None, "late")
+    job, _ = queue._load(job_id)
+    assert job.status == "running"
+
+    assert queue._finish(job_id, ("worker-b", next_attempt), "succeeded", RESPONSE, None)
+    job, _ = queue._load(job_id)
+    assert job.status == "succeeded"
+
+def test_a_reclaim_by_the_same_process_is_a_new_lease(tmp_path):
+    queue = _queue(tmp_path, stale_after=-1)
+    queue._insert("job", QUERY)
+
+    _, _, attempt = queue._claim(queue.worker_id)
+    queue._recover()
+    _, _, next_attempt = queue._claim(queue.worker_id)
+
+    queue._set_progress("job", (queue.worker_id, attempt), "twitter", PlatformStatus(status="failed", elapsed_ms=1.0))
+    assert not queue._finish("job", (queue.worker_id, attempt), "failed", None, "late")
+    job, _ = queue._load("job")
+    assert job.progress["twitter"] is None
+    assert queue._finish("job", (queue.worker_id, next_attempt), "succeeded", RESPONSE, None)
+
+def test_worker_survives_a_crashing_job(tmp_path):
+    calls = []
+
+    async def handler(query, on_platform_status):
+        calls.append(query.query)
+        # Not a ResearchResponse: recording the outcome raises AttributeError
+        return object() if len(calls) == 1 else RESPONSE
+
+    async def run():
+        queue = _queue(tmp_path)
+        await queue.start(handler, concurrency=1)
+        first = await queue.submit(QUERY)
+        second = await queue.submit(QUERY)
+        job = await _wait_for(queue, second.id, "succeeded")
+        crashed, _ = await queue.get(first.id)
+        await queue.stop()
+        return job, crashed
+
+    job, crashed = asyncio.run(run())
+    assert job.status == "succeeded"
+    # Left running for the heartbeat to give up on and requeue
+    assert crashed.status in ("running", "queued")
+
+def test_stop_requeues_running_jobs(tmp_path):
+    started = []
+
+    async def handler(query, on_platform_status):
+        started.append(1)
+        await asyncio.sleep(10)
+
+    async def run():
+        queue = _queue(tmp_path)
+        await queue.start(handler, concurrency=1)
+        submitted = await queue.submit(QUERY)
+        while not started:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        job, _ = await queue.get(submitted.id)
+        return job, queue.stats()
+
+    job, stats = asyncio.run(run())
+    assert job.status == "queued"
+    assert job.attempts == 0
+    assert stats["requeued"] == 1
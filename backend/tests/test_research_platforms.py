@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+from app.models.research import ResearchQuery
+from app.routers import research
+from app.services import resilience
+
+class _Scraper:
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+
+    async def stream(self, query, max_results=None, since=None):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        yield SimpleNamespace(content=query)
+
+def _search(monkeypatch, scraper, timeout: float, tokens: float = None):
+    monkeypatch.setitem(research.PLATFORM_SCRAPERS, "testplatform", scraper)
+    monkeypatch.setitem(research.PLATFORM_TIMEOUTS, "testplatform", timeout)
+    monkeypatch.setattr(resilience, "_guards", {})
+    guard = resilience.get_guard("testplatform")
+    guard.bucket.rate = 10.0
+    if tokens is not None:
+        guard.bucket._tokens = tokens
+
+    query = ResearchQuery(query="invoicing", platforms=["twitter"], max_results=5)
+    # A since cursor bypasses the research cache
+    results, status = asyncio.run(research.search_platform("testplatform", query, since="1"))
+    return results, status, guard
+
+def test_rate_limit_wait_is_not_held_against_the_platform(monkeypatch):
+    # An empty bucket means a 0.3 s wait for a token, longer than the 0.2 s deadline
+    results, status, guard = _search(monkeypatch, _Scraper(delay=0.05), timeout=0.2, tokens=-2)
+    assert status.status == "ok"
+    assert len(results) == 1
+    assert guard.breaker.status()["failures"] == 0
+
+def test_slow_platform_counts_as_a_failure(monkeypatch):
+    results, status, guard = _search(monkeypatch, _Scraper(delay=1), timeout=0.05)
+    assert status.status == "timed_out"
+    assert guard.breaker.status()["failures"] == 1
+
+def test_open_breaker_is_not_called(monkeypatch):
+    scraper = _Scraper(error=AssertionError("called"))
+    monkeypatch.setattr(resilience, "_guards", {})
+    guard = resilience.get_guard("testplatform")
+    for _ in range(guard.breaker.failure_threshold):
+        guard.record_failure()
+    monkeypatch.setitem(research.PLATFORM_SCRAPERS, "testplatform", scraper)
+    monkeypatch.setitem(research.PLATFORM_TIMEOUTS, "testplatform", 1.0)
+
+    query = ResearchQuery(query="invoicing", platforms=["twitter"], max_results=5)
+    _, status = asyncio.run(research.search_platform("testplatform", query, since="1"))
+    assert status.status == "circuit_open"
+    assert guard.breaker.status()["failures"] == guard.breaker.failure_threshold
@@ -0,0 +1,150 @@
+import asyncio
+import glob
+import json
+import os
+from app.services.research_writer import ResearchWriter
+
+class _Database:
+    """Stands in for the research_results insert; records every row written."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.rows = []
+        self.started = asyncio.Event()
+
+    async def insert(self, rows):
+        self.started.set()
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.rows.extend(rows)
+
+def _writer(tmp_path, database, **kwargs) -> ResearchWriter:
+    writer = ResearchWriter(spill_dir=str(tmp_path), **kwargs)
+    writer._insert = database.insert
+    return writer
+
+def _spill_files(tmp_path):
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(str(tmp_path), "*")))
+
+def test_stop_drains_without_writing_rows_twice(tmp_path):
+    async def run():
+        database = _Database(delay=0.1)
+        writer = _writer(tmp_path, database, max_age=0.01)
+        await writer.start()
+        for index in range(3):
+            writer.enqueue(f"query {index}", [], {})
+        # Stop while the first batch's insert is in flight
+        await database.started.wait()
+        writer.enqueue("query 3", [], {})
+        await writer.stop()
+        return database.rows
+
+    rows = asyncio.run(run())
+    assert sorted(row["query"] for row in rows) == ["query 0", "query 1", "query 2", "query 3"]
+    assert _spill_files(tmp_path) == []
+
+def test_stop_spills_instead_of_retrying(tmp_path):
+    async def run():
+        database = _Database(failures=100)
+        writer = _writer(tmp_path, database, max_age=10)
+        await writer.start()
+        writer.enqueue("query", [], {})
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+    assert stats["retries"] == 0
+    assert stats["spilled"] == 1
+    assert len(_spill_files(tmp_path)) == 1
+
+def test_failed_batch_is_spilled_and_replayed_after_the_next_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.research_writer.RESEARCH_WRITE_RETRY_BASE", 0.001)
+
+    async def run():
+        database = _Database(failures=4)
+        writer = _writer(tmp_path, database, max_age=0.01)
+        await writer.start()
+        writer.enqueue("lost", [], {})
+        while not writer.stats()["spilled"]:
+            await asyncio.sleep(0.01)
+        writer.enqueue("next", [], {})
+        while len(database.rows) < 2:
+            await asyncio.sleep(0.01)
+        await writer.stop()
+        return database.rows
+
+    assert sorted(row["query"] for row in asyncio.run(run())) == ["lost", "next"]
+    assert _spill_files(tmp_path) == []
+
+def test_replay_skips_truncated_lines(tmp_path):
+    good = {"query": "spilled", "results": [], "analysis": {}}
+    with open(os.path.join(str(tmp_path), "research_results-1.jsonl"), "w", encoding="utf-8") as spill:
+        spill.write(json.dumps(good) + "\n")
+        spill.write('{"query": "cut sho')
+
+    async def run():
+        database = _Database()
+        writer = _writer(tmp_path, database)
+        await writer.start()
+        await writer.stop()
+        return database.rows, writer.stats()
+
+    rows, stats = asyncio.run(run())
+    assert rows == [good]
+    assert stats["rejected"] == 1
+    rejected = [name for name in _spill_files(tmp_path) if name.endswith(".rejected")]
+    assert len(rejected) == 1
+    with open(os.path.join(str(tmp_path), rejected[0]), encoding="utf-8") as out:
+        assert out.read() == '{"query": "cut sho\n'
+    # Nothing left claimed or waiting for a replay
+    assert _spill_files(tmp_path) == rejected
+
+def test_unreadable_spill_file_is_returned_for_the_next_replay(tmp_path):
+    with open(os.path.join(str(tmp_path), "research_results-1.jsonl"), "w", encoding="utf-8") as spill:
+        spill.write(json.dumps({"query": "spilled"}) + "\n")
+
+    def unreadable(path):
+        raise OSError("disk error")
+
+    async def run():
+        writer = _writer(tmp_path, _Database())
+        writer._read_spill = unreadable
+        await writer.start()
+        await writer.stop()
+
+    asyncio.run(run())
+    files = _spill_files(tmp_path)
+    assert len(files) == 1
+    assert files[0].startswith("research_results-") and files[0].endswith(".jsonl")
+
+def test_flusher_survives_an_error(tmp_path):
+    async def run():
+        database = _Database()
+        writer = _writer(tmp_path, database, max_age=0.01)
+        writer._has_spill = True
+        calls = []
+
+        async def broken_replay():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("replay failed")
+            writer._has_spill = True
+
+        writer._replay_spill = broken_replay
+        await writer.start()
+        writer.enqueue("first", [], {})
+        while not database.rows:
+            await asyncio.sleep(0.01)
+        writer.enqueue("second", [], {})
+        while len(database.rows) < 2:
+            await asyncio.sleep(0.01)
+        alive = not writer._task.done()
+        await writer.stop()
+        return alive, database.rows
+
+    alive, rows = asyncio.run(run())
+    assert alive
+    assert [row["query"] for row in rows] == ["first", "second"]
@@ -0,0 +1,158 @@
+import asyncio
+import httpx
+import pytest
+from app.services import resilience
+from app.services.resilience import CircuitBreaker, CircuitOpenError, PlatformGuard, TokenBucket
+
+def _http_error(status: int, retry_after: str = None) -> httpx.HTTPStatusError:
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    request = httpx.Request("GET", "http://platform.test")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, headers=headers, request=request))
+
+def test_bucket_gives_back_reservations_of_cancelled_waiters():
+    async def run():
+        bucket = TokenBucket(rate=20 / 60, capacity=5)
+        waiters = [asyncio.create_task(bucket.acquire()) for _ in range(50)]
+        await asyncio.wait(waiters, timeout=0.2)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        return bucket.tokens
+
+    # The burst was spent; the 45 callers that gave up cost nothing
+    assert -0.1 < asyncio.run(run()) < 0.2
+
+def test_bucket_debt_is_bounded_by_capacity():
+    async def run():
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        waiters = [asyncio.create_task(bucket.acquire()) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        tokens = bucket._tokens
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        return tokens
+
+    assert asyncio.run(run()) >= -2
+
+def test_bucket_waiters_are_paced():
+    async def run():
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(4):
+            await bucket.acquire()
+        return loop.time() - started
+
+    # One token up front, then three at 20 ms each
+    assert asyncio.run(run()) >= 0.055
+
+def test_bucket_defer_holds_back_the_next_call():
+    async def run():
+        bucket = TokenBucket(rate=100.0, capacity=10)
+        bucket.defer(0.1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bucket.acquire()
+        return loop.time() - started
+
+    assert asyncio.run(run()) >= 0.09
+
+def test_breaker_opens_after_threshold_and_recovers_through_a_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_time=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+def test_breaker_reopens_when_the_probe_fails(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_time=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.status()["retry_in"] == 10
+
+def test_breaker_gives_up_on_a_probe_that_never_reports(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_time=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()
+    now[0] += 10
+    assert breaker.allow()
+
+def test_breaker_only_opens_on_a_long_retry_after():
+    breaker = CircuitBreaker("test", failure_threshold=5, recovery_time=30, max_retry_after=5)
+    breaker.record_failure(retry_after=2)
+    assert breaker.state == "closed"
+    breaker.record_failure(retry_after=120)
+    assert breaker.state == "open"
+    assert breaker.status()["retry_in"] > 100
+
+def test_guard_defers_the_bucket_on_a_short_retry_after():
+    guard = PlatformGuard("test")
+    guard.record_failure(_http_error(429, retry_after="2"))
+    assert guard.breaker.state == "closed"
+    assert guard.bucket.tokens < 0
+
+def test_guard_retries_failures_before_the_first_item(monkeypatch):
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0.001)
+    attempts = []
+
+    async def open_stream():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _http_error(503)
+        yield "item"
+
+    async def run():
+        guard = PlatformGuard("test")
+        await guard.admit()
+        return [item async for item in guard.stream(open_stream)], guard.status()["retries"]
+
+    assert asyncio.run(run()) == (["item"], 2)
+
+def test_guard_does_not_retry_after_yielding():
+    async def open_stream():
+        yield "item"
+        raise _http_error(503)
+
+    async def run():
+        guard = PlatformGuard("test")
+        await guard.admit()
+        items = []
+        with pytest.raises(httpx.HTTPStatusError):
+            async for item in guard.stream(open_stream):
+                items.append(item)
+        return items
+
+    assert asyncio.run(run()) == ["item"]
+
+def test_guard_refuses_calls_while_open():
+    async def run():
+        guard = PlatformGuard("test")
+        for _ in range(guard.breaker.failure_threshold):
+            guard.record_failure()
+        await guard.admit()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(run())
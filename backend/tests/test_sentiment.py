@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from fastapi import BackgroundTasks
+from app.models.research import ResearchQuery, ResearchResult
+from app.routers import research
+from app.services import sentiment
+from app.services.sentiment import SentimentScorer
+
+def test_score_async_scores_off_the_event_loop(monkeypatch):
+    threads = []
+    score_texts = sentiment.score_texts
+
+    def recording_score_texts(texts):
+        threads.append(threading.current_thread().name)
+        return score_texts(texts)
+
+    monkeypatch.setattr(sentiment, "score_texts", recording_score_texts)
+    scorer = SentimentScorer()
+
+    async def run():
+        first = await scorer.score_async(["I love this tool", "This is terrible and broken"])
+        # Cached now, so nothing is scored again
+        second = await scorer.score_async(["I love this tool"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first[0] == second[0]
+    assert len(threads) == 1
+    assert threads[0].startswith("offload-analysis")
+
+class _Scraper:
+    """Yields unscored results back to back, as a page of search results would."""
+
+    async def stream(self, query, max_results=None, since=None):
+        for index in range(4):
+            yield ResearchResult(
+                platform="twitter",
+                source_url=f"https://twitter.com/user/status/{index + 1}",
+                content=f"Post {index} about {query}: it is terrible" if index % 2 else f"Post {index}: I love it",
+                author="@user"
+            )
+
+    def cursor(self, results, previous=None):
+        return previous
+
+def test_stream_scores_each_arrival_as_one_batch(monkeypatch):
+    batches = []
+    score_async = sentiment.sentiment_scorer.score_async
+
+    async def recording_score_async(texts):
+        batches.append(len(texts))
+        return await score_async(texts)
+
+    monkeypatch.setattr(sentiment.sentiment_scorer, "score_async", recording_score_async)
+    monkeypatch.setitem(research.PLATFORM_SCRAPERS, "twitter", _Scraper())
+    query = ResearchQuery(query="stream sentiment batching", platforms=["twitter"], max_results=10)
+
+    async def run():
+        return [frame async for frame in research.stream_research(query, BackgroundTasks())]
+
+    frames = asyncio.run(run())
+    results = [frame for frame in frames if frame["type"] == "result"]
+    assert len(results) == 4
+    assert all(frame["data"]["sentiment"] is not None for frame in results)
+    # All four arrived together and were scored in one call, before their frames were sent
+    assert batches[0] == 4
+    assert frames[-1]["type"] == "analysis"
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from app.services.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_run():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        flight = SingleFlight("test")
+        outcomes = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        return outcomes, flight.stats()
+
+    outcomes, stats = asyncio.run(run())
+    assert len(calls) == 1
+    assert [result for result, _ in outcomes] == ["result"] * 5
+    assert [shared for _, shared in outcomes] == [False] + [True] * 4
+    assert stats == {"started": 1, "coalesced": 4, "in_flight": 0}
+
+def test_a_cancelled_caller_does_not_cancel_the_work():
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        flight = SingleFlight("test")
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == ("result", True)
+
+def test_failures_reach_every_caller_and_release_the_key():
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream failed")
+        return "result"
+
+    async def run():
+        flight = SingleFlight("test")
+        failures = await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+        # The next call starts fresh work instead of reusing the failure
+        return failures, await flight.do("key", work)
+
+    failures, retried = asyncio.run(run())
+    assert all(isinstance(failure, RuntimeError) for failure in failures)
+    assert retried == ("result", False)
+    assert len(attempts) == 2
+
+def test_a_shared_search_is_stored_once_after_its_starter_disconnects(monkeypatch):
+    from app.models.research import ResearchQuery, ResearchResponse
+    from app.routers import research
+
+    stored = []
+
+    async def run_research(query, on_platform_status=None):
+        await asyncio.sleep(0.05)
+        return ResearchResponse(results=[], analysis={}, summary="", platform_status={}, cursors={})
+
+    monkeypatch.setattr(research, "run_research", run_research)
+    monkeypatch.setattr(research.research_writer, "enqueue", lambda query, *args, **kwargs: stored.append(query))
+
+    async def run():
+        query = ResearchQuery(query="invoicing", platforms=["reddit"], max_results=10)
+        starter = asyncio.create_task(research.search_platforms(query))
+        await asyncio.sleep(0.01)
+        joiner = asyncio.create_task(research.search_platforms(query))
+        await asyncio.sleep(0.01)
+        starter.cancel()
+        await joiner
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert stored == ["invoicing"]
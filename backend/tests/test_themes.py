@@ -0,0 +1,36 @@
+import pytest
+from app.models.research import ResearchResult
+from app.services.themes import extract_themes
+
+pytest.importorskip("sklearn")
+
+def _results(contents):
+    return [
+        ResearchResult(platform="reddit", source_url=f"https://example.test/{index}", content=content, author="someone")
+        for index, content in enumerate(contents)
+    ]
+
+POSTS = [
+    "I've been struggling with invoicing and I don't have a solution yet",
+    "I’ve been struggling with invoicing clients, I can't find a solution",
+    "We've tried every invoicing tool and they don't fit freelancers",
+    "Invoicing takes me hours, I'm sure there's a better solution",
+    "Scheduling shifts is a nightmare, we've got nobody who's free on weekends",
+    "Shift scheduling at my restaurant's busiest time doesn't work, I'm losing staff",
+    "They're all using spreadsheets for shift scheduling and it isn't working",
+    "Our scheduling app won't handle shift swaps, the team's frustrated",
+]
+
+def test_labels_have_no_contraction_fragments():
+    themes = extract_themes(_results(POSTS))
+    assert themes
+    terms = {word for theme in themes for term in theme["terms"] for word in term.split()}
+    fragments = {"ve", "don", "t", "ll", "re", "s", "m", "isn", "won", "doesn", "can"}
+    assert not terms & fragments
+    assert not any("'" in term or "’" in term for term in terms)
+
+def test_themes_separate_the_topics():
+    themes = extract_themes(_results(POSTS))
+    labels = " ".join(theme["theme"] for theme in themes)
+    assert "invoicing" in labels
+    assert "scheduling" in labels or "shift" in labels
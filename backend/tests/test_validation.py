@@ -0,0 +1,81 @@
+import asyncio
+import json
+from app.models.validation import IdeaInput
+from app.routers import validation
+
+IDEA = {
+    "idea_name": "Ledger",
+    "problem_statement": "Freelancers lose hours reconciling invoices",
+    "target_audience": "Freelance designers",
+    "solution": "Automatic invoice matching",
+    "value_proposition": "Saves five hours a month",
+}
+SHOUTED = {name: value.upper() for name, value in IDEA.items()}
+
+def _count_assessments(monkeypatch) -> list:
+    calls = []
+    assess_idea = validation.assess_idea
+
+    async def slow_assess_idea(idea):
+        calls.append(idea.idea_name)
+        await asyncio.sleep(0.01)
+        return await assess_idea(idea)
+
+    monkeypatch.setattr(validation, "assess_idea", slow_assess_idea)
+    return calls
+
+def test_coalesced_callers_get_their_own_wording(monkeypatch):
+    calls = _count_assessments(monkeypatch)
+
+    async def run():
+        return await asyncio.gather(validation.validate(IdeaInput(**IDEA)), validation.validate(IdeaInput(**SHOUTED)))
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert first.analysis == second.analysis
+    assert first.research_topics[0] == "Freelance designers problems with Freelancers lose hours reconciling invoices"
+    assert second.research_topics[0] == "FREELANCE DESIGNERS problems with FREELANCERS LOSE HOURS RECONCILING INVOICES"
+
+def test_batch_isolates_errors_and_answers_duplicates_separately(monkeypatch):
+    calls = _count_assessments(monkeypatch)
+
+    async def run():
+        return [frame async for frame in validation.stream_validations([IDEA, {"idea_name": "incomplete"}, SHOUTED])]
+
+    frames = asyncio.run(run())
+    by_index = {frame["index"]: frame for frame in frames if "index" in frame}
+    assert len(calls) == 1
+    assert by_index[1]["status"] == "error"
+    assert by_index[0]["data"]["research_topics"][1] == "alternatives to Automatic invoice matching"
+    assert by_index[2]["data"]["research_topics"][1] == "alternatives to AUTOMATIC INVOICE MATCHING"
+    assert frames[-1] == {"status": "done", "total": 3, "succeeded": 2, "failed": 1}
+
+def test_batch_reports_a_failed_analysis_per_item(monkeypatch):
+    async def failing_assess_idea(idea):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(validation, "assess_idea", failing_assess_idea)
+
+    async def run():
+        return [frame async for frame in validation.stream_validations([IDEA, SHOUTED])]
+
+    frames = asyncio.run(run())
+    assert [frame["status"] for frame in frames[:2]] == ["error", "error"]
+    assert "model unavailable" in frames[0]["error"]
+    assert frames[-1]["failed"] == 2
+
+def test_batch_endpoint_fails_only_the_non_object_items():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.include_router(validation.router, prefix="/validation")
+    response = TestClient(app).post("/validation/analyze/batch", json={"ideas": [IDEA, "oops", None]})
+
+    assert response.status_code == 200
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {frame["index"]: frame for frame in frames if "index" in frame}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1]["status"] == "error"
+    assert by_index[2]["status"] == "error"
+    assert frames[-1] == {"status": "done", "total": 3, "succeeded": 1, "failed": 2}
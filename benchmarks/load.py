@@ -0,0 +1,137 @@
+"""
+Closed-loop load driver: a fixed number of concurrent clients, each sending
+its next request as soon as the previous one is answered, until the request
+budget is spent.
+"""
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+
+# Request bodies are varied by index so a run measures the uncached path;
+# --repeat sends the same body every time to measure caches and request coalescing
+_QUERIES = (
+    "invoice reconciliation for freelancers",
+    "scheduling shifts in small restaurants",
+    "tracking inventory across online stores",
+    "onboarding new engineers remotely",
+    "collecting customer feedback in b2b saas",
+    "managing receipts for tax season",
+    "finding reliable contractors for home repairs",
+    "planning meals for families with allergies",
+)
+
+def research_body(index: int) -> Dict[str, Any]:
+    return {
+        "query": f"{_QUERIES[index % len(_QUERIES)]} {index}",
+        "platforms": ["twitter", "reddit", "quora"],
+        "max_results": 50,
+    }
+
+def idea(index: int) -> Dict[str, str]:
+    topic = _QUERIES[index % len(_QUERIES)]
+    return {
+        "idea_name": f"Idea {index}",
+        "problem_statement": f"People struggle with {topic} and lose hours every week to it",
+        "target_audience": "Owners of small businesses with fewer than 20 employees",
+        "solution": f"An assistant that automates {topic}",
+        "value_proposition": "Saves five hours a week for less than the cost of one of them",
+    }
+
+def generate_plan_body(index: int) -> Dict[str, Any]:
+    return {"startup_idea": idea(index)}
+
+class Target:
+    """An endpoint to drive, on the backend or the apps/api server."""
+
+    def __init__(self, server: str, method: str, path: str, body: Callable[[int], Dict[str, Any]]):
+        self.server = server
+        self.method = method
+        self.path = path
+        self.body = body
+
+TARGETS: Dict[str, Target] = {
+    "research_search": Target("backend", "POST", "/research/search", research_body),
+    "validation_analyze": Target("backend", "POST", "/validation/analyze", idea),
+    "generate_plan": Target("api", "POST", "/api/validation/generate-plan", generate_plan_body),
+}
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+async def drive(
+    client: httpx.AsyncClient,
+    target: Target,
+    base_url: str,
+    concurrency: int,
+    requests: int,
+    repeat: bool = False,
+    first_index: int = 0
+) -> Dict[str, Any]:
+    """
+    Send `requests` requests to the target from `concurrency` clients.
+
+    Args:
+        client: Client to send with; its pool should allow `concurrency` connections
+        target: The endpoint
+        base_url: Root URL of the target's server
+        concurrency: Requests in flight at any time
+        requests: Requests to send in total
+        repeat: Send the same body every time instead of varying it
+        first_index: Index of the first body, so warm-up and measured requests don't overlap
+
+    Returns:
+        Throughput, latency percentiles (ms) and error counts
+    """
+    url = base_url + target.path
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_index = first_index
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < first_index + requests:
+            index = next_index
+            next_index += 1
+            body = target.body(first_index if repeat else index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(target.method, url, json=body)
+                await response.aread()
+                outcome = None if response.is_success else str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if outcome is not None:
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    failed = sum(errors.values())
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": _ms(percentile(latencies, 0.50)),
+            "p95": _ms(percentile(latencies, 0.95)),
+            "p99": _ms(percentile(latencies, 0.99)),
+            "mean": _ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max": _ms(latencies[-1]) if latencies else None,
+        },
+        "errors": failed,
+        "error_rate": round(failed / len(latencies), 4) if latencies else 0.0,
+        "errors_by_kind": errors,
+    }
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
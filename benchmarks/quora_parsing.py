@@ -0,0 +1,103 @@
+"""
+Benchmark the Quora parser backends on the saved search pages in fixtures/.
+
+Each backend parses every fixture from bytes, fed in network-sized chunks,
+once for all of its questions and once stopping at --max-results. The
+reference is the scraper's previous pipeline: decoding the response and
+building a full BeautifulSoup tree with html.parser, then find/find_all. Every
+backend's output is checked against the reference before it is timed.
+
+    python benchmarks/quora_parsing.py
+    python benchmarks/quora_parsing.py --max-results 5 --output quora_parsing.json
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from app.services.scrapers.quora_parser import PARSERS, parse_questions  # noqa: E402
+
+def reference_parse(page: bytes, max_results: Optional[int] = None) -> List[Dict[str, str]]:
+    """What the scraper did before the parser backends: decode, build the whole tree, then search it."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page.decode("utf-8"), "html.parser")
+    questions = []
+    for element in soup.find_all("div", class_="question_container")[:max_results]:
+        answer_element = element.find("div", class_="answer_content")
+        author_element = element.find("a", class_="user")
+        questions.append({
+            "title": element.find("span", class_="question_title").text,
+            "path": element.find("a")["href"],
+            "answer": answer_element.text if answer_element else "",
+            "author": author_element.text if author_element else "Anonymous",
+        })
+    return questions
+
+def measure(parse: Callable[[], Any], min_time: float) -> Dict[str, float]:
+    """Run parse repeatedly for at least min_time seconds; per-call median and best, in ms."""
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(timings) < 5:
+        started = time.perf_counter()
+        parse()
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "best_ms": round(min(timings) * 1000, 3),
+        "runs": len(timings),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Quora parser backends on saved pages.")
+    parser.add_argument("--fixtures", default=os.path.join(ROOT, "benchmarks", "fixtures", "quora_*.html"))
+    parser.add_argument("--max-results", type=int, default=10, help="Limit for the early-stop runs (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024, help="Bytes fed per chunk (default: %(default)s)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds spent timing each case (default: %(default)s)")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"chunk_size": args.chunk_size, "pages": {}}
+    for path in sorted(glob.glob(args.fixtures)):
+        with open(path, "rb") as fixture:
+            page = fixture.read()
+
+        cases: Dict[str, Any] = {}
+        for max_results in (None, args.max_results):
+            label = "all" if max_results is None else f"first_{max_results}"
+            expected = reference_parse(page, max_results)
+            reference = measure(lambda: reference_parse(page, max_results), args.min_time)
+            cases[f"reference/{label}"] = reference
+
+            for backend in PARSERS:
+                questions = parse_questions(page, max_results, backend=backend, chunk_size=args.chunk_size)
+                if questions != expected:
+                    raise SystemExit(f"{backend} parsed {os.path.basename(path)} ({label}) differently from the reference")
+                timing = measure(
+                    lambda: parse_questions(page, max_results, backend=backend, chunk_size=args.chunk_size),
+                    args.min_time
+                )
+                timing["speedup"] = round(reference["median_ms"] / timing["median_ms"], 1)
+                cases[f"{backend}/{label}"] = timing
+
+        report["pages"][os.path.basename(path)] = {
+            "bytes": len(page),
+            "questions": len(reference_parse(page)),
+            "cases": cases,
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Benchmark the backend and apps/api against local stand-ins for every service
+they call.
+
+Starts the stub servers (stubs.py), the backend and the apps/api server as
+separate processes, drives each target endpoint at a controlled concurrency,
+and prints throughput, p50/p95/p99 latency and peak RSS per target as JSON.
+The result is compared with a stored baseline and the run fails (exit status
+1) if any metric is worse than the tolerance allows:
+
+    python benchmarks/run.py --concurrency 1,16 --requests 200
+    python benchmarks/run.py --update-baseline        # accept the current numbers
+
+Baselines are only comparable on the same machine, so none is committed:
+the host that runs the comparison (a CI runner, say) stores its own with
+--update-baseline, and a run without one only prints the report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from load import TARGETS, drive
+from stubs import DEFAULT_SETTINGS, build_settings, parse_overrides
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# How each server is started, and the path that answers once it is ready
+SERVERS = {
+    "backend": {"cwd": os.path.join(ROOT, "backend"), "app": "main:app", "health": "/health"},
+    "api": {"cwd": os.path.join(ROOT, "apps", "api"), "app": "app.main:app", "health": "/api/health"},
+}
+
+# Metrics compared with the baseline, and whether a higher value is an improvement
+COMPARED_METRICS = (
+    ("throughput_rps", True),
+    ("latency_ms.p50", False),
+    ("latency_ms.p95", False),
+    ("latency_ms.p99", False),
+    ("peak_rss_mb", False),
+)
+
+# Share of requests that may fail beyond the baseline's before the run counts as a regression
+ERROR_RATE_TOLERANCE = 0.01
+
+# Latency changes smaller than this are noise on endpoints that answer in a few milliseconds
+MIN_LATENCY_CHANGE_MS = 10.0
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process, from /proc (None where there is no /proc)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+class Server:
+    """A uvicorn server in its own process, so its memory and CPU are its own."""
+
+    def __init__(self, name: str, env: Dict[str, str]):
+        spec = SERVERS[name]
+        self.name = name
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.health = spec["health"]
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", spec["app"], "--host", "127.0.0.1", "--port", str(self.port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=spec["cwd"],
+            env=env
+        )
+        self.peak_rss_mb: Optional[float] = None
+
+    async def wait_ready(self, client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.name} server exited with status {self.process.returncode}")
+            try:
+                if (await client.get(self.url + self.health)).is_success:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+        raise RuntimeError(f"{self.name} server was not ready after {timeout:.0f}s")
+
+    def sample_rss(self) -> Optional[float]:
+        current = rss_mb(self.process.pid)
+        if current is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, current)
+        return current
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+class Stubs:
+    """The stub servers, in one process of their own."""
+
+    def __init__(self, settings: Dict[str, Dict[str, float]], seed: int):
+        overrides = [f"{service}.{key}={value}" for service, values in settings.items() for key, value in values.items()]
+        command = [sys.executable, os.path.join(ROOT, "benchmarks", "stubs.py"), "--base-port", str(free_port()), "--seed", str(seed)]
+        for override in overrides:
+            command += ["--set", override]
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Stub servers exited with status {self.process.wait()}")
+        self.env: Dict[str, str] = json.loads(line)["env"]
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop the stubs; returns how many requests each one served and failed."""
+        self.process.terminate()
+        output, _ = self.process.communicate(timeout=30)
+        for line in output.splitlines():
+            if line.startswith("{"):
+                return json.loads(line).get("stats", {})
+        return {}
+
+def parse_env(values: List[str]) -> Dict[str, str]:
+    """Turns ["KEY=VALUE", ...] into a dict."""
+    env = {}
+    for value in values:
+        key, separator, setting = value.partition("=")
+        if not separator:
+            raise SystemExit(f"Expected KEY=VALUE, got {value!r}")
+        env[key] = setting
+    return env
+
+def server_environment(stub_env: Dict[str, str], state_dir: str, overrides: Dict[str, str]) -> Dict[str, str]:
+    """
+    The servers' environment: the stubs' endpoints and credentials, state kept
+    out of the checkout, then the --env overrides.
+
+    The client-side quotas that match the real APIs' limits are lifted, since
+    the stubs have none; otherwise every run would just measure the rate limiters.
+    """
+    env = dict(os.environ)
+    env.update(stub_env)
+    env.update({
+        "LLM_REQUESTS_PER_MINUTE": "1000000",
+        "RATE_LIMIT_TWITTER_PER_MINUTE": "1000000",
+        "RATE_LIMIT_REDDIT_PER_MINUTE": "1000000",
+        "RATE_LIMIT_QUORA_PER_MINUTE": "1000000",
+        "LLM_ANALYSIS_ENABLED": "true",
+        "LLM_CACHE_DB": "",
+        "RESEARCH_CACHE_DB": "",
+        "RESEARCH_JOBS_DB": os.path.join(state_dir, "research_jobs.db"),
+        "RESEARCH_SPILL_DIR": os.path.join(state_dir, "spill"),
+        "SUPABASE_JWKS_URL": "",
+        "PROFILING_TOKEN": "",
+        "LOG_LEVEL": "WARNING",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    env.update(overrides)
+    return env
+
+async def run_target(
+    name: str,
+    server: Server,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    repeat: bool
+) -> Dict[str, Any]:
+    target = TARGETS[name]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+        if warmup:
+            await drive(client, target, server.url, concurrency, warmup, repeat)
+
+        # RSS is sampled through the measured run; its peak is the target's
+        peak: List[float] = []
+
+        async def sample() -> None:
+            while True:
+                current = server.sample_rss()
+                if current is not None:
+                    peak.append(current)
+                await asyncio.sleep(0.1)
+
+        sampler = asyncio.create_task(sample())
+        try:
+            result = await drive(client, target, server.url, concurrency, requests, repeat, first_index=warmup)
+        finally:
+            sampler.cancel()
+        server.sample_rss()
+
+    result["peak_rss_mb"] = max(peak) if peak else None
+    return result
+
+def metric(result: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = result
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Compare each run with the baseline's run of the same target and concurrency.
+
+    Returns:
+        Per-run changes (as fractions of the baseline) and a message per regression
+    """
+    changes: Dict[str, Any] = {}
+    regressions: List[str] = []
+    for key, result in results.items():
+        previous = baseline.get("runs", {}).get(key)
+        if previous is None:
+            continue
+        changes[key] = {}
+        for path, higher_is_better in COMPARED_METRICS:
+            before, after = metric(previous, path), metric(result, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            changes[key][path] = round(change, 4)
+            worse = -change if higher_is_better else change
+            if path.startswith("latency_ms.") and abs(after - before) < MIN_LATENCY_CHANGE_MS:
+                continue
+            if worse > tolerance:
+                regressions.append(f"{key} {path}: {before} -> {after} ({change:+.1%})")
+        if result["error_rate"] > previous.get("error_rate", 0.0) + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{key} error_rate: {previous.get('error_rate', 0.0)} -> {result['error_rate']}")
+    return changes, regressions
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args: argparse.Namespace) -> int:
+    targets = [name.strip() for name in args.targets.split(",")]
+    unknown = [name for name in targets if name not in TARGETS]
+    if unknown:
+        raise SystemExit(f"Unknown targets {unknown}; choose from {sorted(TARGETS)}")
+    concurrencies = [int(value) for value in args.concurrency.split(",")]
+    settings = build_settings(args.latency_ms, args.error_rate, parse_overrides(args.set))
+
+    stubs = Stubs(settings, args.seed)
+    servers: Dict[str, Server] = {}
+    results: Dict[str, Any] = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-") as state_dir:
+            env = server_environment(stubs.env, state_dir, parse_env(args.env))
+            try:
+                for name in {TARGETS[target].server for target in targets}:
+                    servers[name] = Server(name, env)
+                async with httpx.AsyncClient() as client:
+                    await asyncio.gather(*(server.wait_ready(client) for server in servers.values()))
+
+                for target in targets:
+                    for concurrency in concurrencies:
+                        key = f"{target}@{concurrency}"
+                        print(f"Running {key} ...", file=sys.stderr)
+                        results[key] = await run_target(
+                            target, servers[TARGETS[target].server], concurrency, args.requests, args.warmup, args.repeat
+                        )
+            finally:
+                # Before the state directory goes away; shutdown still writes to it
+                for server in servers.values():
+                    server.stop()
+    finally:
+        upstream = stubs.stop()
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "stubs": settings,
+        },
+        "runs": results,
+        "servers": {name: {"peak_rss_mb": server.peak_rss_mb} for name, server in servers.items()},
+        "upstream": upstream,
+    }
+
+    status = 0
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        changes, regressions = compare(results, baseline, args.tolerance)
+        report["comparison"] = {
+            "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "tolerance": args.tolerance,
+            "changes": changes,
+            "regressions": regressions,
+        }
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        status = 1 if regressions else 0
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to store one", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+    return status
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the API servers against local stub services.")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated targets (default: all of %(default)s)")
+    parser.add_argument("--concurrency", default="8", help="Comma-separated concurrency levels, each run separately (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per run (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each run (default: %(default)s)")
+    parser.add_argument("--repeat", action="store_true", help="Send the same body every time, to measure the cached path")
+    parser.add_argument("--latency-ms", type=float, help="Latency of every stub (default: per-service)")
+    parser.add_argument("--error-rate", type=float, help="Share of stub requests failed with a 503 (default: 0)")
+    parser.add_argument("--set", action="append", default=[], metavar="SERVICE.SETTING=VALUE",
+                        help="Per-stub override; settings are %s" % ", ".join(DEFAULT_SETTINGS["openai"]))
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Setting for the servers, e.g. LLM_ANALYSIS_ENABLED=false or RESEARCH_PLATFORM_TIMEOUT=2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative change for the worse (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()